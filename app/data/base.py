@@ -1,13 +1,20 @@
 import sys
 from pathlib import Path
+from typing import AsyncIterator
 from abc import ABC, abstractmethod
+from pydantic import BaseModel
 
 ROOT_DIR = Path(__file__).parent.parent
 sys.path.append(str(ROOT_DIR))
+from settings import settings
 from model.service import MatchSDM
-from model.domain import MatchStatusDTO
+from model.domain import MatchStatusDTO, BackfillJobDTO, BackfillJobChunkDTO
 from model.prediction import MatchPredictionHA, MatchPrediction1x2
 from manager.base import BaseDataInterface, MatchFilter
+from data.loader import ModelLoader
+
+
+BATCH_SIZE = settings.MONGO_BATCH_SIZE
 
 
 class RepositoryInterface(ABC):
@@ -44,15 +51,36 @@ class RepositoryInterface(ABC):
     async def get_matches(self, codes: list[str]) -> list[dict] | None:
         pass
 
+    @abstractmethod
+    def iter_matches(
+        self,
+        codes: list[str],
+        batch_size: int = BATCH_SIZE,
+    ) -> AsyncIterator[list[dict]]:
+        pass
+
     @abstractmethod
     async def get_filtered_matches(
         self,
         match_filter: dict,
         limit: int | None = None,
         skip: int | None = None,
+        projection: dict | None = None,
     ) -> list[dict] | None:
         pass
 
+    @abstractmethod
+    def iter_filtered_matches(
+        self,
+        match_filter: dict,
+        limit: int | None = None,
+        skip: int | None = None,
+        batch_size: int = BATCH_SIZE,
+        projection: dict | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """Filtered and sorted matches by batches of batch_size"""
+        pass
+
     ### CURRENT collection methods
     @abstractmethod
     async def upsert_current_match(self, match: dict) -> None:
@@ -74,6 +102,13 @@ class RepositoryInterface(ABC):
     async def get_all_current_matches(self) -> list[dict] | None:
         pass
 
+    @abstractmethod
+    def iter_all_current_matches(
+        self,
+        batch_size: int = BATCH_SIZE,
+    ) -> AsyncIterator[list[dict]]:
+        pass
+
     @abstractmethod
     async def get_current_codes(self) -> list[dict] | None:
         pass
@@ -86,10 +121,35 @@ class RepositoryInterface(ABC):
     async def delete_current_matches(self, codes: list[str]) -> None:
         pass
 
+    ### JOBS collection methods
+    @abstractmethod
+    async def get_job(self, job_id: str) -> dict | None:
+        pass
+
+    @abstractmethod
+    async def upsert_job(self, job_id: str, job: dict) -> None:
+        pass
+
+    @abstractmethod
+    async def get_job_chunk(self, job_id: str, chunk: int) -> dict | None:
+        pass
+
+    @abstractmethod
+    async def save_job_chunks(self, job_id: str, chunks: list[dict]) -> None:
+        """Replace all chunks of the job"""
+        pass
+
 
 class BaseData(BaseDataInterface):
-    def __init__(self, db: RepositoryInterface) -> None:
+    def __init__(
+        self,
+        db: RepositoryInterface,
+        loader: ModelLoader | None = None,
+    ) -> None:
+        """loader: builds models of stored documents (trusted load by default)"""
+
         self.db = db
+        self.loader = loader if loader is not None else ModelLoader()
 
     async def find_code(self, code: str) -> MatchStatusDTO:
         code = await self.db.find_code(code)
@@ -127,25 +187,54 @@ class BaseData(BaseDataInterface):
 
     async def get_match(self, code: str) -> MatchSDM | None:
         match = await self.db.get_match(code)
-        match = MatchSDM(**match) if match else None
+        match = self.loader.load(MatchSDM, match) if match else None
         return match
 
     async def get_matches(self, codes: list[str]) -> list[MatchSDM] | None:
         matches = await self.db.get_matches(codes)
-        matches = [MatchSDM(**m) for m in matches]
-        return matches
+        return self.loader.load_many(MatchSDM, matches)
+
+    async def iter_matches(
+        self,
+        codes: list[str],
+        batch_size: int = BATCH_SIZE,
+    ) -> AsyncIterator[list[MatchSDM]]:
+        async for batch in self.db.iter_matches(codes, batch_size):
+            yield self.loader.load_many(MatchSDM, batch)
 
     async def get_filtered_matches(
         self,
         match_filter: MatchFilter,
         limit: int | None = None,
         skip: int | None = None,
+        view: type[BaseModel] = MatchSDM,
     ) -> list[MatchSDM] | None:
-        """Return filtered and sorted matches"""
+        """
+        Return filtered and sorted matches.
+        view: model of projected documents (see MatchFilter.fields)
+        """
+
+        filters = match_filter.dump()
+        projection = match_filter.projection()
+        matches = await self.db.get_filtered_matches(filters, limit, skip, projection)
+        return self.loader.load_many(view, matches)
+
+    async def iter_filtered_matches(
+        self,
+        match_filter: MatchFilter,
+        limit: int | None = None,
+        skip: int | None = None,
+        batch_size: int = BATCH_SIZE,
+        view: type[BaseModel] = MatchSDM,
+    ) -> AsyncIterator[list[MatchSDM]]:
+        """Filtered and sorted matches by batches, documents are not kept"""
 
         filters = match_filter.dump()
-        matches = await self.db.get_filtered_matches(filters, limit, skip)
-        return [MatchSDM(**m) for m in matches]
+        projection = match_filter.projection()
+        async for batch in self.db.iter_filtered_matches(
+            filters, limit, skip, batch_size, projection
+        ):
+            yield self.loader.load_many(view, batch)
 
     async def upsert_current_match(self, match: MatchSDM) -> None:
         await self.db.upsert_current_match(match.model_dump())
@@ -157,18 +246,23 @@ class BaseData(BaseDataInterface):
 
     async def get_current_match(self, code: str) -> MatchSDM | None:
         current = await self.db.get_current_match(code)
-        current = MatchSDM(**current) if current else None
+        current = self.loader.load(MatchSDM, current) if current else None
         return current
 
     async def get_current_matches(self, codes: list[str]) -> list[MatchSDM] | None:
         currents = await self.db.get_current_matches(codes)
-        currents = [MatchSDM(**current) for current in currents]
-        return currents
+        return self.loader.load_many(MatchSDM, currents)
 
     async def get_all_current_matches(self) -> list[MatchSDM] | None:
         currents = await self.db.get_all_current_matches()
-        currents = [MatchSDM(**current) for current in currents]
-        return currents
+        return self.loader.load_many(MatchSDM, currents)
+
+    async def iter_all_current_matches(
+        self,
+        batch_size: int = BATCH_SIZE,
+    ) -> AsyncIterator[list[MatchSDM]]:
+        async for batch in self.db.iter_all_current_matches(batch_size):
+            yield self.loader.load_many(MatchSDM, batch)
 
     async def get_current_codes(self) -> list[MatchStatusDTO] | None:
         currents = await self.db.get_current_codes()
@@ -180,3 +274,36 @@ class BaseData(BaseDataInterface):
 
     async def delete_current_matches(self, codes: list[str]) -> None:
         await self.db.delete_current_matches(codes)
+
+    async def get_job(self, job_id: str) -> BackfillJobDTO | None:
+        job = await self.db.get_job(job_id)
+        job = BackfillJobDTO(**job) if job else None
+        return job
+
+    async def upsert_job(
+        self,
+        job: BackfillJobDTO,
+        fields: set[str] | None = None,
+    ) -> None:
+        if fields:
+            job_data = job.model_dump(include=fields)
+        else:
+            job_data = job.model_dump(exclude={"id"})
+        await self.db.upsert_job(job.job_id, job_data)
+
+    async def get_job_chunk(
+        self,
+        job_id: str,
+        chunk: int,
+    ) -> BackfillJobChunkDTO | None:
+        job_chunk = await self.db.get_job_chunk(job_id, chunk)
+        job_chunk = BackfillJobChunkDTO(**job_chunk) if job_chunk else None
+        return job_chunk
+
+    async def save_job_chunks(
+        self,
+        job_id: str,
+        chunks: list[BackfillJobChunkDTO],
+    ) -> None:
+        chunks_data = [c.model_dump(exclude={"id"}) for c in chunks]
+        await self.db.save_job_chunks(job_id, chunks_data)
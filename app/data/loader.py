@@ -0,0 +1,189 @@
+import sys
+import random
+import types
+from pathlib import Path
+from functools import cache
+from typing import Any, Callable, Union, get_args, get_origin
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+from settings import settings
+
+
+Loader = Callable[[Any], Any]
+
+
+def union_loader(models: list[type[BaseModel]]) -> Loader:
+    """
+    Pick union member by str field whose default differs for every member
+    (like MatchOddsHASDM.odds_type / MatchOdds1x2SDM.odds_type).
+    First member is used when there is no such field or value is unknown.
+    """
+
+    common = set.intersection(*[set(m.model_fields) for m in models])
+    for name in sorted(common):
+        values = [m.model_fields[name].default for m in models]
+        if not all(isinstance(v, str) for v in values):
+            continue
+        defaults = dict(zip(values, models))
+        if len(defaults) == len(models):
+            break
+    else:
+        return model_plan(models[0]).load
+
+    plans = {value: model_plan(model) for value, model in defaults.items()}
+    first = model_plan(models[0])
+
+    def load(value):
+        if not isinstance(value, dict):
+            return value
+        return plans.get(value.get(name), first).build(value)
+
+    return load
+
+
+def annotation_loader(annotation) -> Loader | None:
+    """Converter of raw value to annotation, None if value is kept as it is"""
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return model_plan(annotation).load
+
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        models = [a for a in get_args(annotation) if a is not type(None)]
+        if not all(isinstance(m, type) and issubclass(m, BaseModel) for m in models):
+            return None
+        if len(models) == 1:
+            return annotation_loader(models[0])
+        return union_loader(models)
+
+    if origin is list:
+        item_loader = annotation_loader(get_args(annotation)[0])
+        if item_loader is None:
+            return None
+        return lambda value: [item_loader(v) for v in value]
+
+    return None
+
+
+class ModelPlan:
+    """
+    Precomputed construction of model: field defaults and converters of fields
+    holding nested models. Same result as model_construct (defaults filled,
+    fields set tracked, fields order kept) without its per-call introspection.
+    """
+
+    __slots__ = ("model", "names", "template", "required", "factories", "loaders")
+
+    def __init__(self, model: type[BaseModel]) -> None:
+        self.model = model
+        self.names = frozenset(model.model_fields)
+        ### every field in model order, placeholders for required and mutable
+        self.template = {}
+        self.required = set()
+        ### mutable defaults are copied for every instance
+        self.factories = {}
+        self.loaders = []
+
+        for name, field in model.model_fields.items():
+            self.template[name] = None
+            if field.default_factory is not None:
+                self.factories[name] = field.default_factory
+            elif isinstance(field.default, (list, dict, set)):
+                self.factories[name] = field.default.copy
+            elif field.default is PydanticUndefined:
+                self.required.add(name)
+            else:
+                self.template[name] = field.default
+
+            loader = annotation_loader(field.annotation)
+            if loader is not None:
+                self.loaders.append((name, loader))
+
+    def load(self, value):
+        ### already built model (isinstance of dict is cheap, of BaseModel is not)
+        if not isinstance(value, dict):
+            return value
+        return self.build(value)
+
+    def build(self, data: dict) -> BaseModel:
+        fields_set = set(data)
+        if self.names.issuperset(fields_set):
+            values = {**self.template, **data}
+        elif len(fields_set) == len(self.names) + 1 and "_id" in fields_set:
+            ### Mongo document of all fields
+            values = {**self.template, **data}
+            del values["_id"]
+            fields_set.remove("_id")
+        else:
+            fields_set = self.names.intersection(data)
+            values = {**self.template}
+            for name in fields_set:
+                values[name] = data[name]
+
+        if len(fields_set) != len(self.names):
+            for name, factory in self.factories.items():
+                if name not in fields_set:
+                    values[name] = factory()
+            ### like model_construct, missing required fields are not set
+            for name in self.required.difference(fields_set):
+                del values[name]
+
+        for name, loader in self.loaders:
+            value = values.get(name)
+            if value is not None:
+                values[name] = loader(value)
+
+        instance = self.model.__new__(self.model)
+        object.__setattr__(instance, "__dict__", values)
+        object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+        object.__setattr__(instance, "__pydantic_extra__", None)
+        object.__setattr__(instance, "__pydantic_private__", None)
+        return instance
+
+
+@cache
+def model_plan(model: type[BaseModel]) -> ModelPlan:
+    return ModelPlan(model)
+
+
+def construct(model: type[BaseModel], data: dict) -> BaseModel:
+    """
+    Recursive model_construct: build model and nested models of trusted data
+    without validation. Unknown keys (like Mongo _id) are dropped.
+    """
+
+    return model_plan(model).load(data)
+
+
+class ModelLoader:
+    """
+    Builds models of documents written by us.
+    trusted: construct models without validation
+    validate_rate: share of trusted documents that are fully validated anyway,
+    so schema drift still raises ValidationError
+    """
+
+    def __init__(
+        self,
+        trusted: bool = settings.MONGO_TRUSTED_LOAD,
+        validate_rate: float = settings.MONGO_VALIDATE_RATE,
+    ) -> None:
+        self.trusted = trusted
+        self.validate_rate = validate_rate
+
+    def load(self, model: type[BaseModel], data: dict) -> BaseModel:
+        if not self.trusted:
+            return model(**data)
+        if self.validate_rate and random.random() < self.validate_rate:
+            return model(**data)
+        return construct(model, data)
+
+    def load_many(self, model: type[BaseModel], data: list[dict]) -> list[BaseModel]:
+        if not self.trusted:
+            return [model(**d) for d in data]
+        if self.validate_rate:
+            return [self.load(model, d) for d in data]
+        return [construct(model, d) for d in data]
@@ -0,0 +1,121 @@
+import sys
+from pathlib import Path
+import pytest
+from pydantic import ValidationError
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data.loader import ModelLoader, construct
+from model.service import (
+    MatchSDM,
+    MatchDescriptionSDM,
+    MatchFeaturesView,
+    MatchOddsHASDM,
+    MatchOdds1x2SDM,
+    BookOddsHASDM,
+    BookOdds1x2SDM,
+    TimeScoreSDM,
+)
+
+
+def book(name: str) -> dict:
+    return dict(
+        name=name,
+        odds_t1=1.5,
+        odds_t2=2.6,
+        odds_date=1689512700,
+        open_odds_t1=None,
+        open_odds_t2=None,
+        open_odds_date=None,
+    )
+
+
+def match_document(odds: MatchOddsHASDM) -> dict:
+    match = MatchSDM(
+        code="K831uSar",
+        status="Finished",
+        time1=TimeScoreSDM(score_t1=7, score_t2=6, tiebreak_t1=7, tiebreak_t2=5),
+        time2=TimeScoreSDM(score_t1=6, score_t2=3),
+        description=MatchDescriptionSDM(
+            tournament_fullname="ATP - SINGLES: Wimbledon (United Kingdom), grass - Final",
+            tournament_category="ATP - SINGLES",
+            code_t1="t1",
+            code_t2="t2",
+            full_name_t1="Team 1",
+            full_name_t2="Team 2",
+            short_name_t1="T1",
+            short_name_t2="T2",
+            winner=1,
+            reason="",
+            start_date=1689512700,
+            end_date=1689520000,
+            score_t1=2,
+            score_t2=0,
+            infobox="",
+        ),
+        odds=odds,
+        statistics1={"match": {"Aces": 5}},
+        statistics2={"match": {"Aces": 2}},
+    )
+    return {"_id": "6530f1", **match.model_dump()}
+
+
+class TestConstruct:
+    def test_ha(self):
+        odds = MatchOddsHASDM(code="K831uSar", odds=[BookOddsHASDM(**book("bet365"))])
+        document = match_document(odds)
+
+        match = construct(MatchSDM, document)
+
+        assert match == MatchSDM(**document)
+        assert type(match.odds) is MatchOddsHASDM
+        assert type(match.odds.odds[0]) is BookOddsHASDM
+        assert type(match.description) is MatchDescriptionSDM
+        assert match.time3 is None
+
+    def test_1x2(self):
+        odds = MatchOdds1x2SDM(
+            code="K831uSar",
+            odds=[BookOdds1x2SDM(**book("bet365"), odds_x=3.4, open_odds_x=None)],
+        )
+        document = match_document(odds)
+
+        match = construct(MatchSDM, document)
+
+        ### smart union validation reads 1x2 odds as MatchOddsHASDM
+        assert match.odds == odds
+        assert type(match.odds) is MatchOdds1x2SDM
+        assert match.odds.odds[0].odds_x == 3.4
+
+    def test_view(self):
+        document = match_document(None)
+
+        view = construct(MatchFeaturesView, document)
+
+        assert view == MatchFeaturesView(**document)
+        assert view.time1.tiebreak_t2 == 5
+
+
+class TestModelLoader:
+    def test_trusted_skips_validation(self):
+        loader = ModelLoader(trusted=True, validate_rate=0)
+        match = loader.load(MatchSDM, {"code": "K831uSar", "error": "no"})
+        assert match.error == "no"
+
+    def test_validation(self):
+        with pytest.raises(ValidationError):
+            ModelLoader(trusted=False).load(MatchSDM, {"code": None})
+
+        with pytest.raises(ValidationError):
+            ModelLoader(trusted=True, validate_rate=1).load_many(
+                MatchSDM, [{"code": None}]
+            )
+
+    def test_defaults(self):
+        match = construct(MatchSDM, {"code": "K831uSar"})
+        other = construct(MatchSDM, {"code": "hMwfbhsh"})
+
+        assert match.model_dump() == MatchSDM(code="K831uSar").model_dump()
+        assert list(match.model_dump()) == list(MatchSDM.model_fields)
+        assert match.model_fields_set == {"code"}
+        assert match.statistics1 is not other.statistics1
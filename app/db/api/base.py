@@ -1,16 +1,38 @@
 import sys
 from pathlib import Path
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo import UpdateOne, ASCENDING
+from typing import AsyncIterator
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorCursor
+from pymongo import UpdateOne, ReplaceOne, ASCENDING
 from pymongo.errors import BulkWriteError
 
 ROOT_DIR = Path(__file__).parent.parent.parent
 sys.path.append(str(ROOT_DIR))
 
-from db.core import MATHCES, CURRENT, PREDICTIONS
+from settings import settings
+from db.core import MATHCES, CURRENT, PREDICTIONS, JOBS, JOB_CHUNKS
 from data.base import RepositoryInterface
 
 
+BATCH_SIZE = settings.MONGO_BATCH_SIZE
+
+
+async def iter_batches(
+    cursor: AsyncIOMotorCursor,
+    batch_size: int,
+) -> AsyncIterator[list[dict]]:
+    """Yield cursor documents by lists of batch_size"""
+
+    batch: list[dict] = []
+    async for document in cursor.batch_size(batch_size):
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
 class BaseRepository(RepositoryInterface):
     def __init__(
         self,
@@ -21,6 +43,8 @@ class BaseRepository(RepositoryInterface):
         self.matches_collection = self.db[MATHCES]
         self.current_collection = self.db[CURRENT]
         self.predictions_collection = self.db[PREDICTIONS]
+        self.jobs_collection = self.db[JOBS]
+        self.job_chunks_collection = self.db[JOB_CHUNKS]
 
     async def find_code(self, code: str) -> dict:
         return await self.matches_collection.find_one(
@@ -67,20 +91,52 @@ class BaseRepository(RepositoryInterface):
         cursor = self.matches_collection.find({"code": {"$in": codes}})
         return [m async for m in cursor]
 
-    async def get_filtered_matches(
+    async def iter_matches(
+        self,
+        codes: list[str],
+        batch_size: int = BATCH_SIZE,
+    ) -> AsyncIterator[list[dict]]:
+        cursor = self.matches_collection.find({"code": {"$in": codes}})
+        async for batch in iter_batches(cursor, batch_size):
+            yield batch
+
+    def filtered_matches_cursor(
         self,
         match_filter: dict,
         limit: int | None = None,
         skip: int | None = None,
-    ) -> list[dict] | None:
-        cursor = self.matches_collection.find(match_filter)
+        projection: dict | None = None,
+    ) -> AsyncIOMotorCursor:
+        cursor = self.matches_collection.find(match_filter, projection)
         if skip is not None:
             cursor = cursor.skip(skip)
         if limit is not None:
             cursor = cursor.limit(limit)
         cursor.sort("description.start_date", ASCENDING)
+        return cursor
+
+    async def get_filtered_matches(
+        self,
+        match_filter: dict,
+        limit: int | None = None,
+        skip: int | None = None,
+        projection: dict | None = None,
+    ) -> list[dict] | None:
+        cursor = self.filtered_matches_cursor(match_filter, limit, skip, projection)
         return [m async for m in cursor]
 
+    async def iter_filtered_matches(
+        self,
+        match_filter: dict,
+        limit: int | None = None,
+        skip: int | None = None,
+        batch_size: int = BATCH_SIZE,
+        projection: dict | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        cursor = self.filtered_matches_cursor(match_filter, limit, skip, projection)
+        async for batch in iter_batches(cursor, batch_size):
+            yield batch
+
     async def upsert_current_match(self, match: dict) -> None:
         await self.current_collection.update_one(
             filter={"code": match["code"]},
@@ -114,6 +170,14 @@ class BaseRepository(RepositoryInterface):
         cursor = self.current_collection.find()
         return [m async for m in cursor]
 
+    async def iter_all_current_matches(
+        self,
+        batch_size: int = BATCH_SIZE,
+    ) -> AsyncIterator[list[dict]]:
+        cursor = self.current_collection.find()
+        async for batch in iter_batches(cursor, batch_size):
+            yield batch
+
     async def get_current_codes(self) -> list[dict] | None:
         cursor = self.current_collection.find(
             {},
@@ -126,3 +190,35 @@ class BaseRepository(RepositoryInterface):
 
     async def delete_current_matches(self, codes: list[str]) -> None:
         await self.current_collection.delete_many(filter={"code": {"$in": codes}})
+
+    async def get_job(self, job_id: str) -> dict | None:
+        return await self.jobs_collection.find_one({"job_id": job_id})
+
+    async def upsert_job(self, job_id: str, job: dict) -> None:
+        await self.jobs_collection.update_one(
+            filter={"job_id": job_id},
+            update={"$set": job},
+            upsert=True,
+        )
+
+    async def get_job_chunk(self, job_id: str, chunk: int) -> dict | None:
+        return await self.job_chunks_collection.find_one(
+            {"job_id": job_id, "chunk": chunk}
+        )
+
+    async def save_job_chunks(self, job_id: str, chunks: list[dict]) -> None:
+        operations = [
+            ReplaceOne(
+                filter={"job_id": job_id, "chunk": chunk["chunk"]},
+                replacement=chunk,
+                upsert=True,
+            )
+            for chunk in chunks
+        ]
+        if operations:
+            await self.job_chunks_collection.bulk_write(operations, ordered=False)
+
+        ### chunks of previous (interrupted) discovery
+        await self.job_chunks_collection.delete_many(
+            {"job_id": job_id, "chunk": {"$gte": len(chunks)}}
+        )
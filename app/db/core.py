@@ -18,6 +18,8 @@ client = AsyncIOMotorClient(
 MATHCES = "matches"
 CURRENT = "current_matches"
 PREDICTIONS = "predictions"
+JOBS = "jobs"
+JOB_CHUNKS = "job_chunks"
 
 
 async def create_match_indexes(db: AsyncIOMotorDatabase):
@@ -73,6 +75,25 @@ async def create_predictions_indexes(db: AsyncIOMotorDatabase):
     )
 
 
+async def create_jobs_indexes(db: AsyncIOMotorDatabase):
+    await db[JOBS].create_indexes(
+        [
+            pymongo.IndexModel(
+                [("job_id", pymongo.ASCENDING)],
+                unique=True,
+            ),
+        ]
+    )
+    await db[JOB_CHUNKS].create_indexes(
+        [
+            pymongo.IndexModel(
+                [("job_id", pymongo.ASCENDING), ("chunk", pymongo.ASCENDING)],
+                unique=True,
+            ),
+        ]
+    )
+
+
 async def init_db():
     databases = [
         client[settings.MONGO_TENNIS_MEN_DB],
@@ -96,6 +117,10 @@ async def init_db():
     ]
     await asyncio.gather(*predictions_indexes)
 
+    ### checkpoints of backfill jobs
+    jobs_indexes = [asyncio.create_task(create_jobs_indexes(db)) for db in databases]
+    await asyncio.gather(*jobs_indexes)
+
 
 if __name__ == "__main__":
     asyncio.run(init_db())
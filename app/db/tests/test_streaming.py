@@ -0,0 +1,195 @@
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from db.core import MATHCES, CURRENT, PREDICTIONS, JOBS, JOB_CHUNKS
+from db.api.base import BaseRepository
+from data.base import BaseData
+from manager.base import MatchFilter
+from manager.service import StatusCode
+from model.service import (
+    MatchSDM,
+    MatchDescriptionSDM,
+    MatchFeaturesView,
+    MatchOddsHASDM,
+    OddsType,
+    TimeScoreSDM,
+)
+
+
+class FakeCursor:
+    """Motor-like cursor over list of documents"""
+
+    def __init__(self, documents: list[dict], projection: dict | None = None) -> None:
+        self.documents = documents
+        self.projection = projection
+        self.fetch_size = None
+
+    def skip(self, skip: int) -> "FakeCursor":
+        self.documents = self.documents[skip:]
+        return self
+
+    def limit(self, limit: int) -> "FakeCursor":
+        self.documents = self.documents[:limit]
+        return self
+
+    def sort(self, key: str, direction: int) -> "FakeCursor":
+        self.documents = sorted(self.documents, key=lambda d: d["sort"])
+        return self
+
+    def batch_size(self, batch_size: int) -> "FakeCursor":
+        self.fetch_size = batch_size
+        return self
+
+    def __aiter__(self):
+        return self.iterate()
+
+    async def iterate(self):
+        for document in self.documents:
+            if self.projection is not None:
+                document = project(document, self.projection)
+            yield document
+
+
+def project(document: dict, projection: dict) -> dict:
+    """Inclusion projection of dotted paths like Mongo does"""
+
+    projected = {}
+    for path in projection:
+        if path == "_id":
+            continue
+
+        source, target = document, projected
+        *parents, leaf = path.split(".")
+        for key in parents:
+            if key not in source:
+                break
+            source = source[key]
+            target = target.setdefault(key, {})
+        else:
+            if leaf in source:
+                target[leaf] = source[leaf]
+    return projected
+
+
+class FakeCollection:
+    def __init__(self, documents: list[dict]) -> None:
+        self.documents = documents
+        self.projections: list[dict | None] = []
+
+    def find(self, match_filter: dict = {}, projection: dict | None = None):
+        self.projections.append(projection)
+        return FakeCursor(list(self.documents), projection)
+
+
+def match_document(i: int) -> dict:
+    return {"code": f"code{i}", "status": StatusCode.get("3"), "sort": -i}
+
+
+def full_match_document(i: int) -> dict:
+    match = MatchSDM(
+        code=f"code{i}",
+        status=StatusCode.get("3"),
+        time1=TimeScoreSDM(score_t1=6, score_t2=4),
+        description=MatchDescriptionSDM(
+            tournament_fullname="ATP - SINGLES: Wimbledon - Final",
+            code_t1="t1",
+            code_t2="t2",
+            full_name_t1="Team 1",
+            full_name_t2="Team 2",
+            short_name_t1="T1",
+            short_name_t2="T2",
+            winner=1,
+            reason="",
+            start_date=1000 + i,
+            end_date=2000 + i,
+            score_t1=2,
+            score_t2=0,
+            infobox="text" * 100,
+        ),
+        odds=MatchOddsHASDM(code=f"code{i}", odds_type=OddsType.ODDS_HA),
+        statistics1={"match": {"Aces": 5}, "time1": {"Aces": 3}},
+        statistics2={"match": {"Aces": 2}, "time1": {"Aces": 1}},
+    )
+    return {**match.model_dump(), "sort": i}
+
+
+def get_repository(
+    count: int = 0,
+    matches: FakeCollection | None = None,
+) -> BaseRepository:
+    """Repository of count match documents (or of matches collection)"""
+
+    documents = [match_document(i) for i in range(count)]
+    if matches is None:
+        matches = FakeCollection(documents)
+    return BaseRepository(
+        {
+            MATHCES: matches,
+            CURRENT: FakeCollection(documents),
+            PREDICTIONS: FakeCollection([]),
+            JOBS: FakeCollection([]),
+            JOB_CHUNKS: FakeCollection([]),
+        }
+    )
+
+
+class TestStreaming:
+    @pytest.mark.asyncio
+    async def test_repository_batches(self):
+        repository = get_repository(25)
+
+        batches = [b async for b in repository.iter_filtered_matches({}, batch_size=10)]
+
+        assert [len(b) for b in batches] == [10, 10, 5]
+        streamed = [d for b in batches for d in b]
+        assert streamed == await repository.get_filtered_matches({})
+
+    @pytest.mark.asyncio
+    async def test_repository_skip_limit(self):
+        repository = get_repository(25)
+
+        batches = [
+            b
+            async for b in repository.iter_filtered_matches(
+                {}, limit=7, skip=3, batch_size=5
+            )
+        ]
+
+        assert [len(b) for b in batches] == [5, 2]
+
+    @pytest.mark.asyncio
+    async def test_data_models(self):
+        data = BaseData(get_repository(12))
+
+        batches = [
+            b async for b in data.iter_filtered_matches(MatchFilter(), batch_size=5)
+        ]
+        current = [b async for b in data.iter_all_current_matches(batch_size=5)]
+
+        assert [len(b) for b in batches] == [5, 5, 2]
+        assert [m.code for m in batches[0]] == [f"code{i}" for i in range(11, 6, -1)]
+        assert sum(len(b) for b in current) == 12
+
+
+class TestProjection:
+    @pytest.mark.asyncio
+    async def test_features_view(self):
+        documents = [full_match_document(i) for i in range(3)]
+        collection = FakeCollection(documents)
+        data = BaseData(get_repository(matches=collection))
+
+        match_filter = MatchFilter(error=False, fields=MatchFeaturesView.FIELDS)
+        views = await data.get_filtered_matches(match_filter, view=MatchFeaturesView)
+
+        assert "odds" not in collection.projections[-1]
+        assert [v.code for v in views] == ["code0", "code1", "code2"]
+        assert views[0].description.start_date == 1000
+        assert views[0].time1.score_t1 == 6
+        assert views[0].statistics1 == {"match": {"Aces": 5}}
+
+        full = await data.get_filtered_matches(MatchFilter(error=False))
+        assert collection.projections[-1] is None
+        assert full[0].odds is not None
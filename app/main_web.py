@@ -2,7 +2,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from web.tennis_men import router as tennis_men_router
+from web.tennis_men import manager as tennis_men_manager
+from web.tennis_men import scraper_session as tennis_men_session
 from web.tennis_women import router as tennis_women_router
+from web.tennis_women import manager as tennis_women_manager
+from web.tennis_women import scraper_session as tennis_women_session
 
 
 app = FastAPI()
@@ -16,5 +20,35 @@ app.add_middleware(
     allow_headers=["X-Requested-With", "Content-Type", "Authorization"],
 )
 
+
+@app.on_event("startup")
+async def start_predictors():
+    ### feature stores are synced with data in background
+    for manager in (tennis_men_manager, tennis_women_manager):
+        await manager.start_predictor()
+
+
+@app.on_event("shutdown")
+async def close_predictors():
+    ### feature stores of predictors are saved periodically, flush the rest
+    for manager in (tennis_men_manager, tennis_women_manager):
+        await manager.close_predictor()
+
+
+@app.on_event("shutdown")
+async def close_scraper_sessions():
+    caches = []
+    for session in (tennis_men_session, tennis_women_session):
+        await session.close()
+
+        ### sessions share cache of the same file
+        if session.cache is not None and session.cache not in caches:
+            caches.append(session.cache)
+
+    for cache in caches:
+        print(f"Response cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
+
+
 app.include_router(tennis_men_router, prefix="/tennis_men")
 app.include_router(tennis_women_router, prefix="/tennis_women")
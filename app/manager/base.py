@@ -2,12 +2,16 @@ import sys
 import asyncio
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable
+import numpy as np
+from pydantic import BaseModel
+from tqdm import tqdm
 from tqdm.asyncio import tqdm_asyncio
 
 ROOT_DIR = Path(__file__).parent.parent
 sys.path.append(str(ROOT_DIR))
 
-from model.domain import MatchStatusDTO
+from model.domain import MatchStatusDTO, BackfillJobDTO, BackfillJobChunkDTO
 from model.prediction import MatchPredictionHA, MatchPrediction1x2
 from model.service import (
     MatchSDM,
@@ -16,6 +20,7 @@ from model.service import (
     TournamentByYearUrlSDM,
     PlayerSDM,
 )
+from manager.frontier import CodeFrontier
 from manager.service import (
     SportType,
     FlashScoreMatchScraperInterface,
@@ -81,7 +86,20 @@ class BaseDataInterface(ABC):
         match_filter: "MatchFilter",
         limit: int | None = None,
         skip: int | None = None,
+        view: type[BaseModel] = MatchSDM,
     ) -> list[MatchSDM] | None:
+        """view: model of projected documents (see MatchFilter.fields)"""
+        pass
+
+    @abstractmethod
+    def iter_filtered_matches(
+        self,
+        match_filter: "MatchFilter",
+        limit: int | None = None,
+        skip: int | None = None,
+        batch_size: int = 1000,
+        view: type[BaseModel] = MatchSDM,
+    ) -> AsyncIterator[list[MatchSDM]]:
         pass
 
     ### CURRENT MATCH collection methods
@@ -105,6 +123,13 @@ class BaseDataInterface(ABC):
     async def get_all_current_matches(self) -> list[MatchSDM] | None:
         pass
 
+    @abstractmethod
+    def iter_all_current_matches(
+        self,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[list[MatchSDM]]:
+        pass
+
     @abstractmethod
     async def get_current_codes(self) -> list[MatchStatusDTO] | None:
         pass
@@ -117,6 +142,37 @@ class BaseDataInterface(ABC):
     async def delete_current_matches(self, codes: list[str]) -> None:
         pass
 
+    ### JOBS collection methods
+    @abstractmethod
+    async def get_job(self, job_id: str) -> BackfillJobDTO | None:
+        pass
+
+    @abstractmethod
+    async def upsert_job(
+        self,
+        job: BackfillJobDTO,
+        fields: set[str] | None = None,
+    ) -> None:
+        """fields: update only these fields of the job"""
+        pass
+
+    @abstractmethod
+    async def get_job_chunk(
+        self,
+        job_id: str,
+        chunk: int,
+    ) -> BackfillJobChunkDTO | None:
+        pass
+
+    @abstractmethod
+    async def save_job_chunks(
+        self,
+        job_id: str,
+        chunks: list[BackfillJobChunkDTO],
+    ) -> None:
+        """Replace all chunks of the job"""
+        pass
+
 
 class BasePredictorInterface(ABC):
     @abstractmethod
@@ -126,6 +182,18 @@ class BasePredictorInterface(ABC):
     ) -> MatchPredictionHA | MatchPrediction1x2:
         pass
 
+    async def add_matches(self, matches: list[MatchSDM]) -> None:
+        """Called with matches just added to data (predictor state update)"""
+        return None
+
+    async def start(self) -> None:
+        """Called on startup (background preparation of predictor state)"""
+        return None
+
+    async def close(self) -> None:
+        """Called on shutdown (persist predictor state)"""
+        return None
+
 
 class MatchFilter:
     def __init__(
@@ -137,7 +205,11 @@ class MatchFilter:
         max_date: int | None = None,
         tournament_categories: list[str] | set[str] | None = None,
         team_codes: list[str] | None = None,
+        codes: list[str] | set[str] | None = None,
+        fields: list[str] | None = None,
     ) -> None:
+        """fields: return only these document fields (dotted paths), all by default"""
+
         self.error = error
         self.odds_error = odds_error
         self.min_date = min_date
@@ -146,6 +218,8 @@ class MatchFilter:
         self.statuses = self.setup(statuses)
         self.tournament_categories = self.setup(tournament_categories)
         self.team_codes = self.setup(team_codes)
+        self.codes = self.setup(codes)
+        self.fields = fields
 
     def setup(self, iterable):
         if iterable is None:
@@ -179,8 +253,15 @@ class MatchFilter:
                     ]
                 }
             )
+        if self.codes is not None:
+            filters.update({"code": {"$in": list(self.codes)}})
         return filters
 
+    def projection(self) -> dict | None:
+        if self.fields is None:
+            return None
+        return {"_id": 0, **{field: 1 for field in self.fields}}
+
     def filter(self, matches: list[MatchSDM]) -> list[MatchSDM]:
         # return matches
         raise NotImplementedError
@@ -208,41 +289,28 @@ class MatchCodesFilter:
             return iterable
         return set(iterable)
 
-    def _filter(self, match: MatchCodeSDM) -> bool:
-        if self.min_date and match.date < self.min_date:
-            return False
-        if self.max_date and match.date > self.max_date:
-            return False
-        if (
-            self.allowed_categories
-            and match.tournament_category not in self.allowed_categories
-        ):
-            return False
-        if (
-            self.disallowed_categories
-            and match.tournament_category in self.disallowed_categories
-        ):
-            return False
-        if self.allowed_statuses and match.status not in self.allowed_statuses:
-            return False
-        if self.disallowed_statuses and match.status in self.disallowed_statuses:
-            return False
-
-        return True
+    def mask(self, frontier: CodeFrontier) -> np.ndarray:
+        return frontier.mask(
+            self.min_date,
+            self.max_date,
+            self.allowed_categories,
+            self.disallowed_categories,
+            self.allowed_statuses,
+            self.disallowed_statuses,
+        )
 
     def filter(
         self,
-        match_codes: list[MatchCodeSDM],
+        match_codes: list[MatchCodeSDM] | CodeFrontier,
     ) -> list[MatchCodeSDM]:
-        codemap: dict[str, MatchCodeSDM] = dict()
-        for match_code in match_codes:
-            if match_code.code in codemap:
-                continue
+        """Unique (by code) match codes passing filter"""
 
-            if self._filter(match_code):
-                codemap[match_code.code] = match_code
+        frontier = match_codes
+        if not isinstance(frontier, CodeFrontier):
+            frontier = CodeFrontier()
+            frontier.add_codes(match_codes)
 
-        return codemap.values()
+        return frontier.select(self.mask(frontier))
 
 
 class PlayerFilter:
@@ -305,6 +373,32 @@ class TournamentFilter:
         return tournaments
 
 
+class AddMatchesStats(BaseModel):
+    """Summary of BaseManager.add_matches run"""
+
+    requested: int = 0
+    skipped: int = 0
+    scraped: int = 0
+    errors: int = 0
+    stored: int = 0
+    batches: int = 0
+
+    def merge(self, other: "AddMatchesStats") -> None:
+        self.requested += other.requested
+        self.skipped += other.skipped
+        self.scraped += other.scraped
+        self.errors += other.errors
+        self.stored += other.stored
+        self.batches += other.batches
+
+
+class BackfillStage:
+    """Stages of checkpointed backfill job"""
+
+    DISCOVERY = "discovery"
+    MATCHES = "matches"
+
+
 class AbstractManager(ABC):
     @abstractmethod
     async def find_code(self, code: str) -> MatchStatusDTO | None:
@@ -324,6 +418,10 @@ class AbstractManager(ABC):
 
 
 class BaseManager(AbstractManager):
+    ADD_MATCHES_WORKERS = 50
+    ADD_MATCHES_BATCH_SIZE = 200
+    JOB_BATCH_SIZE = 1000
+
     def __init__(
         self,
         sport: SportType,
@@ -332,7 +430,13 @@ class BaseManager(AbstractManager):
         week: FlashScoreWeeklyMatchesScraper,
         odds: BetExplorerScraperInterface,
         predictor: BasePredictorInterface,
+        concurrent_scrape: bool = False,
     ) -> None:
+        """
+        concurrent_scrape: scrape FlashScore match data and BetExplorer odds
+        at the same time instead of one after another
+        """
+
         self.sport = sport
         self.data = data
 
@@ -342,18 +446,18 @@ class BaseManager(AbstractManager):
 
         self.predictor = predictor
 
-    async def scrape_match_data(self, code: str) -> MatchSDM:
-        ### Potenial optimization
-        # tasks = [
-        #     asyncio.create_task(self.match.scrape(code)),
-        #     asyncio.create_task(self.odds.scrape(code)),
-        # ]
-        # match_data, odds_data = await asyncio.gather(*tasks)
+        self.concurrent_scrape = concurrent_scrape
+
+    async def scrape_match_data(self, code: str, status: str | None = None) -> MatchSDM:
+        """status: known match status, lets match scraper request feeds concurrently"""
+
+        if self.concurrent_scrape:
+            return await self.scrape_match_data_concurrently(code, status)
 
         try:
             match_data = None
-            match_data = await self.match.scrape(code)
-            odds_data = await self.odds.scrape(code)
+            match_data = await self.match.scrape(code, status)
+            odds_data = await self.odds.scrape(code, match_data.status)
 
             match_data.odds = odds_data
             if match_data.status is None:
@@ -374,6 +478,54 @@ class BaseManager(AbstractManager):
 
             return match_data
 
+    async def scrape_match_data_concurrently(
+        self,
+        code: str,
+        status: str | None = None,
+    ) -> MatchSDM:
+        """
+        Same as scrape_match_data, but match data and odds are requested together.
+        Failed odds scraping doesn't affect match data: match is returned without odds.
+
+        status is only a prefetch hint for odds (it can be stale, e.g. discovery
+        or current collection status): if the parsed status is finished and the
+        hint is not, odds are scraped again with the parsed status to store them.
+        """
+
+        match_data, odds_data = await asyncio.gather(
+            self.match.scrape(code, status),
+            self.odds.scrape(code, status),
+            return_exceptions=True,
+        )
+        ### cancellation (any BaseException) is not a scraping error
+        for result in (match_data, odds_data):
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+
+        if isinstance(match_data, Exception):
+            print("Exception at code", code, match_data)
+            return MatchSDM(
+                code=code,
+                error=True,
+                status=StatusCode.UNDEFINED,
+            )
+
+        if StatusCode.finished(match_data.status) and not StatusCode.finished(status):
+            try:
+                odds_data = await self.odds.scrape(code, match_data.status)
+            except Exception as ex:
+                odds_data = ex
+
+        if isinstance(odds_data, Exception):
+            print("Exception at code", code, odds_data)
+        else:
+            match_data.odds = odds_data
+
+        if match_data.status is None:
+            match_data.status = StatusCode.UNDEFINED
+
+        return match_data
+
     async def find_code(self, code: str) -> MatchStatusDTO | None:
         """Return match code and status if exists in the database"""
         return await self.data.find_code(code)
@@ -395,6 +547,21 @@ class BaseManager(AbstractManager):
     async def get_prediction(self, code: str) -> MatchPredictionHA | MatchPrediction1x2:
         return await self.data.get_prediction(code)
 
+    async def predictor_add_matches(self, matches: list[MatchSDM]) -> None:
+        """Pass matches added to data to predictor"""
+        if self.predictor is not None and matches:
+            await self.predictor.add_matches(matches)
+
+    async def start_predictor(self) -> None:
+        """Start predictor on app startup"""
+        if self.predictor is not None:
+            await self.predictor.start()
+
+    async def close_predictor(self) -> None:
+        """Persist predictor state on shutdown"""
+        if self.predictor is not None:
+            await self.predictor.close()
+
     async def add_match(self, code: str) -> MatchSDM | None:
         found = await self.find_code(code)
         if found:
@@ -402,21 +569,205 @@ class BaseManager(AbstractManager):
 
         match_data = await self.scrape_match_data(code)
         await self.data.add_match(match_data)
+        await self.predictor_add_matches([match_data])
         return match_data
 
-    async def add_matches(self, codes: list[str]) -> list[MatchSDM] | None:
+    async def add_matches(
+        self,
+        codes: list[str],
+        statuses: dict[str, str] | None = None,
+        return_stats: bool = False,
+        workers: int | None = None,
+        batch_size: int | None = None,
+    ) -> list[MatchSDM] | AddMatchesStats | None:
+        """
+        Scrape new matches with bounded amount of workers and store them by batches.
+
+        statuses: known statuses of match codes (code -> status)
+        return_stats: return AddMatchesStats instead of list of scraped matches.
+        Scraped matches are kept in memory only for the list, so large collects
+        should use stats. Matches of the list are in order of scrape completion,
+        not in order of codes.
+        workers: amount of matches scraped at the same time
+        batch_size: amount of matches in one insert
+        """
+
+        workers = workers or self.ADD_MATCHES_WORKERS
+        batch_size = batch_size or self.ADD_MATCHES_BATCH_SIZE
+        if statuses is None:
+            statuses = {}
+
+        codes = list(dict.fromkeys(codes))
         founded_codes = await self.find_codes(codes)
         founded_codes = {c.code for c in founded_codes}
+
+        stats = AddMatchesStats(requested=len(codes))
         codes = [c for c in codes if c not in founded_codes]
+        stats.skipped = stats.requested - len(codes)
         if not codes:
-            return None
+            return stats if return_stats else None
+
+        collected = None if return_stats else []
+        codes_queue = asyncio.Queue(maxsize=workers)
+        matches_queue = asyncio.Queue(maxsize=batch_size)
+
+        async def produce() -> None:
+            for code in codes:
+                await codes_queue.put(code)
+            for _ in range(workers):
+                await codes_queue.put(None)
+
+        async def scrape() -> None:
+            await asyncio.gather(
+                *[
+                    self._scrape_worker(codes_queue, matches_queue, statuses)
+                    for _ in range(workers)
+                ]
+            )
+            await matches_queue.put(None)
 
-        tasks = [asyncio.create_task(self.scrape_match_data(c)) for c in codes]
         print("Scrape matches:", len(codes))
-        matches_data = await tqdm_asyncio.gather(*tasks)
+        with tqdm(total=len(codes)) as progress:
+            tasks = [
+                asyncio.create_task(produce()),
+                asyncio.create_task(scrape()),
+                asyncio.create_task(
+                    self._store_matches(
+                        matches_queue,
+                        batch_size,
+                        stats,
+                        progress,
+                        collected,
+                    )
+                ),
+            ]
+
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return stats if return_stats else collected
+
+    async def _scrape_worker(
+        self,
+        codes_queue: asyncio.Queue,
+        matches_queue: asyncio.Queue,
+        statuses: dict[str, str],
+    ) -> None:
+        while True:
+            code = await codes_queue.get()
+            if code is None:
+                return None
+
+            match_data = await self.scrape_match_data(code, statuses.get(code))
+            await matches_queue.put(match_data)
+
+    async def _store_matches(
+        self,
+        matches_queue: asyncio.Queue,
+        batch_size: int,
+        stats: AddMatchesStats,
+        progress: tqdm,
+        collected: list[MatchSDM] | None = None,
+    ) -> None:
+        batch: list[MatchSDM] = []
+        while True:
+            match_data = await matches_queue.get()
+            if match_data is not None:
+                batch.append(match_data)
+                progress.update(1)
+
+                stats.scraped += 1
+                if match_data.error:
+                    stats.errors += 1
+                if collected is not None:
+                    collected.append(match_data)
+
+            if batch and (match_data is None or len(batch) >= batch_size):
+                await self.data.add_matches(batch)
+                await self.predictor_add_matches(batch)
+                stats.stored += len(batch)
+                stats.batches += 1
+                batch = []
+
+            if match_data is None:
+                return None
+
+    async def load_job(self, job_id: str) -> BackfillJobDTO:
+        job = await self.data.get_job(job_id)
+        if job is None:
+            job = BackfillJobDTO(job_id=job_id)
+        return job
+
+    async def save_job_codes(
+        self,
+        job: BackfillJobDTO,
+        codes: list[MatchCodeSDM],
+    ) -> None:
+        """Store frontier by chunks of JOB_BATCH_SIZE codes, then the job"""
+
+        size = self.JOB_BATCH_SIZE
+        chunks = [
+            BackfillJobChunkDTO(
+                job_id=job.job_id,
+                chunk=chunk,
+                codes=[c.code for c in codes[start : start + size]],
+                statuses=[c.status for c in codes[start : start + size]],
+            )
+            for chunk, start in enumerate(range(0, len(codes), size))
+        ]
+        await self.data.save_job_chunks(job.job_id, chunks)
+
+        job.total = len(codes)
+        job.chunk_size = size
+        job.cursor = 0
+        job.complete(BackfillStage.DISCOVERY)
+        await self.data.upsert_job(job)
+
+    async def add_job_matches(self, job: BackfillJobDTO) -> AddMatchesStats:
+        """Add matches of job codes chunk by chunk, checkpoint after every chunk"""
+
+        stats = AddMatchesStats()
+        while job.cursor < job.total:
+            chunk, offset = divmod(job.cursor, job.chunk_size)
+            job_chunk = await self.data.get_job_chunk(job.job_id, chunk)
+            if job_chunk is None:
+                raise ValueError(f"Job {job.job_id} has no chunk {chunk}")
 
-        await self.data.add_matches(matches_data)
-        return matches_data
+            codes = job_chunk.codes[offset:]
+            statuses = dict(zip(codes, job_chunk.statuses[offset:]))
+
+            batch_stats = await self.add_matches(codes, statuses, return_stats=True)
+            stats.merge(batch_stats)
+
+            job.cursor += len(codes)
+            await self.data.upsert_job(job, fields={"cursor"})
+
+        job.complete(BackfillStage.MATCHES)
+        await self.data.upsert_job(job, fields={"stages"})
+        return stats
+
+    async def run_backfill_job(
+        self,
+        job_id: str,
+        discover: Callable[[], Awaitable[list[MatchCodeSDM]]],
+    ) -> AddMatchesStats:
+        """
+        Run or resume checkpointed backfill job.
+        discover: coroutine function which collects match codes of the job.
+        It's called only once: discovered codes are stored with the job.
+        """
+
+        job = await self.load_job(job_id)
+        if not job.done(BackfillStage.DISCOVERY):
+            codes = await discover()
+            await self.save_job_codes(job, codes)
+        else:
+            print("Resume job", job_id, "from", job.cursor, "of", job.total)
+
+        return await self.add_job_matches(job)
 
     async def collect_current_matches(
         self,
@@ -433,10 +784,14 @@ class BaseManager(AbstractManager):
             codes_filter = MatchCodesFilter()
         codes_filter.allowed_statuses = allowed_statuses
 
-        codes = await self.week.scrape(FUTURE_DAYS)
-        codes = codes_filter.filter(codes) if codes_filter else codes
+        frontier = CodeFrontier()
+        await self.week.scrape_into(frontier, FUTURE_DAYS)
+        codes = codes_filter.filter(frontier)
 
-        tasks = [asyncio.create_task(self.scrape_match_data(mc.code)) for mc in codes]
+        tasks = [
+            asyncio.create_task(self.scrape_match_data(mc.code, mc.status))
+            for mc in codes
+        ]
         matches = await asyncio.gather(*tasks)
 
         ### make predictions
@@ -447,11 +802,52 @@ class BaseManager(AbstractManager):
 
         return matches
 
+    async def scrape_match(self, code: str, status: str | None = None) -> MatchSDM:
+        """FlashScore match data without odds (error match if scraping failed)"""
+
+        try:
+            match_data = await self.match.scrape(code, status)
+        except Exception as ex:
+            print("Exception at code", code, ex)
+            return MatchSDM(code=code, error=True, status=StatusCode.UNDEFINED)
+
+        if match_data.status is None:
+            match_data.status = StatusCode.UNDEFINED
+        return match_data
+
+    async def recollect_odds(self, matches: list[MatchSDM]) -> None:
+        """
+        Set odds of recollected matches. Odds pages are requested by one stream
+        with parsed statuses; pages unchanged since the last recollect are not
+        parsed, previous odds of current matches are kept for them
+        (and for codes whose odds failed).
+        """
+
+        statuses = {m.code: m.status for m in matches if not m.error}
+        odds = {}
+        async for match_odds in self.odds.scrape_many(
+            list(statuses),
+            statuses,
+            changed_only=True,
+        ):
+            odds[match_odds.code] = match_odds
+
+        skipped = [code for code in statuses if code not in odds]
+        if skipped:
+            previous = await self.data.get_current_matches(skipped) or []
+            odds.update({m.code: m.odds for m in previous})
+
+        for match in matches:
+            match.odds = odds.get(match.code)
+
     async def recollect_current_matches(self) -> list[MatchSDM]:
         current = await self.data.get_current_codes()
 
-        tasks = [asyncio.create_task(self.scrape_match_data(mc.code)) for mc in current]
+        tasks = [
+            asyncio.create_task(self.scrape_match(mc.code, mc.status)) for mc in current
+        ]
         recollected = await asyncio.gather(*tasks)
+        await self.recollect_odds(recollected)
 
         finished: list[MatchSDM] = []
         not_finished: list[MatchSDM] = []
@@ -469,16 +865,20 @@ class BaseManager(AbstractManager):
 
         ### add finished matches in matches
         await self.data.add_matches(finished)
+        await self.predictor_add_matches(finished)
 
         return not_finished
 
     async def update_matches_for_week(
         self,
         codes_filter: MatchCodesFilter | None,
-    ) -> list[MatchSDM]:
+        return_stats: bool = False,
+    ) -> list[MatchSDM] | AddMatchesStats | None:
         """
         Collect matches for the last week and add them to matches collection.
         Recommended to filter matches with StatusCode.finished_set.
+
+        return_stats: AddMatchesStats instead of list of matches (see add_matches)
         """
 
         allowed_statuses = StatusCode.finished_set
@@ -486,11 +886,14 @@ class BaseManager(AbstractManager):
             codes_filter = MatchCodesFilter()
         codes_filter.allowed_statuses = allowed_statuses
 
-        codes = await self.week.scrape(LAST_WEEK_DAYS)
-        codes = codes_filter.filter(codes) if codes_filter else codes
-        matches = await self.add_matches([mc.code for mc in codes])
-
-        return matches
+        frontier = CodeFrontier()
+        await self.week.scrape_into(frontier, LAST_WEEK_DAYS)
+        codes = codes_filter.filter(frontier)
+        return await self.add_matches(
+            [mc.code for mc in codes],
+            {mc.code: mc.status for mc in codes},
+            return_stats=return_stats,
+        )
 
     @abstractmethod
     async def update_matches_for_year(self) -> list[MatchSDM]:
@@ -534,17 +937,16 @@ class TournamentsManagerMixin(AbstractManager):
         if tournament_filter:
             by_year = tournament_filter.by_year_filter(by_year)
 
+        frontier = CodeFrontier()
         tasks = [
-            asyncio.create_task(self.tournament_matches.scrape(by.url))
+            asyncio.create_task(self.tournament_matches.scrape_into(frontier, by.url))
             for by in by_year
         ]
+        await asyncio.gather(*tasks)
 
-        codes = await asyncio.gather(*tasks)
-        codes = [c for sub in codes for c in sub]
         if codes_filter:
-            codes = codes_filter.filter()
-
-        return codes
+            return codes_filter.filter(frontier)
+        return frontier.select()
 
     async def collect_tournaments_matches(
         self,
@@ -552,26 +954,41 @@ class TournamentsManagerMixin(AbstractManager):
         limit: int | None = None,
         tournament_filter: TournamentFilter | None = None,
         codes_filter: MatchCodesFilter | None = None,
-    ):
+        job_id: str | None = None,
+        return_stats: bool = False,
+    ) -> list[MatchSDM] | AddMatchesStats | None:
         """
         Here we don't need prepared codes_filter to check match on finished feature.
         It's because we scrape tournament results - matches finished by default.
+
+        job_id: run as checkpointed backfill job (see run_backfill_job).
+        Discovered codes are stored once and re-run continues from the last batch.
+        Returns AddMatchesStats in that case.
+        return_stats: AddMatchesStats instead of list of matches (see add_matches)
         """
 
-        tournaments = await self.scrape_tournaments(
-            category_urls,
-            limit,
-            tournament_filter,
-        )
+        async def discover() -> list[MatchCodeSDM]:
+            tournaments = await self.scrape_tournaments(
+                category_urls,
+                limit,
+                tournament_filter,
+            )
 
-        codes = await self.scrape_tournaments_by_year(
-            tournaments,
-            tournament_filter,
-            codes_filter,
-        )
+            return await self.scrape_tournaments_by_year(
+                tournaments,
+                tournament_filter,
+                codes_filter,
+            )
 
-        matches = await self.add_matches([c.code for c in codes])
-        return matches
+        if job_id is not None:
+            return await self.run_backfill_job(job_id, discover)
+
+        codes = await discover()
+        return await self.add_matches(
+            [c.code for c in codes],
+            {c.code: c.status for c in codes},
+            return_stats=return_stats,
+        )
 
 
 class PlayersManagerMixin(AbstractManager):
@@ -601,16 +1018,21 @@ class PlayersManagerMixin(AbstractManager):
         page_limit: int,
         codes_filter: MatchCodesFilter | None = None,
     ) -> list[MatchCodeSDM]:
+        frontier = CodeFrontier()
         tasks = [
-            asyncio.create_task(self.player_matches.scrape(p, page_limit))
+            asyncio.create_task(
+                self.player_matches.scrape_into(frontier, p, page_limit)
+            )
             for p in players
         ]
 
         print("Scrape match codes from players:", len(players))
-        codes = await tqdm_asyncio.gather(*tasks)
-        codes = [c for sub in codes for c in sub]
-        codes = codes_filter.filter(codes)
-        return codes
+        await tqdm_asyncio.gather(*tasks)
+        print("Unique match codes:", len(frontier), "duplicates:", frontier.duplicates)
+
+        if codes_filter:
+            return codes_filter.filter(frontier)
+        return frontier.select()
 
     async def collect_players_matches(
         self,
@@ -618,19 +1040,34 @@ class PlayersManagerMixin(AbstractManager):
         page_limit: int = 20,
         player_filter: PlayerFilter | None = None,
         codes_filter: MatchCodesFilter | None = None,
-    ) -> list[MatchSDM]:
+        job_id: str | None = None,
+        return_stats: bool = False,
+    ) -> list[MatchSDM] | AddMatchesStats | None:
         """
-        Here we need prepared codes_filter to get rid of dups along players codes.
-        But we don't need to check match status on finished feature.
+        Dups along players codes are dropped by CodeFrontier while scraping.
+        We don't need to check match status on finished feature.
         It's because we scrape player results - matches finished by default.
+
+        job_id: run as checkpointed backfill job (see run_backfill_job).
+        Discovered codes are stored once and re-run continues from the last batch.
+        Returns AddMatchesStats in that case.
+        return_stats: AddMatchesStats instead of list of matches (see add_matches)
         """
 
-        ### we use MatchCodesFilter to get rid of dups along players codes
-        if not codes_filter:
-            codes_filter = MatchCodesFilter()
+        async def discover() -> list[MatchCodeSDM]:
+            players = await self.scrape_players(rank_urls, player_filter)
+            return await self.scrape_players_match_codes(
+                players,
+                page_limit,
+                codes_filter,
+            )
 
-        players = await self.scrape_players(rank_urls, player_filter)
-        codes = await self.scrape_players_match_codes(players, page_limit, codes_filter)
+        if job_id is not None:
+            return await self.run_backfill_job(job_id, discover)
 
-        matches = await self.add_matches([mc.code for mc in codes])
-        return matches
+        codes = await discover()
+        return await self.add_matches(
+            [mc.code for mc in codes],
+            {mc.code: mc.status for mc in codes},
+            return_stats=return_stats,
+        )
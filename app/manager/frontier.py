@@ -0,0 +1,168 @@
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable, Mapping
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from model.service import MatchCodeSDM, MatchCodeRecord, TournamentNameParsed
+
+
+TOURNAMENT_FIELDS = set(TournamentNameParsed.model_fields)
+
+
+class CodeFrontier:
+    """
+    Columnar set of discovered match codes.
+    Codes are deduplicated on insert (first seen wins), statuses and tournaments
+    are stored as integer ids, so filtering is a few numpy masks over columns.
+    MatchCodeSDM objects are built only for selected rows.
+    """
+
+    def __init__(self) -> None:
+        self.index: dict[str, int] = {}
+        self.codes: list[str] = []
+        self.dates = array("q")
+        self.status_ids = array("l")
+        self.tournament_ids = array("l")
+
+        self.statuses: dict[str, int] = {}
+        self.categories: dict[str | None, int] = {}
+        self.tournaments: dict[str, int] = {}
+        self.tournament_fields: list[Mapping] = []
+        self.tournament_categories = array("l")
+
+        self.duplicates = 0
+        self._columns: dict[str, np.ndarray] | None = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.index
+
+    def intern(self, ids: dict, value) -> int:
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = len(ids)
+            ids[value] = value_id
+        return value_id
+
+    def tournament_id(self, tournament: Mapping) -> int:
+        fullname = tournament["tournament_fullname"]
+        tournament_id = self.tournaments.get(fullname)
+        if tournament_id is None:
+            tournament_id = len(self.tournament_fields)
+            self.tournaments[fullname] = tournament_id
+            self.tournament_fields.append(tournament)
+
+            category = tournament.get("tournament_category")
+            self.tournament_categories.append(self.intern(self.categories, category))
+        return tournament_id
+
+    def add(self, code: str, date: int, status: str, tournament: Mapping) -> bool:
+        """Add match code, return False if code is already known"""
+
+        if code in self.index:
+            self.duplicates += 1
+            return False
+
+        self.index[code] = len(self.codes)
+        self.codes.append(code)
+        self.dates.append(date)
+        self.status_ids.append(self.intern(self.statuses, status))
+        self.tournament_ids.append(self.tournament_id(tournament))
+
+        self._columns = None
+        return True
+
+    def add_records(self, records: Iterable[MatchCodeRecord]) -> int:
+        """Add parsed records, return count of new codes"""
+
+        added = 0
+        for record in records:
+            added += self.add(
+                record.code, record.date, record.status, record.tournament
+            )
+        return added
+
+    def add_codes(self, match_codes: Iterable[MatchCodeSDM | MatchCodeRecord]) -> int:
+        added = 0
+        for mc in match_codes:
+            if isinstance(mc, MatchCodeRecord):
+                added += self.add(mc.code, mc.date, mc.status, mc.tournament)
+                continue
+
+            if mc.code in self.index:
+                self.duplicates += 1
+                continue
+
+            tournament_id = self.tournaments.get(mc.tournament_fullname)
+            if tournament_id is None:
+                tournament = mc.model_dump(include=TOURNAMENT_FIELDS)
+            else:
+                tournament = self.tournament_fields[tournament_id]
+            added += self.add(mc.code, mc.date, mc.status, tournament)
+        return added
+
+    def columns(self) -> dict[str, np.ndarray]:
+        if self._columns is None:
+            tournament_ids = np.array(self.tournament_ids, dtype=np.int64)
+            categories = np.array(self.tournament_categories, dtype=np.int64)
+            self._columns = {
+                "date": np.array(self.dates, dtype=np.int64),
+                "status": np.array(self.status_ids, dtype=np.int64),
+                "category": categories[tournament_ids],
+            }
+        return self._columns
+
+    def isin(self, column: str, ids: dict, values: Iterable) -> np.ndarray:
+        """Mask of rows whose column value is one of values"""
+
+        wanted = [ids[v] for v in values if v in ids]
+        return np.isin(self.columns()[column], wanted)
+
+    def mask(
+        self,
+        min_date: int | None = None,
+        max_date: int | None = None,
+        allowed_categories: set[str] = set(),
+        disallowed_categories: set[str] = set(),
+        allowed_statuses: set[str] = set(),
+        disallowed_statuses: set[str] = set(),
+    ) -> np.ndarray:
+        columns = self.columns()
+        mask = np.ones(len(self), dtype=bool)
+
+        if min_date:
+            mask &= columns["date"] >= min_date
+        if max_date:
+            mask &= columns["date"] <= max_date
+        if allowed_categories:
+            mask &= self.isin("category", self.categories, allowed_categories)
+        if disallowed_categories:
+            mask &= ~self.isin("category", self.categories, disallowed_categories)
+        if allowed_statuses:
+            mask &= self.isin("status", self.statuses, allowed_statuses)
+        if disallowed_statuses:
+            mask &= ~self.isin("status", self.statuses, disallowed_statuses)
+
+        return mask
+
+    def select(self, mask: np.ndarray | None = None) -> list[MatchCodeSDM]:
+        """Build MatchCodeSDM of selected rows (all rows if mask is None)"""
+
+        rows = range(len(self)) if mask is None else np.flatnonzero(mask).tolist()
+        statuses = list(self.statuses)
+
+        return [
+            MatchCodeSDM(
+                **self.tournament_fields[self.tournament_ids[row]],
+                code=self.codes[row],
+                date=self.dates[row],
+                status=statuses[self.status_ids[row]],
+            )
+            for row in rows
+        ]
@@ -1,6 +1,8 @@
 import re
 import sys
+import asyncio
 from pathlib import Path
+from typing import AsyncIterator
 from abc import ABC, abstractmethod
 from pydantic import BaseModel
 
@@ -17,6 +19,7 @@ from model.service import (
     RankSDM,
     TennisPlayerDataSDM,
 )
+from manager.frontier import CodeFrontier
 
 
 class SportType(BaseModel):
@@ -25,7 +28,6 @@ class SportType(BaseModel):
     prefix: str
     week_prefix: str
     stat_prefix: str
-    stat_splitter: str
     odds_type: OddsType
 
     tennis_explorer: str | None = None
@@ -46,7 +48,6 @@ class SPORT:
         prefix="pr_1",
         week_prefix="f_1",
         stat_prefix="st",
-        stat_splitter="¬SG÷",
         odds_type=OddsType.ODDS_1x2,
     )
 
@@ -56,7 +57,6 @@ class SPORT:
         prefix="pr_2",
         week_prefix="f_2",
         stat_prefix="st",
-        stat_splitter="¬~SG÷",
         odds_type=OddsType.ODDS_HA,
         tennis_explorer="https://www.tennisexplorer.com/ranking/atp-men/",
     )
@@ -67,7 +67,6 @@ class SPORT:
         prefix="pr_2",
         week_prefix="f_2",
         stat_prefix="st",
-        stat_splitter="¬~SG÷",
         odds_type=OddsType.ODDS_HA,
         tennis_explorer="https://www.tennisexplorer.com/ranking/wta-women/",
     )
@@ -78,7 +77,6 @@ class SPORT:
         prefix="pr_3",
         week_prefix="f_3",
         stat_prefix="st",
-        stat_splitter="¬~SG÷",
         odds_type=OddsType.ODDS_1x2,
     )
 
@@ -88,7 +86,6 @@ class SPORT:
         prefix="pr_4",
         week_prefix="f_4",
         stat_prefix="st",
-        stat_splitter="¬~SG÷",
         odds_type=OddsType.ODDS_1x2,
     )
 
@@ -108,13 +105,48 @@ class BetExplorerScraperInterface(ScraperInterface, ABC):
         pass
 
     @abstractmethod
-    async def scrape(self, code: str) -> MatchOddsHASDM | MatchOdds1x2SDM:
+    async def scrape(
+        self,
+        code: str,
+        status: str | None = None,
+        changed_only: bool = False,
+    ) -> MatchOddsHASDM | MatchOdds1x2SDM | None:
+        """changed_only: None if odds page is the same as at last scrape of code"""
         pass
 
+    async def scrape_many(
+        self,
+        codes: list[str],
+        statuses: dict[str, str] | None = None,
+        changed_only: bool = False,
+    ) -> AsyncIterator[MatchOddsHASDM | MatchOdds1x2SDM]:
+        """
+        Stream odds of unique codes as they are scraped.
+        Unchanged (changed_only) and failed codes are skipped.
+        """
+
+        statuses = statuses or {}
+        tasks = [
+            asyncio.create_task(self.scrape(code, statuses.get(code), changed_only))
+            for code in dict.fromkeys(codes)
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                try:
+                    odds = await task
+                except Exception as ex:
+                    print("Exception at odds", ex)
+                    continue
+                if odds is not None:
+                    yield odds
+        finally:
+            for task in tasks:
+                task.cancel()
+
 
 class FlashScoreMatchScraperInterface(ScraperInterface, ABC):
     @abstractmethod
-    async def scrape(self, code: str) -> MatchSDM:
+    async def scrape(self, code: str, status: str | None = None) -> MatchSDM:
         pass
 
 
@@ -129,6 +161,15 @@ class FlashScorePlayerMatchesScraperInterface(ScraperInterface, ABC):
     async def scrape(self, player: PlayerSDM, page_limit: int) -> list[MatchCodeSDM]:
         pass
 
+    async def scrape_into(
+        self,
+        frontier: CodeFrontier,
+        player: PlayerSDM,
+        page_limit: int,
+    ) -> int:
+        """Add player match codes to frontier, return count of new codes"""
+        return frontier.add_codes(await self.scrape(player, page_limit))
+
 
 class FlashScoreTournamentScraperInterface(ScraperInterface, ABC):
     @abstractmethod
@@ -143,12 +184,20 @@ class FlashScoreTournamentMatchesScraperIntefrace(ScraperInterface, ABC):
     async def scrape(self, url: str) -> list[MatchCodeSDM]:
         pass
 
+    async def scrape_into(self, frontier: CodeFrontier, url: str) -> int:
+        """Add tournament match codes to frontier, return count of new codes"""
+        return frontier.add_codes(await self.scrape(url))
+
 
 class FlashScoreWeeklyMatchesScraper(ScraperInterface, ABC):
     @abstractmethod
     async def scrape(self, days: list[int]) -> list[MatchCodeSDM]:
         pass
 
+    async def scrape_into(self, frontier: CodeFrontier, days: list[int]) -> int:
+        """Add match codes of days to frontier, return count of new codes"""
+        return frontier.add_codes(await self.scrape(days))
+
 
 class TennisExplorerRankDatesScraperInterface(ScraperInterface, ABC):
     @abstractmethod
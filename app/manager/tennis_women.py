@@ -48,8 +48,11 @@ class TennisWomenManager(
         player: FlashScorePlayerScraperInterface,
         player_matches: FlashScorePlayerMatchesScraperInterface,
         predictor: BasePredictorInterface,
+        concurrent_scrape: bool = False,
     ) -> None:
-        BaseManager.__init__(self, sport, data, match, week, odds, predictor)
+        BaseManager.__init__(
+            self, sport, data, match, week, odds, predictor, concurrent_scrape
+        )
         TournamentsManagerMixin.__init__(self, tournament, tournament_matches)
         PlayersManagerMixin.__init__(self, player, player_matches)
 
@@ -0,0 +1,90 @@
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from manager.service import SPORT
+from manager.tennis_men import TennisMenManager
+from ml.tennis_men.standard import StandardTennisMenMLPredictor
+
+## dependencies
+from data.tennis_men import TennisMenData
+from db.api.tennis_men import TennisMenRepository
+from service.base_scraper import ScraperSession
+from service.replay import ResponseArchive, ReplayTransport, ReplayServer
+from service.flashscore.scraper.match import MatchScraper
+from service.flashscore.scraper.tournament import TournamentScraper
+from service.flashscore.scraper.tournament import TournamentMatchesScraper
+from service.flashscore.scraper.player import PlayerScraper
+from service.flashscore.scraper.player import PlayerMatchesScaper
+from service.flashscore.scraper.week import WeeklyMatchesScraper
+from service.betexplorer.scraper import BetExplorerScraper
+
+
+ARCHIVE_PATH = Path(__file__).parent / "replay_responses.sqlite"
+
+
+def get_manager(session: ScraperSession) -> TennisMenManager:
+    sport = SPORT.TENNIS_MEN
+    db = TennisMenRepository()
+    data = TennisMenData(db)
+    return TennisMenManager(
+        sport=sport,
+        data=data,
+        match=MatchScraper(sport, session=session),
+        week=WeeklyMatchesScraper(sport, session=session),
+        odds=BetExplorerScraper(sport, session=session),
+        tournament=TournamentScraper(sport, session=session),
+        tournament_matches=TournamentMatchesScraper(sport, session=session),
+        player=PlayerScraper(sport, session=session),
+        player_matches=PlayerMatchesScaper(sport, session=session),
+        predictor=StandardTennisMenMLPredictor(data=data),
+        concurrent_scrape=True,
+    )
+
+
+async def record_test():
+    """Run against live sites once, every response goes to archive"""
+
+    with ResponseArchive(ARCHIVE_PATH) as archive:
+        async with ScraperSession(archive=archive) as session:
+            manager = get_manager(session)
+            await manager.collect_current_matches(None)
+
+        print(f"Recorded {len(archive)} responses")
+
+
+async def replay_test():
+    with ResponseArchive(ARCHIVE_PATH) as archive:
+        transport = ReplayTransport(archive, latency=0.05, jitter=0.05)
+        async with ScraperSession(transport=transport) as session:
+            manager = get_manager(session)
+
+            start = time.perf_counter()
+            await manager.collect_current_matches(None)
+            print(f"collect_current_matches: {time.perf_counter() - start:.2f}s")
+
+            start = time.perf_counter()
+            await manager.recollect_current_matches()
+            print(f"recollect_current_matches: {time.perf_counter() - start:.2f}s")
+
+        print(f"hits {transport.hits}, misses {transport.misses}")
+
+
+async def replay_server_test():
+    with ResponseArchive(ARCHIVE_PATH) as archive:
+        async with ReplayServer(archive, latency=0.05, error_rate=0.01) as server:
+            async with ScraperSession(transport=server.transport()) as session:
+                manager = get_manager(session)
+
+                start = time.perf_counter()
+                await manager.collect_current_matches(None)
+                print(f"collect_current_matches: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    # asyncio.run(record_test())
+    asyncio.run(replay_test())
+    # asyncio.run(replay_server_test())
@@ -79,8 +79,8 @@ async def update_matches_for_week_test():
         allowed_statuses=StatusCode.finished_set,
     )
 
-    week_matches = await manager.update_matches_for_week(filter)
-    print(len(week_matches))
+    stats = await manager.update_matches_for_week(filter, return_stats=True)
+    print(stats)
 
 
 async def collect_tournaments_matches_test():
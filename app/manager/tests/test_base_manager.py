@@ -0,0 +1,412 @@
+import sys
+import asyncio
+from pathlib import Path
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from model.domain import MatchStatusDTO, BackfillJobDTO, BackfillJobChunkDTO
+from model.service import MatchSDM, MatchOddsHASDM, OddsType, MatchCodeSDM
+from manager.base import BaseManager, AddMatchesStats, BackfillStage
+from manager.service import SPORT, StatusCode
+from manager.frontier import CodeFrontier
+
+
+class FakeMatchScraper:
+    def __init__(self, fail: bool = False, delay: float = 0) -> None:
+        self.fail = fail
+        self.delay = delay
+
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def scrape(self, code: str, status: str | None = None) -> MatchSDM:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+        if self.fail:
+            raise ValueError("match scraper failed")
+        return MatchSDM(code=code, status=StatusCode.get("3"))
+
+
+class FakeOddsScraper:
+    def __init__(
+        self,
+        fail: bool = False,
+        delay: float = 0,
+        unchanged: set[str] = set(),
+    ) -> None:
+        self.fail = fail
+        self.delay = delay
+        self.unchanged = unchanged
+        self.statuses: dict[str, str | None] = {}
+
+    async def scrape(
+        self,
+        code: str,
+        status: str | None = None,
+        changed_only: bool = False,
+    ) -> MatchOddsHASDM | None:
+        self.statuses[code] = status
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ValueError("odds scraper failed")
+        if changed_only and code in self.unchanged:
+            return None
+        return MatchOddsHASDM(code=code, odds_type=OddsType.ODDS_HA)
+
+    async def scrape_many(
+        self,
+        codes: list[str],
+        statuses: dict[str, str] | None = None,
+        changed_only: bool = False,
+    ):
+        for code in codes:
+            odds = await self.scrape(code, (statuses or {}).get(code), changed_only)
+            if odds is not None:
+                yield odds
+
+
+class FakeData:
+    def __init__(
+        self,
+        codes: list[str] = [],
+        current: list[MatchSDM] = [],
+    ) -> None:
+        self.codes = set(codes)
+        self.current = {m.code: m for m in current}
+        self.batches: list[list[MatchSDM]] = []
+        self.jobs: dict[str, dict] = {}
+        self.job_chunks: dict[str, list[dict]] = {}
+
+    async def find_codes(self, codes: list[str]) -> list[MatchStatusDTO]:
+        return [
+            MatchStatusDTO(code=c, status=StatusCode.get("3"), error=False)
+            for c in codes
+            if c in self.codes
+        ]
+
+    async def add_matches(self, matches: list[MatchSDM]) -> None:
+        self.batches.append(matches)
+        self.codes.update(m.code for m in matches)
+
+    async def get_current_codes(self) -> list[MatchStatusDTO]:
+        return [
+            MatchStatusDTO(code=m.code, status=m.status, error=m.error)
+            for m in self.current.values()
+        ]
+
+    async def get_current_matches(self, codes: list[str]) -> list[MatchSDM]:
+        return [self.current[c] for c in codes if c in self.current]
+
+    async def upsert_current_matches(self, matches: list[MatchSDM]) -> None:
+        self.current.update({m.code: m for m in matches})
+
+    async def delete_current_matches(self, codes: list[str]) -> None:
+        for code in codes:
+            self.current.pop(code, None)
+
+    async def get_job(self, job_id: str) -> BackfillJobDTO | None:
+        job = self.jobs.get(job_id)
+        return BackfillJobDTO(**job) if job else None
+
+    async def upsert_job(
+        self,
+        job: BackfillJobDTO,
+        fields: set[str] | None = None,
+    ) -> None:
+        stored = self.jobs.setdefault(job.job_id, {"job_id": job.job_id})
+        stored.update(job.model_dump(include=fields, exclude={"id"}))
+
+    async def get_job_chunk(
+        self,
+        job_id: str,
+        chunk: int,
+    ) -> BackfillJobChunkDTO | None:
+        chunks = self.job_chunks.get(job_id, [])
+        return BackfillJobChunkDTO(**chunks[chunk]) if chunk < len(chunks) else None
+
+    async def save_job_chunks(
+        self,
+        job_id: str,
+        chunks: list[BackfillJobChunkDTO],
+    ) -> None:
+        self.job_chunks[job_id] = [c.model_dump(exclude={"id"}) for c in chunks]
+
+
+class LocalManager(BaseManager):
+    async def update_matches_for_year(self) -> list[MatchSDM]:
+        raise NotImplementedError()
+
+
+def get_manager(
+    match: FakeMatchScraper,
+    odds: FakeOddsScraper,
+    concurrent_scrape: bool = False,
+    data: FakeData | None = None,
+    week: "FakeWeekScraper | None" = None,
+) -> LocalManager:
+    return LocalManager(
+        sport=SPORT.TENNIS_MEN,
+        data=data,
+        match=match,
+        week=week,
+        odds=odds,
+        predictor=None,
+        concurrent_scrape=concurrent_scrape,
+    )
+
+
+class ScrapeMatchDataBaseTest:
+    concurrent_scrape = False
+
+    @pytest.mark.asyncio
+    async def test_match_with_odds(self):
+        manager = get_manager(
+            FakeMatchScraper(),
+            FakeOddsScraper(),
+            self.concurrent_scrape,
+        )
+        match = await manager.scrape_match_data("K831uSar")
+
+        assert match.error is False
+        assert match.status == StatusCode.get("3")
+        assert match.odds is not None
+
+    @pytest.mark.asyncio
+    async def test_failed_odds(self):
+        manager = get_manager(
+            FakeMatchScraper(),
+            FakeOddsScraper(fail=True),
+            self.concurrent_scrape,
+        )
+        match = await manager.scrape_match_data("K831uSar")
+
+        assert match.error is False
+        assert match.status == StatusCode.get("3")
+        assert match.odds is None
+
+    @pytest.mark.asyncio
+    async def test_failed_match(self):
+        manager = get_manager(
+            FakeMatchScraper(fail=True),
+            FakeOddsScraper(),
+            self.concurrent_scrape,
+        )
+        match = await manager.scrape_match_data("K831uSar")
+
+        assert match.error is True
+        assert match.status == StatusCode.UNDEFINED
+        assert match.odds is None
+
+
+class TestScrapeMatchDataSequential(ScrapeMatchDataBaseTest):
+    concurrent_scrape = False
+
+
+class TestScrapeMatchDataConcurrent(ScrapeMatchDataBaseTest):
+    concurrent_scrape = True
+
+    @pytest.mark.asyncio
+    async def test_sources_overlap(self):
+        manager = get_manager(
+            FakeMatchScraper(delay=0.2),
+            FakeOddsScraper(delay=0.2),
+            self.concurrent_scrape,
+        )
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await manager.scrape_match_data("K831uSar", StatusCode.get("3"))
+
+        assert loop.time() - start < 0.35
+
+    @pytest.mark.asyncio
+    async def test_stale_status(self):
+        odds = FakeOddsScraper()
+        manager = get_manager(FakeMatchScraper(), odds, self.concurrent_scrape)
+
+        match = await manager.scrape_match_data("K831uSar", StatusCode.get("2"))
+
+        ### match finished since discovery: odds are scraped with parsed status
+        assert odds.statuses == {"K831uSar": StatusCode.get("3")}
+        assert match.odds is not None
+
+    @pytest.mark.asyncio
+    async def test_cancelled(self):
+        class CancelledMatchScraper(FakeMatchScraper):
+            async def scrape(self, code: str, status: str | None = None) -> MatchSDM:
+                raise asyncio.CancelledError()
+
+        manager = get_manager(
+            CancelledMatchScraper(),
+            FakeOddsScraper(),
+            self.concurrent_scrape,
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            await manager.scrape_match_data("K831uSar")
+
+
+class TestAddMatches:
+    @pytest.mark.asyncio
+    async def test_batches(self):
+        data = FakeData(codes=["code0", "code1"])
+        match = FakeMatchScraper(delay=0.001)
+        manager = get_manager(match, FakeOddsScraper(), data=data)
+
+        codes = [f"code{i}" for i in range(25)]
+        stats = await manager.add_matches(
+            codes,
+            return_stats=True,
+            workers=4,
+            batch_size=10,
+        )
+
+        assert stats == AddMatchesStats(
+            requested=25,
+            skipped=2,
+            scraped=23,
+            errors=0,
+            stored=23,
+            batches=3,
+        )
+        assert [len(b) for b in data.batches] == [10, 10, 3]
+        assert match.max_in_flight <= 4
+
+    @pytest.mark.asyncio
+    async def test_return_matches(self):
+        data = FakeData()
+        manager = get_manager(FakeMatchScraper(fail=True), FakeOddsScraper(), data=data)
+
+        matches = await manager.add_matches(["code0", "code1", "code1"])
+
+        assert sorted(m.code for m in matches) == ["code0", "code1"]
+        assert all(m.error for m in matches)
+        assert len(data.batches) == 1
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_add(self):
+        data = FakeData(codes=["code0"])
+        manager = get_manager(FakeMatchScraper(), FakeOddsScraper(), data=data)
+
+        assert await manager.add_matches(["code0"]) is None
+        assert data.batches == []
+
+
+class TestRecollectCurrentMatches:
+    @pytest.mark.asyncio
+    async def test_unchanged_odds_kept(self):
+        live = StatusCode.get("2")
+        previous = MatchOddsHASDM(code="code0", odds_type=OddsType.ODDS_HA, error=True)
+        data = FakeData(
+            current=[
+                MatchSDM(code="code0", status=live, odds=previous),
+                MatchSDM(code="code1", status=live),
+            ]
+        )
+        odds = FakeOddsScraper(unchanged={"code0"})
+        manager = get_manager(FakeMatchScraper(), odds, data=data)
+
+        await manager.recollect_current_matches()
+
+        ### odds are requested with just parsed status, not the stale one
+        assert odds.statuses == {
+            "code0": StatusCode.get("3"),
+            "code1": StatusCode.get("3"),
+        }
+        matches = {m.code: m for m in data.batches[0]}
+        assert matches["code0"].odds == previous
+        assert matches["code1"].odds.error is False
+        assert data.current == {}
+
+
+def get_codes(count: int) -> list[MatchCodeSDM]:
+    return [
+        MatchCodeSDM(
+            tournament_fullname="ATP - SINGLES: Wimbledon (United Kingdom), grass",
+            date=1689512400,
+            code=f"code{i}",
+            status=StatusCode.get("3"),
+        )
+        for i in range(count)
+    ]
+
+
+class FakeWeekScraper:
+    async def scrape_into(self, frontier: CodeFrontier, days: list[int]) -> int:
+        return frontier.add_codes(get_codes(3))
+
+
+class TestUpdateMatchesForWeek:
+    @pytest.mark.asyncio
+    async def test_return_matches(self):
+        manager = get_manager(
+            FakeMatchScraper(),
+            FakeOddsScraper(),
+            data=FakeData(),
+            week=FakeWeekScraper(),
+        )
+
+        matches = await manager.update_matches_for_week(None)
+
+        assert sorted(m.code for m in matches) == ["code0", "code1", "code2"]
+
+    @pytest.mark.asyncio
+    async def test_return_stats(self):
+        data = FakeData(codes=["code0"])
+        manager = get_manager(
+            FakeMatchScraper(), FakeOddsScraper(), data=data, week=FakeWeekScraper()
+        )
+
+        stats = await manager.update_matches_for_week(None, return_stats=True)
+
+        assert (stats.requested, stats.skipped, stats.stored) == (3, 1, 2)
+
+
+class TestBackfillJob:
+    @pytest.mark.asyncio
+    async def test_new_job(self):
+        data = FakeData()
+        manager = get_manager(FakeMatchScraper(), FakeOddsScraper(), data=data)
+        manager.JOB_BATCH_SIZE = 4
+
+        async def discover() -> list[MatchCodeSDM]:
+            return get_codes(10)
+
+        stats = await manager.run_backfill_job("players", discover)
+
+        assert stats.stored == 10
+        assert data.jobs["players"]["cursor"] == 10
+        assert data.jobs["players"]["total"] == 10
+        ### frontier is stored by chunks, not in job document
+        assert "codes" not in data.jobs["players"]
+        assert [len(c["codes"]) for c in data.job_chunks["players"]] == [4, 4, 2]
+        assert [len(b) for b in data.batches] == [4, 4, 2]
+        assert data.jobs["players"]["stages"] == [
+            BackfillStage.DISCOVERY,
+            BackfillStage.MATCHES,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_resume_job(self):
+        data = FakeData()
+        manager = get_manager(FakeMatchScraper(), FakeOddsScraper(), data=data)
+        manager.JOB_BATCH_SIZE = 4
+
+        await manager.save_job_codes(BackfillJobDTO(job_id="players"), get_codes(10))
+        ### interrupted in the middle of the last chunk
+        job = await data.get_job("players")
+        job.cursor = 9
+        await data.upsert_job(job, fields={"cursor"})
+
+        async def discover() -> list[MatchCodeSDM]:
+            raise AssertionError("discovery must not be repeated")
+
+        stats = await manager.run_backfill_job("players", discover)
+
+        assert stats.requested == 1
+        assert {m.code for b in data.batches for m in b} == {"code9"}
+        assert data.jobs["players"]["cursor"] == 10
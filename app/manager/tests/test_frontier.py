@@ -0,0 +1,158 @@
+import sys
+import random
+from pathlib import Path
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from model.service import MatchCodeSDM, TournamentByYearUrlSDM, TournamentSDM
+from manager.base import BaseManager, MatchCodesFilter, TournamentsManagerMixin
+from manager.frontier import CodeFrontier
+from manager.service import (
+    SPORT,
+    StatusCode,
+    FlashScoreTournamentMatchesScraperIntefrace,
+)
+
+
+CATEGORIES = ["ATP - SINGLES", "ATP - DOUBLES", "CHALLENGER MEN - SINGLES", None]
+STATUSES = [StatusCode.get(s) for s in ("1", "3", "8", "54")]
+
+
+def match_code(code: str, date: int, status: str, category: str | None):
+    fullname = f"{category}: Tournament {category} - Final"
+    return MatchCodeSDM(
+        tournament_fullname=fullname,
+        tournament_category=category,
+        tournament_name=f"Tournament {category}",
+        tournament_stage="Final",
+        code=code,
+        date=date,
+        status=status,
+    )
+
+
+def random_codes(count: int, unique: int, seed: int = 0) -> list[MatchCodeSDM]:
+    rnd = random.Random(seed)
+    codes = []
+    for _ in range(count):
+        i = rnd.randrange(unique)
+        ### same code always has same data
+        item = random.Random(i)
+        codes.append(
+            match_code(
+                f"code{i}",
+                item.randrange(1_600_000_000, 1_700_000_000),
+                item.choice(STATUSES),
+                item.choice(CATEGORIES),
+            )
+        )
+    return codes
+
+
+def passes(f: MatchCodesFilter, mc: MatchCodeSDM) -> bool:
+    """Per-object reference of MatchCodesFilter"""
+
+    if f.min_date and mc.date < f.min_date:
+        return False
+    if f.max_date and mc.date > f.max_date:
+        return False
+    if f.allowed_categories and mc.tournament_category not in f.allowed_categories:
+        return False
+    if f.disallowed_categories and mc.tournament_category in f.disallowed_categories:
+        return False
+    if f.allowed_statuses and mc.status not in f.allowed_statuses:
+        return False
+    if f.disallowed_statuses and mc.status in f.disallowed_statuses:
+        return False
+    return True
+
+
+class FakeTournamentMatchesScraper(FlashScoreTournamentMatchesScraperIntefrace):
+    def __init__(self, codes: dict[str, list[MatchCodeSDM]]) -> None:
+        super().__init__(SPORT.TENNIS_MEN)
+        self.codes = codes
+
+    async def scrape(self, url: str) -> list[MatchCodeSDM]:
+        return self.codes[url]
+
+
+class LocalTournamentsManager(TournamentsManagerMixin, BaseManager):
+    async def update_matches_for_year(self):
+        raise NotImplementedError()
+
+
+class TestCodeFrontier:
+    def test_dedup(self):
+        codes = random_codes(1000, 100)
+        frontier = CodeFrontier()
+
+        assert frontier.add_codes(codes) == len(set(codes))
+        assert frontier.duplicates == 1000 - len(frontier)
+
+        selected = frontier.select()
+        assert [mc.code for mc in selected] == list(
+            dict.fromkeys(c.code for c in codes)
+        )
+        assert selected[0] == codes[0]
+        assert selected[0].model_dump() == codes[0].model_dump()
+
+    @pytest.mark.parametrize(
+        "codes_filter",
+        [
+            MatchCodesFilter(),
+            MatchCodesFilter(min_date=1_650_000_000, max_date=1_680_000_000),
+            MatchCodesFilter(allowed_categories=["ATP - SINGLES", "UNKNOWN"]),
+            MatchCodesFilter(disallowed_categories=["ATP - DOUBLES"]),
+            MatchCodesFilter(allowed_statuses=StatusCode.finished_set),
+            MatchCodesFilter(
+                min_date=1_620_000_000,
+                disallowed_statuses=[StatusCode.get("1")],
+                disallowed_categories=["CHALLENGER MEN - SINGLES"],
+            ),
+        ],
+    )
+    def test_filter_matches_reference(self, codes_filter: MatchCodesFilter):
+        codes = random_codes(2000, 500)
+
+        expected = list({mc.code: mc for mc in codes if passes(codes_filter, mc)})
+        filtered = codes_filter.filter(codes)
+
+        assert [mc.code for mc in filtered] == sorted(
+            expected, key=[c.code for c in codes].index
+        )
+
+    def test_empty(self):
+        frontier = CodeFrontier()
+        assert frontier.select(frontier.mask(allowed_statuses={"x"})) == []
+
+
+class TestScrapeTournamentsByYear:
+    @pytest.mark.asyncio
+    async def test_filtered(self):
+        codes = random_codes(300, 120)
+        scraper = FakeTournamentMatchesScraper(
+            {"2023": codes[:200], "2024": codes[150:]}
+        )
+        manager = LocalTournamentsManager(None, scraper)
+
+        tournament = TournamentSDM(
+            category="ATP",
+            name="Wimbledon",
+            archive_link="",
+            by_year_urls=[
+                TournamentByYearUrlSDM(url="2023"),
+                TournamentByYearUrlSDM(url="2024"),
+            ],
+        )
+        codes_filter = MatchCodesFilter(allowed_categories=["ATP - SINGLES"])
+
+        filtered = await manager.scrape_tournaments_by_year(
+            [tournament], None, codes_filter
+        )
+        unfiltered = await manager.scrape_tournaments_by_year([tournament], None)
+
+        assert len(unfiltered) == len(set(codes))
+        assert {mc.code for mc in filtered} == {
+            mc.code for mc in codes if mc.tournament_category == "ATP - SINGLES"
+        }
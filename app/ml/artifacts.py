@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+from pathlib import Path
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from settings import settings
+
+
+### artifact name -> it's a series (index of names) or a frame (columns of names)
+NA_FILLER = "na_filler"
+PREPROCESSED_FEATURES = "preprocessed_features"
+SERIES_ARTIFACTS = {NA_FILLER}
+
+
+class ArtifactStore(ABC):
+    """Numeric tables of StandardML kept in DIST_DIR by name"""
+
+    def __init__(self, dist_dir: Path) -> None:
+        self.dist_dir = Path(dist_dir)
+
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        pass
+
+    @abstractmethod
+    def save_frame(self, name: str, frame: pd.DataFrame) -> None:
+        pass
+
+    @abstractmethod
+    def load_frame(self, name: str) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def save_series(self, name: str, series: pd.Series) -> None:
+        pass
+
+    @abstractmethod
+    def load_series(self, name: str) -> pd.Series:
+        pass
+
+
+class NpyArtifactStore(ArtifactStore):
+    """
+    <name>.npy float64 values with <name>.json manifest of columns/index.
+    Values are read memory-mapped (read-only, pages are loaded on access).
+    """
+
+    def paths(self, name: str) -> tuple[Path, Path]:
+        return self.dist_dir / f"{name}.npy", self.dist_dir / f"{name}.json"
+
+    def exists(self, name: str) -> bool:
+        return all(os.path.exists(p) for p in self.paths(name))
+
+    def save(self, name: str, values: np.ndarray, manifest: dict) -> None:
+        """
+        Files are written to temporary paths and replaced: a file memory-mapped
+        by a reader is never rewritten in place (it keeps the old values).
+        """
+
+        values_path, manifest_path = self.paths(name)
+        values_tmp = Path(str(values_path) + ".tmp")
+        manifest_tmp = Path(str(manifest_path) + ".tmp")
+        with open(values_tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(values, dtype=np.float64))
+        with open(manifest_tmp, "w") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+        ### values first: manifest is replaced last, so its presence means complete
+        os.replace(values_tmp, values_path)
+        os.replace(manifest_tmp, manifest_path)
+
+    def load(self, name: str) -> tuple[np.ndarray, dict]:
+        values_path, manifest_path = self.paths(name)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        return np.load(values_path, mmap_mode="r"), manifest
+
+    def save_frame(self, name: str, frame: pd.DataFrame) -> None:
+        self.save(name, frame.to_numpy(), {"columns": frame.columns.tolist()})
+
+    def load_frame(self, name: str) -> pd.DataFrame:
+        values, manifest = self.load(name)
+        return pd.DataFrame(values, columns=manifest["columns"], copy=False)
+
+    def save_series(self, name: str, series: pd.Series) -> None:
+        self.save(name, series.to_numpy(), {"index": series.index.tolist()})
+
+    def load_series(self, name: str) -> pd.Series:
+        ### series are small and kept for long (na_filler of predictor): not mapped
+        values, manifest = self.load(name)
+        return pd.Series(np.array(values), index=manifest["index"], copy=False)
+
+
+class ExcelArtifactStore(ArtifactStore):
+    """<name>.xlsx tables: slow, for humans and for assets of older versions"""
+
+    def path(self, name: str) -> Path:
+        return self.dist_dir / f"{name}.xlsx"
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def save_frame(self, name: str, frame: pd.DataFrame) -> None:
+        frame.to_excel(self.path(name), index=False)
+
+    def load_frame(self, name: str) -> pd.DataFrame:
+        return pd.read_excel(self.path(name))
+
+    def save_series(self, name: str, series: pd.Series) -> None:
+        series.to_excel(self.path(name), index=True)
+
+    def load_series(self, name: str) -> pd.Series:
+        return pd.read_excel(self.path(name), index_col=0).iloc[:, 0]
+
+
+ARTIFACT_STORES: dict[str, type[ArtifactStore]] = {
+    "npy": NpyArtifactStore,
+    "xlsx": ExcelArtifactStore,
+}
+
+
+def get_artifact_store(
+    dist_dir: Path,
+    artifact_format: str = settings.ML_ARTIFACT_FORMAT,
+) -> ArtifactStore:
+    if artifact_format not in ARTIFACT_STORES:
+        raise ValueError(f"Unknown artifact format: {artifact_format}")
+    return ARTIFACT_STORES[artifact_format](dist_dir)
+
+
+def copy_artifact(name: str, source: ArtifactStore, target: ArtifactStore) -> None:
+    if name in SERIES_ARTIFACTS:
+        target.save_series(name, source.load_series(name))
+    else:
+        target.save_frame(name, source.load_frame(name))
+
+
+def migrate_xlsx(dist_dir: Path, target: ArtifactStore | None = None) -> list[str]:
+    """Convert xlsx artifacts of dist_dir missing in target store, return names"""
+
+    excel = ExcelArtifactStore(dist_dir)
+    if target is None:
+        target = get_artifact_store(dist_dir)
+
+    migrated = []
+    for name in (NA_FILLER, PREPROCESSED_FEATURES):
+        if excel.exists(name) and not target.exists(name):
+            copy_artifact(name, excel, target)
+            migrated.append(name)
+    return migrated
+
+
+if __name__ == "__main__":
+    ### migrate assets of all models: python ml/artifacts.py
+    for dist_dir in sorted(Path(__file__).parent.glob("*/assets/*")):
+        print(dist_dir, migrate_xlsx(dist_dir))
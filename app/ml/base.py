@@ -1,11 +1,15 @@
 import os
 import sys
-import bisect
 import pickle
+import asyncio
+import multiprocessing
 from pathlib import Path
+from time import monotonic
+from typing import Iterator
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 import pandas as pd
-from pydantic import BaseModel
 from tqdm import tqdm
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score
@@ -14,11 +18,20 @@ from sklearn.metrics import accuracy_score
 ROOT_DIR = Path(__file__).parent.parent
 sys.path.append(str(ROOT_DIR))
 
+from settings import settings
 from model.prediction import MatchPredictionHA, MatchPrediction1x2
 from manager.base import BasePredictorInterface, BaseDataInterface
-from manager.service import SportType
+from manager.service import SportType, StatusCode
 from manager.base import MatchFilter, LackOfStatisticsError
-from model.service import MatchSDM
+from model.service import MatchSDM, MatchFeaturesView, MatchCodeView
+from ml.features import TeamFeatureStore
+from ml.artifacts import (
+    NA_FILLER,
+    PREPROCESSED_FEATURES,
+    ExcelArtifactStore,
+    get_artifact_store,
+    migrate_xlsx,
+)
 
 
 TARGET = "target"
@@ -28,9 +41,19 @@ TMP_WEEK = TMP_DAY * 7
 TMP_MONTH = TMP_DAY * 30
 TMP_YEAR = TMP_DAY * 365
 
-NA_FILLER_FILENAME = "na_filler.xlsx"
-PREPROCESSED_FEATURES_FILENAME = "preprocessed_features.xlsx"
 MODEL_FILENAME = "model.pkl"
+FEATURE_STORE_FILENAME = "feature_store.npz"
+
+### winner_target by FS winner index (-1 is unknown winner)
+WINNER_TARGETS = np.array([2, 1, 0, np.nan])
+
+FORK_AVAILABLE = "fork" in multiprocessing.get_all_start_methods()
+### feature store inherited by forked workers of StandardMLTrainer.features_pool
+FORK_STORE: TeamFeatureStore | None = None
+
+
+def fork_store_features(task: tuple[np.ndarray, ...]) -> np.ndarray:
+    return FORK_STORE.features(*task)
 
 
 class RandomPredictor(BasePredictorInterface):
@@ -43,27 +66,12 @@ class RandomPredictor(BasePredictorInterface):
         self.data = data
 
 
-class ByTeam(BaseModel):
-    date: int
-
-
-class StatsByTeam(ByTeam):
-    stats: dict
-
-
-class MatchByTeam(ByTeam):
-    match: MatchSDM
-
-
-class StatValue(BaseModel):
-    value: int | float | list[int | float] | None = None
-    count: int
-
-
 class StandardML:
     DIST_DIR = None
     TIME_SPREAD = TMP_MONTH * 6
     MODEL_NAME = "Standard Model"
+    ### matches are streamed from data by batches of BATCH_SIZE
+    BATCH_SIZE = 1000
 
     def __init__(
         self,
@@ -76,6 +84,25 @@ class StandardML:
         if self.DIST_DIR is None:
             raise ValueError("You should set DIST DIR")
 
+        self.artifacts = get_artifact_store(self.DIST_DIR)
+
+    def save_frame(self, name: str, frame: pd.DataFrame) -> None:
+        self.artifacts.save_frame(name, frame)
+        if settings.ML_EXPORT_XLSX:
+            ExcelArtifactStore(self.DIST_DIR).save_frame(name, frame)
+
+    def save_series(self, name: str, series: pd.Series) -> None:
+        self.artifacts.save_series(name, series)
+        if settings.ML_EXPORT_XLSX:
+            ExcelArtifactStore(self.DIST_DIR).save_series(name, series)
+
+    def artifact_exists(self, name: str) -> bool:
+        """Artifacts of older versions (xlsx) are migrated on first access"""
+
+        if not self.artifacts.exists(name):
+            migrate_xlsx(self.DIST_DIR, self.artifacts)
+        return self.artifacts.exists(name)
+
     def save_model(self, model):
         with open(self.DIST_DIR / MODEL_FILENAME, "wb") as f:
             pickle.dump(model, f)
@@ -84,8 +111,64 @@ class StandardML:
         with open(self.DIST_DIR / MODEL_FILENAME, "rb") as f:
             return pickle.load(f)
 
+    def load_feature_store(self) -> TeamFeatureStore | None:
+        if not os.path.exists(self.DIST_DIR / FEATURE_STORE_FILENAME):
+            return None
+        return TeamFeatureStore.load(self.DIST_DIR / FEATURE_STORE_FILENAME)
+
+    def save_feature_store(self, store: TeamFeatureStore) -> None:
+        store.save(self.DIST_DIR / FEATURE_STORE_FILENAME)
+
+    async def sync_feature_store(self, store: TeamFeatureStore) -> int:
+        """
+        Add finished matches of data missing in store, return count of added.
+        Missing codes are found by codes of all matches, not by dates:
+        matches inserted later can be older than the last one of store
+        (backfills, rescraped error matches).
+        """
+
+        match_filter = MatchFilter(
+            error=False,
+            statuses=StatusCode.finished_set,
+            fields=MatchFeaturesView.FIELDS,
+        )
+        if not len(store):
+            added = 0
+            async for batch in self.data.iter_filtered_matches(
+                match_filter,
+                batch_size=self.BATCH_SIZE,
+                view=MatchFeaturesView,
+            ):
+                added += store.add_matches(batch)
+            return added
+
+        codes_filter = MatchFilter(
+            error=False,
+            statuses=StatusCode.finished_set,
+            fields=MatchCodeView.FIELDS,
+        )
+        missing = []
+        async for batch in self.data.iter_filtered_matches(
+            codes_filter,
+            batch_size=self.BATCH_SIZE * 10,
+            view=MatchCodeView,
+        ):
+            missing.extend(m.code for m in batch if m.code not in store)
+
+        added = 0
+        for i in range(0, len(missing), self.BATCH_SIZE):
+            match_filter.codes = set(missing[i : i + self.BATCH_SIZE])
+            matches = await self.data.get_filtered_matches(
+                match_filter,
+                view=MatchFeaturesView,
+            )
+            added += store.add_matches(matches)
+        return added
+
     def setup_target(self, match: MatchSDM) -> int:
-        winner = match.description.winner
+        return self.winner_target(match.description.winner)
+
+    def winner_target(self, winner: int | None) -> int | None:
         if winner is None:
             return winner
 
@@ -103,251 +186,60 @@ class StandardML:
 
         return winner
 
-    def group_by_team(self, matches: list[MatchSDM]) -> tuple[
-        dict[str, list[StatsByTeam]],
-        dict[str, list[MatchByTeam]],
-        set[str],
-    ]:
-        def add(mapper: dict[str, list], team: str, value) -> None:
-            if team not in mapper:
-                mapper[team] = [value]
-            else:
-                mapper[team].append(value)
-
-        stats_by_teams: dict[str, list[StatsByTeam]] = dict()
-        matches_by_teams: dict[str, list[MatchByTeam]] = dict()
-        stats_keys: set[str] = set()
-
-        for match in matches:
-            start_date = match.description.start_date
-            ct1 = match.description.code_t1
-            ct2 = match.description.code_t2
-
-            for time in match.statistics1:
-                stkeys = set(match.statistics1[time].keys())
-                stats_keys.update(stkeys)
-
-            stbt1 = StatsByTeam(date=start_date, stats=match.statistics1)
-            mbt1 = MatchByTeam(date=start_date, match=match)
-            add(stats_by_teams, ct1, stbt1)
-            add(matches_by_teams, ct1, mbt1)
-
-            stbt2 = StatsByTeam(date=start_date, stats=match.statistics2)
-            mbt2 = MatchByTeam(date=start_date, match=match)
-            add(stats_by_teams, ct2, stbt2)
-            add(matches_by_teams, ct2, mbt2)
-
-        return stats_by_teams, matches_by_teams, stats_keys
-
-    def search_stats_by_team(
-        self,
-        stats_by_teams: dict[str, list[StatsByTeam]],
-        code_team: str,
-        min_date: int,
-        max_date: int,
-    ) -> list[dict]:
-        stats_by_team = stats_by_teams.get(code_team, None)
-        if stats_by_team is None:
-            raise LackOfStatisticsError(
-                f"There are no statistics for team with code: {code_team}"
-            )
-
-        start = bisect.bisect_left(stats_by_team, min_date, key=lambda x: x.date)
-        end = bisect.bisect_right(stats_by_team, max_date - 1, key=lambda x: x.date)
-
-        return [s.stats for s in stats_by_team[start:end]]
-
-    def search_matches_by_team(
+    def group_by_team(
         self,
-        matches_by_teams: dict[str, list[MatchByTeam]],
-        code_team: str,
-        min_date: int,
-        max_date: int,
-    ) -> list[MatchSDM]:
-        matches_by_team = matches_by_teams[code_team]
+        matches: list[MatchSDM | MatchFeaturesView],
+    ) -> TeamFeatureStore:
+        """Index of matches history by teams"""
 
-        start = bisect.bisect_left(matches_by_team, min_date, key=lambda x: x.date)
-        end = bisect.bisect_right(matches_by_team, max_date - 1, key=lambda x: x.date)
-
-        return [s.match for s in matches_by_team[start:end]]
-
-    def aggregate_game_stats(
-        self,
-        stats: list[dict[str, float]],
-        time: str,
-        stats_keys: set[str],
-    ) -> dict[str, StatValue]:
-        aggmap: dict[str, StatValue] = {
-            k: StatValue(value=None, count=0) for k in stats_keys
-        }
-        for stat in stats:
-            if time not in stat:
-                continue
-
-            time_stat: dict = stat[time]
-            for stname in time_stat.keys():
-                if aggmap[stname].value is None:
-                    aggmap[stname] = StatValue(value=time_stat[stname], count=1)
-                elif isinstance(aggmap[stname].value, list):
-                    aggmap[stname].count += 1
-                    aggmap[stname].value[0] += time_stat[stname][0]
-                    aggmap[stname].value[1] += time_stat[stname][1]
-                else:
-                    aggmap[stname].count += 1
-                    aggmap[stname].value += time_stat[stname]
-
-        for stname in aggmap:
-            stat = aggmap[stname]
-            if stat.value is None:
-                pass
-            elif isinstance(stat.value, list):
-                if stat.value[1] == 0:
-                    agg = 0
-                else:
-                    agg = stat.value[0] / stat.value[1]
-                stat.value = agg
-            else:
-                agg = stat.value / stat.count
-                stat.value = agg
-
-        return aggmap
-
-    def aggregate_team_stats(
-        self,
-        matches: list[MatchSDM],
-        code_team1: str,
-    ) -> dict[str, StatValue]:
-        times = ["time1", "time2", "time3", "time4", "time5"]
-
-        aggmap: dict[str, StatValue] = {
-            "win_rate": StatValue(value=0, count=0),
-            "score_rate": StatValue(value=0, count=0),
-            "time_score_rate": StatValue(value=0, count=0),
-        }
-
-        for match in matches:
-            ct1 = match.description.code_t1
-            winner = match.description.winner
-            scrt1 = match.description.score_t1
-            scrt2 = match.description.score_t2
-
-            if winner is not None:
-                tcw = 1 if ct1 == code_team1 else 2
-                aggmap["win_rate"].count += 1
-                aggmap["win_rate"].value += int(winner == tcw)
-
-            if scrt1 is not None and scrt2 is not None:
-                spread = scrt1 - scrt2 if ct1 == code_team1 else scrt2 - scrt1
-                aggmap["score_rate"].count += 1
-                aggmap["score_rate"].value += spread
-
-            for time in times:
-                timescore = getattr(match, time)
-                if timescore is None:
-                    continue
-
-                scrt1 = timescore.score_t1
-                scrt2 = timescore.score_t2
-                spread = scrt1 - scrt2 if ct1 == code_team1 else scrt2 - scrt1
-                aggmap["time_score_rate"].count += 1
-                aggmap["time_score_rate"].value += spread
-
-        for stname in aggmap:
-            if aggmap[stname].count == 0:
-                aggmap[stname].value = 0
-            else:
-                aggmap[stname].value = aggmap[stname].value / aggmap[stname].count
-
-        return aggmap
-
-    def h2h_score(
-        self,
-        matches_by_team1: list[MatchSDM],
-        code_team1: str,
-        code_team2: str,
-    ) -> float:
-        wins = 0
-        match_count = 0
-
-        for match in matches_by_team1:
-            ct1 = match.description.code_t1
-            ct2 = match.description.code_t2
-            winner = match.description.winner
-
-            if ct1 != code_team2 and ct2 != code_team2:
-                continue
-            if winner is None:
-                continue
-
-            match_count += 1
-            t1wc = 1 if ct1 == code_team1 else 2
-            wins += int(winner == t1wc)
-
-        h2h = 0.5
-        if match_count > 0:
-            h2h = wins / match_count
-        return h2h
+        store = TeamFeatureStore()
+        store.add_matches(matches)
+        return store
 
     def setup_match_features(
         self,
         match: MatchSDM,
         time_spread: int,
-        stats_by_teams: dict,
-        matches_by_teams: dict,
-        stats_keys: set[str],
-    ):
-        def add(
-            features: pd.Series,
-            stats: dict[str, StatValue],
-            postfix: str,
-        ) -> None:
-            for stname, stval in stats.items():
-                features[stname + postfix] = stval.value
-
-        features = pd.Series()
-
-        code_team1 = match.description.code_t1
-        code_team2 = match.description.code_t2
-
-        min_date = match.description.start_date - time_spread
-        max_date = match.description.start_date - 1
-
-        prev_stats_t1 = self.search_stats_by_team(
-            stats_by_teams, code_team1, min_date, max_date
-        )
-        prev_stats_t2 = self.search_stats_by_team(
-            stats_by_teams, code_team2, min_date, max_date
-        )
-
-        prev_matches_t1 = self.search_matches_by_team(
-            matches_by_teams, code_team1, min_date, max_date
+        store: TeamFeatureStore,
+    ) -> pd.Series:
+        """Features of match by history of its teams kept in store"""
+
+        description = match.description
+        teams = store.team_ids([description.code_t1, description.code_t2])
+        features = store.features(
+            teams[:1],
+            teams[1:],
+            np.array([description.start_date - time_spread]),
+            ### previous matches till the day before match
+            np.array([description.start_date - 1]),
         )
-        prev_matches_t2 = self.search_matches_by_team(
-            matches_by_teams, code_team2, min_date, max_date
-        )
-
-        agg_gamestat_t1 = self.aggregate_game_stats(prev_stats_t1, "match", stats_keys)
-        add(features, agg_gamestat_t1, " T1")
-
-        agg_gamestat_t2 = self.aggregate_game_stats(prev_stats_t2, "match", stats_keys)
-        add(features, agg_gamestat_t2, " T2")
+        features = pd.Series(features[0], index=store.feature_names())
+        features[TARGET] = self.setup_target(match)
+        return features
 
-        agg_teamstat_t1 = self.aggregate_team_stats(prev_matches_t1, code_team1)
-        add(features, agg_teamstat_t1, " T1")
 
-        agg_teamstat_t2 = self.aggregate_team_stats(prev_matches_t2, code_team2)
-        add(features, agg_teamstat_t2, " T2")
+class StandardMLTrainer(StandardML):
+    ### matches features are computed by blocks of FEATURES_BLOCK_SIZE
+    FEATURES_BLOCK_SIZE = 4096
+    FEATURES_WORKERS = settings.ML_FEATURES_WORKERS
 
-        features["h2h"] = self.h2h_score(prev_matches_t1, code_team1, code_team2)
-        features[TARGET] = self.setup_target(match)
+    async def update_feature_store(self, rebuild: bool = False) -> TeamFeatureStore:
+        """
+        Add matches missing in saved feature store
+        (all matches if there is no store or rebuild is True).
+        """
 
-        return features
+        store = None if rebuild else self.load_feature_store()
+        if store is None:
+            store = TeamFeatureStore()
 
+        await self.sync_feature_store(store)
+        self.save_feature_store(store)
+        return store
 
-class StandardMLTrainer(StandardML):
     def setup_na_filler(self, train_data: pd.DataFrame) -> pd.Series:
         na_filler = train_data.mean().drop([TARGET], errors="ignore")
-        na_filler.to_excel(self.DIST_DIR / NA_FILLER_FILENAME, index=True)
+        self.save_series(NA_FILLER, na_filler)
         return na_filler
 
     def setup_matches_features(
@@ -355,47 +247,109 @@ class StandardMLTrainer(StandardML):
         matches: list[MatchSDM],
         time_spread: int,
     ) -> pd.DataFrame:
-        min_start_date = matches[0].description.start_date + time_spread
-        stats_bt, matches_bt, stats_keys = self.group_by_team(matches)
+        store = TeamFeatureStore()
+        store.add_matches(matches)
+        return self.setup_store_features(store, time_spread)
 
-        matches_features: list[pd.Series] = []
-        for match in tqdm(matches, desc="Processing matches features"):
-            ### time shift to have sufficient amount of statistics
-            if match.description.start_date < min_start_date:
-                continue
+    def setup_store_features(
+        self,
+        store: TeamFeatureStore,
+        time_spread: int,
+        workers: int | None = None,
+    ) -> pd.DataFrame:
+        """
+        Features of every match of store in chronological order.
+        Matrix of store.feature_names() + target columns is filled by blocks.
+        workers: processes computing blocks (FEATURES_WORKERS by default)
+        """
+
+        dates = np.asarray(store.match_dates, dtype=np.int64)
+        order = np.argsort(dates, kind="stable")
+        ### time shift to have sufficient amount of statistics
+        order = order[dates[order] >= dates[order[0]] + time_spread]
+
+        teams1 = np.asarray(store.match_teams1, dtype=np.int64)[order]
+        teams2 = np.asarray(store.match_teams2, dtype=np.int64)[order]
+        dates = dates[order]
+
+        columns = store.feature_names() + [TARGET]
+        matrix = np.empty((len(order), len(columns)), dtype=np.float64)
+
+        blocks = [
+            slice(start, start + self.FEATURES_BLOCK_SIZE)
+            for start in range(0, len(order), self.FEATURES_BLOCK_SIZE)
+        ]
+        tasks = [
+            (teams1[b], teams2[b], dates[b] - time_spread, dates[b] - 1) for b in blocks
+        ]
+
+        workers = self.FEATURES_WORKERS if workers is None else workers
+        if workers > 1 and FORK_AVAILABLE:
+            results = self.features_pool(store, tasks, workers)
+        else:
+            results = (store.features(*task) for task in tasks)
 
-            match_features = self.setup_match_features(
-                match,
-                time_spread,
-                stats_bt,
-                matches_bt,
-                stats_keys,
-            )
-            matches_features.append(match_features)
+        ### results come in order of blocks: chronological order is kept
+        progress = tqdm(results, total=len(blocks), desc="Processing matches features")
+        for block, features in zip(blocks, progress):
+            matrix[block, :-1] = features
 
-        features_df = pd.DataFrame(matches_features)
-        features_df.to_excel(
-            self.DIST_DIR / PREPROCESSED_FEATURES_FILENAME, index=False
-        )
+        winners = np.asarray(store.match_winners, dtype=np.int64)[order]
+        matrix[:, -1] = WINNER_TARGETS[winners]
+
+        features_df = pd.DataFrame(matrix, columns=columns)
+        self.save_frame(PREPROCESSED_FEATURES, features_df)
 
         return features_df
 
+    def features_pool(
+        self,
+        store: TeamFeatureStore,
+        tasks: list[tuple[np.ndarray, ...]],
+        workers: int,
+    ) -> Iterator[np.ndarray]:
+        """
+        Compute blocks in forked processes. Index of store is built before fork,
+        so workers read it copy-on-write instead of receiving it pickled.
+        """
+
+        global FORK_STORE
+
+        store.index()
+        FORK_STORE = store
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+            ) as pool:
+                yield from pool.map(fork_store_features, tasks)
+        finally:
+            FORK_STORE = None
+
     async def train(
         self,
         preprocessed_features: bool = False,
         preprocessed_na_filler: bool = False,
+        rebuild_store: bool = False,
+        workers: int | None = None,
     ):
-        match_filter = MatchFilter(error=False)
-        matches = await self.data.get_filtered_matches(match_filter)
+        """
+        rebuild_store: collect feature store from all matches of data
+        workers: processes of features computation
+        """
 
         if preprocessed_features:
-            if not os.path.exists(self.DIST_DIR / PREPROCESSED_FEATURES_FILENAME):
+            if not self.artifact_exists(PREPROCESSED_FEATURES):
                 raise FileExistsError("Preprocessed features file does not exist")
-            features_df = pd.read_excel(self.DIST_DIR / PREPROCESSED_FEATURES_FILENAME)
+            features_df = self.artifacts.load_frame(PREPROCESSED_FEATURES)
         else:
-            features_df = self.setup_matches_features(
-                matches, time_spread=self.TIME_SPREAD
+            store = await self.update_feature_store(rebuild=rebuild_store)
+            features_df = self.setup_store_features(
+                store,
+                time_spread=self.TIME_SPREAD,
+                workers=workers,
             )
+            del store
 
         train_data: pd.DataFrame
         test_data: pd.DataFrame
@@ -412,9 +366,9 @@ class StandardMLTrainer(StandardML):
         # )
 
         if preprocessed_na_filler:
-            if not os.path.exists(self.DIST_DIR / NA_FILLER_FILENAME):
+            if not self.artifact_exists(NA_FILLER):
                 raise FileExistsError("NA Filler file does not exist")
-            na_filler = pd.read_excel(self.DIST_DIR / NA_FILLER_FILENAME)
+            na_filler = self.artifacts.load_series(NA_FILLER)
         else:
             na_filler = self.setup_na_filler(train_data)
 
@@ -444,6 +398,9 @@ class StandardMLTrainer(StandardML):
 
 
 class StandardPredictor(StandardML, BasePredictorInterface):
+    ### min seconds between saves of updated feature store
+    STORE_SAVE_PERIOD = 300
+
     def __init__(
         self,
         sport: SportType,
@@ -454,16 +411,100 @@ class StandardPredictor(StandardML, BasePredictorInterface):
         self.na_filler: pd.Series = None
         self.model: RandomForestClassifier = None
 
+        self.store: TeamFeatureStore | None = None
+        self.store_saved_at = monotonic()
+        ### store has matches not saved yet
+        self.store_changed = False
+        ### store is synced with data once by background task of start()
+        self.store_synced = False
+        self.sync_task: asyncio.Task | None = None
+        self.save_lock = asyncio.Lock()
+
         self.initialize()
 
     def initialize(self) -> None:
-        if not os.path.exists(self.DIST_DIR / NA_FILLER_FILENAME):
+        if not self.artifact_exists(NA_FILLER):
             raise FileExistsError("NA Filler file does not exist")
         if not os.path.exists(self.DIST_DIR / MODEL_FILENAME):
             raise FileExistsError("Model file does not exists")
 
-        self.na_filler = pd.read_excel(self.DIST_DIR / NA_FILLER_FILENAME, index_col=0)
+        self.na_filler = self.artifacts.load_series(NA_FILLER)
         self.model = self.upload_model()
+        ### feature store is optional, it's created by trainer
+        self.store = self.load_feature_store()
+
+    async def add_matches(self, matches: list[MatchSDM]) -> None:
+        """Keep feature store up to date with stored matches"""
+
+        if self.store is None:
+            return None
+
+        finished = [m for m in matches if StatusCode.finished(m.status)]
+        if self.store.add_matches(finished):
+            self.store_changed = True
+        if monotonic() - self.store_saved_at >= self.STORE_SAVE_PERIOD:
+            await self.flush_feature_store()
+
+    async def flush_feature_store(self) -> None:
+        """Save feature store in thread if it has changed since the last save"""
+
+        async with self.save_lock:
+            self.store_saved_at = monotonic()
+            if self.store is None or not self.store_changed:
+                return None
+
+            ### matches added while file is written are saved next time
+            snapshot = self.store.snapshot()
+            self.store_changed = False
+            await asyncio.to_thread(
+                TeamFeatureStore.write,
+                self.DIST_DIR / FEATURE_STORE_FILENAME,
+                snapshot,
+            )
+
+    async def sync_store(self) -> None:
+        try:
+            added = await self.sync_feature_store(self.store)
+        except Exception as ex:
+            print("Feature store sync failed:", repr(ex))
+            return None
+
+        if added:
+            self.store_changed = True
+        self.store_synced = True
+        print(f"Feature store synced: {added} matches added")
+
+    async def start(self) -> None:
+        """Sync feature store with data in background"""
+
+        if self.store is not None and self.sync_task is None:
+            self.sync_task = asyncio.create_task(self.sync_store())
+
+    async def close(self) -> None:
+        if self.sync_task is not None:
+            self.sync_task.cancel()
+            await asyncio.gather(self.sync_task, return_exceptions=True)
+        await self.flush_feature_store()
+
+    async def get_feature_store(self, match: MatchSDM) -> TeamFeatureStore:
+        """
+        Feature store with history of match teams: store of trainer once it's
+        synced with data, store of teams matches till then (or without one).
+        """
+
+        if self.store is not None and self.store_synced:
+            return self.store
+
+        description = match.description
+        match_filter = MatchFilter(
+            team_codes=[description.code_t1, description.code_t2],
+            fields=MatchFeaturesView.FIELDS,
+        )
+        matches = await self.data.get_filtered_matches(
+            match_filter,
+            view=MatchFeaturesView,
+        )
+        return self.group_by_team(matches)
 
     def setup_prediction_error(
         self,
@@ -501,19 +542,12 @@ class StandardPredictor(StandardML, BasePredictorInterface):
 
     async def predict(self, match: MatchSDM) -> MatchPredictionHA | MatchPrediction1x2:
         try:
-            code_team1 = match.description.code_t1
-            code_team2 = match.description.code_t2
-
-            match_filter = MatchFilter(team_codes=[code_team1, code_team2])
-            matches = await self.data.get_filtered_matches(match_filter)
-            stats_bt, matches_bt, stats_keys = self.group_by_team(matches)
+            store = await self.get_feature_store(match)
 
             features = self.setup_match_features(
                 match,
                 time_spread=self.TIME_SPREAD,
-                stats_by_teams=stats_bt,
-                matches_by_teams=matches_bt,
-                stats_keys=stats_keys,
+                store=store,
             )
             features = pd.DataFrame([features])
 
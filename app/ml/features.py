@@ -0,0 +1,432 @@
+import os
+import sys
+from array import array
+from pathlib import Path
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from manager.base import LackOfStatisticsError
+from model.service import MatchSDM, MatchFeaturesView
+
+
+TIMES = ["time1", "time2", "time3", "time4", "time5"]
+STATS_TIME = "match"
+### raw rows arrays
+BLOCK_NAMES = ("team", "opponent", "date", "values", "stats", "denominators")
+
+### team columns of a row: sums and counts of team aggregates
+WIN, WIN_COUNT, SCORE, SCORE_COUNT, TIME_SCORE, TIME_SCORE_COUNT = range(6)
+TEAM_STATS = {
+    "win_rate": (WIN, WIN_COUNT),
+    "score_rate": (SCORE, SCORE_COUNT),
+    "time_score_rate": (TIME_SCORE, TIME_SCORE_COUNT),
+}
+
+
+class TeamFeatureStore:
+    """
+    Rolling features of teams over time-sorted match history.
+
+    Every match adds two rows, one per team: its game statistics (missing as NaN,
+    "62% (25/40)" like stats as numerator/denominator) and win/score/set spreads.
+    Rows are indexed sorted by team and date with prefix sums of all columns,
+    so aggregate of any team window is a difference of two prefix rows.
+
+    New matches are appended as raw blocks; the index is rebuilt in one
+    vectorized pass on next query.
+    """
+
+    def __init__(self) -> None:
+        ### matches table
+        self.match_index: dict[str, int] = {}
+        self.match_codes: list[str] = []
+        self.match_dates = array("q")
+        self.match_teams1 = array("l")
+        self.match_teams2 = array("l")
+        ### -1 if winner is unknown
+        self.match_winners = array("b")
+
+        self.teams: dict[str, int] = {}
+        self.team_codes: list[str] = []
+        self.stats_keys: dict[str, int] = {}
+        self.ratio_keys: set[str] = set()
+
+        ### raw rows by blocks of added matches
+        self.blocks: list[dict[str, np.ndarray]] = []
+        self.indexed = False
+
+        self.date_values: np.ndarray = None
+        self.ranks_count = 0
+        self.team_keys: np.ndarray = None
+        self.prefix: np.ndarray = None
+        self.pair_keys: np.ndarray = None
+        self.pair_prefix: np.ndarray = None
+
+    def __len__(self) -> int:
+        return len(self.match_codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.match_index
+
+    @property
+    def last_date(self) -> int | None:
+        if not self.match_dates:
+            return None
+        return max(self.match_dates)
+
+    def keys(self) -> list[str]:
+        """Game statistics names in stable (sorted) order"""
+        return sorted(self.stats_keys)
+
+    def team_id(self, code: str) -> int:
+        team_id = self.teams.get(code)
+        if team_id is None:
+            team_id = len(self.team_codes)
+            self.teams[code] = team_id
+            self.team_codes.append(code)
+        return team_id
+
+    def stats_key_id(self, key: str) -> int:
+        key_id = self.stats_keys.get(key)
+        if key_id is None:
+            key_id = len(self.stats_keys)
+            self.stats_keys[key] = key_id
+        return key_id
+
+    @staticmethod
+    def usable(match: MatchSDM | MatchFeaturesView) -> bool:
+        return match.description is not None and not getattr(match, "error", False)
+
+    def add_matches(self, matches: list[MatchSDM | MatchFeaturesView]) -> int:
+        """Add new matches (known codes are skipped), return count of added"""
+
+        new = [m for m in matches if self.usable(m) and m.code not in self.match_index]
+        ### duplicates inside of batch
+        new = list({m.code: m for m in new}.values())
+        if not new:
+            return 0
+
+        for match in new:
+            for stats in (match.statistics1, match.statistics2):
+                for key, value in stats.get(STATS_TIME, {}).items():
+                    self.stats_key_id(key)
+                    if isinstance(value, (list, tuple)):
+                        self.ratio_keys.add(key)
+
+        rows = len(new) * 2
+        team = np.empty(rows, dtype=np.int64)
+        opponent = np.empty(rows, dtype=np.int64)
+        date = np.empty(rows, dtype=np.int64)
+        values = np.zeros((rows, len(TEAM_STATS) * 2), dtype=np.float64)
+        stats = np.full((rows, len(self.stats_keys)), np.nan, dtype=np.float32)
+        denominators = np.zeros((rows, len(self.stats_keys)), dtype=np.float32)
+
+        for i, match in enumerate(new):
+            description = match.description
+            team1 = self.team_id(description.code_t1)
+            team2 = self.team_id(description.code_t2)
+            winner = description.winner
+
+            self.match_index[match.code] = len(self.match_codes)
+            self.match_codes.append(match.code)
+            self.match_dates.append(description.start_date)
+            self.match_teams1.append(team1)
+            self.match_teams2.append(team2)
+            self.match_winners.append(-1 if winner is None else winner)
+
+            time_spread, time_count = 0, 0
+            for time in TIMES:
+                timescore = getattr(match, time)
+                if timescore is not None:
+                    time_spread += timescore.score_t1 - timescore.score_t2
+                    time_count += 1
+
+            score_t1, score_t2 = description.score_t1, description.score_t2
+            is_score = score_t1 is not None and score_t2 is not None
+            score_spread = score_t1 - score_t2 if is_score else 0
+
+            for side, (row_team, row_opponent, sign, match_stats) in enumerate(
+                (
+                    (team1, team2, 1, match.statistics1),
+                    (team2, team1, -1, match.statistics2),
+                )
+            ):
+                row = i * 2 + side
+                team[row] = row_team
+                opponent[row] = row_opponent
+                date[row] = description.start_date
+
+                if winner is not None:
+                    values[row, WIN] = int(winner == side + 1)
+                    values[row, WIN_COUNT] = 1
+                if is_score:
+                    values[row, SCORE] = sign * score_spread
+                    values[row, SCORE_COUNT] = 1
+                values[row, TIME_SCORE] = sign * time_spread
+                values[row, TIME_SCORE_COUNT] = time_count
+
+                for key, value in match_stats.get(STATS_TIME, {}).items():
+                    column = self.stats_keys[key]
+                    if isinstance(value, (list, tuple)):
+                        stats[row, column] = value[0]
+                        denominators[row, column] = value[1]
+                    else:
+                        stats[row, column] = value
+
+        self.blocks.append(
+            {
+                "team": team,
+                "opponent": opponent,
+                "date": date,
+                "values": values,
+                "stats": stats,
+                "denominators": denominators,
+            }
+        )
+        self.indexed = False
+        return len(new)
+
+    def raw(self) -> dict[str, np.ndarray]:
+        """All raw rows as one block (stats columns of older blocks padded)"""
+
+        keys_count = len(self.stats_keys)
+        if len(self.blocks) > 1 or (
+            self.blocks and self.blocks[0]["stats"].shape[1] != keys_count
+        ):
+            merged = {}
+            for name in BLOCK_NAMES[:4]:
+                merged[name] = np.concatenate([b[name] for b in self.blocks])
+
+            for name, filler in (("stats", np.nan), ("denominators", 0)):
+                padded = []
+                for block in self.blocks:
+                    matrix = block[name]
+                    pad = keys_count - matrix.shape[1]
+                    if pad:
+                        fill = np.full((len(matrix), pad), filler, dtype=matrix.dtype)
+                        matrix = np.hstack([matrix, fill])
+                    padded.append(matrix)
+                merged[name] = np.concatenate(padded)
+            self.blocks = [merged]
+
+        if not self.blocks:
+            return {
+                "team": np.empty(0, dtype=np.int64),
+                "opponent": np.empty(0, dtype=np.int64),
+                "date": np.empty(0, dtype=np.int64),
+                "values": np.empty((0, len(TEAM_STATS) * 2)),
+                "stats": np.empty((0, keys_count), dtype=np.float32),
+                "denominators": np.empty((0, keys_count), dtype=np.float32),
+            }
+        return self.blocks[0]
+
+    def index(self) -> None:
+        """
+        Sort rows by team and date, compute prefix sums.
+        Rows are searched by int64 keys (team, date rank) and, for h2h,
+        (team, opponent, date rank) where date rank is index in sorted dates.
+        """
+
+        if self.indexed:
+            return None
+
+        raw = self.raw()
+        teams_count = len(self.team_codes)
+
+        self.date_values = np.unique(raw["date"])
+        ranks = np.searchsorted(self.date_values, raw["date"])
+        self.ranks_count = len(self.date_values) + 1
+
+        order = np.lexsort((raw["date"], raw["team"]))
+        values = raw["values"][order]
+        stats = raw["stats"][order]
+        present = ~np.isnan(stats)
+        ### columns: team values | stats sums | stats denominators | stats counts
+        columns = np.hstack(
+            [
+                values,
+                np.where(present, stats, 0).astype(np.float64),
+                raw["denominators"][order].astype(np.float64),
+                present.astype(np.float64),
+            ]
+        )
+        self.prefix = self.prefix_sums(columns)
+        self.team_keys = raw["team"][order] * self.ranks_count + ranks[order]
+
+        pair_order = np.lexsort((raw["date"], raw["opponent"], raw["team"]))
+        pairs = raw["team"][pair_order] * teams_count + raw["opponent"][pair_order]
+        self.pair_keys = pairs * self.ranks_count + ranks[pair_order]
+        self.pair_prefix = self.prefix_sums(
+            raw["values"][pair_order][:, [WIN, WIN_COUNT]]
+        )
+        self.indexed = True
+
+    @staticmethod
+    def prefix_sums(columns: np.ndarray) -> np.ndarray:
+        prefix = np.zeros((len(columns) + 1, columns.shape[1]), dtype=np.float64)
+        np.cumsum(columns, axis=0, out=prefix[1:])
+        return prefix
+
+    def search(
+        self,
+        keys: np.ndarray,
+        groups: np.ndarray,
+        min_dates: np.ndarray,
+        max_dates: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Rows [lo, hi) of every group with min_date <= date < max_date"""
+
+        min_ranks = np.searchsorted(self.date_values, min_dates, side="left")
+        max_ranks = np.searchsorted(self.date_values, max_dates, side="left")
+        lo = np.searchsorted(keys, groups * self.ranks_count + min_ranks)
+        hi = np.searchsorted(keys, groups * self.ranks_count + max_ranks)
+        return lo, hi
+
+    def team_ids(self, codes: list[str]) -> np.ndarray:
+        """Ids of known teams, LackOfStatisticsError for unknown team"""
+
+        ids = []
+        for code in codes:
+            team = self.teams.get(code)
+            if team is None:
+                raise LackOfStatisticsError(
+                    f"There are no statistics for team with code: {code}"
+                )
+            ids.append(team)
+        return np.array(ids, dtype=np.int64)
+
+    def feature_names(self) -> list[str]:
+        """Names of features columns, stable for the same statistics names"""
+
+        keys = self.keys()
+        return [
+            *[k + " T1" for k in keys],
+            *[k + " T2" for k in keys],
+            *[name + " T1" for name in TEAM_STATS],
+            *[name + " T2" for name in TEAM_STATS],
+            "h2h",
+        ]
+
+    def game_stats(self, sums: np.ndarray) -> np.ndarray:
+        """
+        Mean of every statistic (ratio of sums for "a% (x/y)" statistics),
+        NaN if there are no values. Columns in order of keys().
+        """
+
+        keys_count = len(self.stats_keys)
+        offset = len(TEAM_STATS) * 2
+        columns = [self.stats_keys[k] for k in self.keys()]
+        values = sums[:, offset : offset + keys_count][:, columns]
+        denominators = sums[:, offset + keys_count : offset + keys_count * 2]
+        denominators = denominators[:, columns]
+        counts = sums[:, offset + keys_count * 2 :][:, columns]
+
+        ratio = np.array([k in self.ratio_keys for k in self.keys()], dtype=bool)
+        divisors = np.where(ratio, denominators, counts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            aggregated = values / divisors
+        ### ratio of zero denominator is 0
+        aggregated[ratio & (divisors == 0)] = 0
+        aggregated[counts == 0] = np.nan
+        return aggregated
+
+    def team_stats(self, sums: np.ndarray) -> np.ndarray:
+        """Columns in order of TEAM_STATS, 0 if there are no values"""
+
+        values = sums[:, [value for value, _ in TEAM_STATS.values()]]
+        counts = sums[:, [count for _, count in TEAM_STATS.values()]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(counts == 0, 0, values / counts)
+
+    def features(
+        self,
+        teams1: np.ndarray,
+        teams2: np.ndarray,
+        min_dates: np.ndarray,
+        max_dates: np.ndarray,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """
+        Features matrix of matches of teams1 vs teams2 (team ids)
+        over [min_date, max_date) windows, columns of feature_names().
+        """
+
+        self.index()
+
+        lo1, hi1 = self.search(self.team_keys, teams1, min_dates, max_dates)
+        lo2, hi2 = self.search(self.team_keys, teams2, min_dates, max_dates)
+        sums1 = self.prefix[hi1] - self.prefix[lo1]
+        sums2 = self.prefix[hi2] - self.prefix[lo2]
+
+        pairs = teams1 * len(self.team_codes) + teams2
+        lo, hi = self.search(self.pair_keys, pairs, min_dates, max_dates)
+        h2h = self.pair_prefix[hi] - self.pair_prefix[lo]
+
+        keys_count = len(self.stats_keys)
+        team_count = len(TEAM_STATS)
+        if out is None:
+            out = np.empty((len(teams1), keys_count * 2 + team_count * 2 + 1))
+
+        out[:, :keys_count] = self.game_stats(sums1)
+        out[:, keys_count : keys_count * 2] = self.game_stats(sums2)
+        column = keys_count * 2
+        out[:, column : column + team_count] = self.team_stats(sums1)
+        out[:, column + team_count : column + team_count * 2] = self.team_stats(sums2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:, -1] = np.where(h2h[:, 1] == 0, 0.5, h2h[:, 0] / h2h[:, 1])
+        return out
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        """
+        Arrays saved by save(). They are not changed by later add_matches,
+        so they can be written by write() in other thread.
+        """
+
+        keys = list(self.stats_keys)
+        return {
+            "match_codes": np.array(self.match_codes, dtype=str),
+            "match_dates": np.array(self.match_dates, dtype=np.int64),
+            "match_teams1": np.array(self.match_teams1, dtype=np.int64),
+            "match_teams2": np.array(self.match_teams2, dtype=np.int64),
+            "match_winners": np.array(self.match_winners, dtype=np.int8),
+            "team_codes": np.array(self.team_codes, dtype=str),
+            "stats_keys": np.array(keys, dtype=str),
+            "ratio_keys": np.array([k in self.ratio_keys for k in keys]),
+            **self.raw(),
+        }
+
+    @staticmethod
+    def write(path: Path, snapshot: dict[str, np.ndarray]) -> None:
+        tmp_path = Path(str(path) + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **snapshot)
+        os.replace(tmp_path, path)
+
+    def save(self, path: Path) -> None:
+        """Persist raw rows and matches table (index is rebuilt on load)"""
+
+        self.write(path, self.snapshot())
+
+    @classmethod
+    def load(cls, path: Path) -> "TeamFeatureStore":
+        store = cls()
+        with np.load(path) as f:
+            store.match_codes = f["match_codes"].tolist()
+            store.match_index = {c: i for i, c in enumerate(store.match_codes)}
+            store.match_dates = array("q", f["match_dates"].tolist())
+            store.match_teams1 = array("l", f["match_teams1"].tolist())
+            store.match_teams2 = array("l", f["match_teams2"].tolist())
+            store.match_winners = array("b", f["match_winners"].tolist())
+
+            store.team_codes = f["team_codes"].tolist()
+            store.teams = {c: i for i, c in enumerate(store.team_codes)}
+            keys = f["stats_keys"].tolist()
+            store.stats_keys = {k: i for i, k in enumerate(keys)}
+            store.ratio_keys = {k for k, r in zip(keys, f["ratio_keys"]) if r}
+
+            block = {name: f[name] for name in BLOCK_NAMES}
+            if len(block["team"]):
+                store.blocks = [block]
+        return store
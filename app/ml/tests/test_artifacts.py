@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from ml.artifacts import (
+    NA_FILLER,
+    PREPROCESSED_FEATURES,
+    ExcelArtifactStore,
+    NpyArtifactStore,
+    migrate_xlsx,
+)
+
+
+def features_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Aces T1": [1.5, np.nan, 3.0],
+            "Aces T2": [0.5, 2.0, np.nan],
+            "h2h": [0.5, 1.0, 0.0],
+            "target": [1.0, 0.0, 1.0],
+        }
+    )
+
+
+class TestNpyArtifactStore:
+    def test_frame(self, tmp_path):
+        store = NpyArtifactStore(tmp_path)
+        assert not store.exists(PREPROCESSED_FEATURES)
+
+        store.save_frame(PREPROCESSED_FEATURES, features_frame())
+
+        assert store.exists(PREPROCESSED_FEATURES)
+        pd.testing.assert_frame_equal(
+            store.load_frame(PREPROCESSED_FEATURES), features_frame()
+        )
+
+    def test_series(self, tmp_path):
+        store = NpyArtifactStore(tmp_path)
+        na_filler = features_frame().mean().drop(["target"])
+
+        store.save_series(NA_FILLER, na_filler)
+        loaded = store.load_series(NA_FILLER)
+
+        assert not isinstance(loaded.values, np.memmap)
+        pd.testing.assert_series_equal(loaded, na_filler)
+
+    def test_overwrite(self, tmp_path):
+        store = NpyArtifactStore(tmp_path)
+        store.save_frame(PREPROCESSED_FEATURES, features_frame())
+        store.save_series(NA_FILLER, features_frame().mean())
+        mapped = store.load_frame(PREPROCESSED_FEATURES)
+        na_filler = store.load_series(NA_FILLER)
+
+        store.save_frame(PREPROCESSED_FEATURES, features_frame() * 2)
+        store.save_series(NA_FILLER, features_frame().mean() * 2)
+
+        ### loaded artifacts keep values of the replaced files
+        pd.testing.assert_frame_equal(mapped, features_frame())
+        pd.testing.assert_series_equal(na_filler, features_frame().mean())
+        pd.testing.assert_frame_equal(
+            store.load_frame(PREPROCESSED_FEATURES), features_frame() * 2
+        )
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            f"{NA_FILLER}.json",
+            f"{NA_FILLER}.npy",
+            f"{PREPROCESSED_FEATURES}.json",
+            f"{PREPROCESSED_FEATURES}.npy",
+        ]
+
+
+class TestMigration:
+    def test_xlsx(self, tmp_path):
+        excel = ExcelArtifactStore(tmp_path)
+        na_filler = features_frame().mean().drop(["target"])
+        excel.save_series(NA_FILLER, na_filler)
+        excel.save_frame(PREPROCESSED_FEATURES, features_frame())
+
+        store = NpyArtifactStore(tmp_path)
+        migrated = migrate_xlsx(tmp_path, store)
+
+        assert migrated == [NA_FILLER, PREPROCESSED_FEATURES]
+        assert migrate_xlsx(tmp_path, store) == []
+        pd.testing.assert_series_equal(
+            store.load_series(NA_FILLER), na_filler, check_names=False
+        )
+        pd.testing.assert_frame_equal(
+            store.load_frame(PREPROCESSED_FEATURES), features_frame()
+        )
@@ -0,0 +1,346 @@
+import sys
+import math
+import random
+from pathlib import Path
+import pytest
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from manager.base import LackOfStatisticsError, MatchFilter
+from manager.service import SPORT
+from model.service import MatchSDM, MatchDescriptionSDM, TimeScoreSDM
+from ml.base import (
+    StandardML,
+    StandardMLTrainer,
+    StandardPredictor,
+    FEATURE_STORE_FILENAME,
+    FORK_AVAILABLE,
+    TARGET,
+    TMP_DAY,
+    TMP_MONTH,
+)
+from ml.features import TeamFeatureStore
+
+
+TIME_SPREAD = TMP_MONTH * 2
+
+
+def random_match(rnd: random.Random, i: int, teams: list[str]) -> MatchSDM:
+    code_t1, code_t2 = rnd.sample(teams, 2)
+    sets = [
+        TimeScoreSDM(score_t1=rnd.randint(0, 7), score_t2=rnd.randint(0, 7))
+        for _ in range(rnd.randint(0, 5))
+    ]
+
+    def stats() -> dict:
+        match_stats = {"Aces": float(rnd.randint(0, 20))}
+        if rnd.random() < 0.7:
+            match_stats["Break Points Saved"] = [rnd.randint(0, 9), rnd.randint(0, 9)]
+        if rnd.random() < 0.5:
+            match_stats["1st Serve Percentage"] = rnd.randint(40, 80) + 0.5
+        return {"match": match_stats}
+
+    statistics1, statistics2 = stats(), stats()
+    ### same statistics names for both teams like FlashScore does
+    for key in set(statistics1["match"]) ^ set(statistics2["match"]):
+        statistics1["match"].pop(key, None)
+        statistics2["match"].pop(key, None)
+
+    is_score = rnd.random() < 0.9
+    return MatchSDM(
+        code=f"code{i}",
+        status="Finished",
+        **{f"time{t + 1}": ts for t, ts in enumerate(sets)},
+        description=MatchDescriptionSDM(
+            tournament_fullname="ATP - SINGLES: Wimbledon - Final",
+            code_t1=code_t1,
+            code_t2=code_t2,
+            full_name_t1=code_t1,
+            full_name_t2=code_t2,
+            short_name_t1=code_t1,
+            short_name_t2=code_t2,
+            winner=rnd.choice([None, 0, 1, 2, 1, 2]),
+            reason="",
+            start_date=1_600_000_000 + i * TMP_DAY // 2 + rnd.randint(0, 3600),
+            end_date=0,
+            score_t1=rnd.randint(0, 3) if is_score else None,
+            score_t2=rnd.randint(0, 3) if is_score else None,
+            infobox="",
+        ),
+        statistics1=statistics1,
+        statistics2=statistics2,
+    )
+
+
+def random_matches(count: int) -> list[MatchSDM]:
+    rnd = random.Random(7)
+    teams = [f"team{i}" for i in range(8)]
+    return [random_match(rnd, i, teams) for i in range(count)]
+
+
+class LocalML(StandardML):
+    DIST_DIR = Path(__file__).parent
+
+
+class FakeData:
+    """Matches of data filtered by error, statuses, codes and min date"""
+
+    def __init__(self, matches: list[MatchSDM]) -> None:
+        self.matches = matches
+        self.requested: list[str] = []
+
+    def filtered(self, match_filter: MatchFilter, view) -> list:
+        matches = [
+            m
+            for m in self.matches
+            if (match_filter.error is None or m.error == match_filter.error)
+            and (match_filter.statuses is None or m.status in match_filter.statuses)
+            and (match_filter.codes is None or m.code in match_filter.codes)
+            and (
+                match_filter.min_date is None
+                or m.description.start_date >= match_filter.min_date
+            )
+        ]
+        if view is None:
+            return matches
+        if "description.start_date" in (match_filter.fields or []):
+            self.requested.extend(m.code for m in matches)
+        return [view.model_validate(m.model_dump()) for m in matches]
+
+    async def get_filtered_matches(self, match_filter: MatchFilter, view=None):
+        return self.filtered(match_filter, view)
+
+    async def iter_filtered_matches(
+        self,
+        match_filter: MatchFilter,
+        batch_size: int = 1000,
+        view=None,
+    ):
+        matches = self.filtered(match_filter, view)
+        for i in range(0, len(matches), batch_size):
+            yield matches[i : i + batch_size]
+
+
+def reference_features(matches: list[MatchSDM], match: MatchSDM) -> dict:
+    """Plain aggregation over previous matches of both teams"""
+
+    start_date = match.description.start_date
+    code_team1 = match.description.code_t1
+    code_team2 = match.description.code_t2
+
+    def previous(team: str) -> list[tuple[MatchSDM, int]]:
+        return [
+            (m, 1 if m.description.code_t1 == team else 2)
+            for m in matches
+            if team in (m.description.code_t1, m.description.code_t2)
+            and start_date - TIME_SPREAD <= m.description.start_date < start_date - 1
+        ]
+
+    keys = {k for m in matches for k in m.statistics1["match"]}
+    features = {}
+    for postfix, team in ((" T1", code_team1), (" T2", code_team2)):
+        for key in keys:
+            values = [
+                getattr(m, f"statistics{side}")["match"].get(key)
+                for m, side in previous(team)
+            ]
+            values = [v for v in values if v is not None]
+            if not values:
+                features[key + postfix] = None
+            elif isinstance(values[0], list):
+                denominator = sum(v[1] for v in values)
+                numerator = sum(v[0] for v in values)
+                features[key + postfix] = numerator / denominator if denominator else 0
+            else:
+                features[key + postfix] = sum(values) / len(values)
+
+    for postfix, team in ((" T1", code_team1), (" T2", code_team2)):
+        wins, scores, time_scores = [], [], []
+        for m, side in previous(team):
+            sign = 1 if side == 1 else -1
+            if m.description.winner is not None:
+                wins.append(int(m.description.winner == side))
+            if m.description.score_t1 is not None:
+                scores.append(sign * (m.description.score_t1 - m.description.score_t2))
+            for time in ["time1", "time2", "time3", "time4", "time5"]:
+                ts = getattr(m, time)
+                if ts is not None:
+                    time_scores.append(sign * (ts.score_t1 - ts.score_t2))
+
+        for name, values in (
+            ("win_rate", wins),
+            ("score_rate", scores),
+            ("time_score_rate", time_scores),
+        ):
+            features[name + postfix] = sum(values) / len(values) if values else 0
+
+    h2h = [
+        int(m.description.winner == side)
+        for m, side in previous(code_team1)
+        if code_team2 in (m.description.code_t1, m.description.code_t2)
+        and m.description.winner is not None
+    ]
+    features["h2h"] = sum(h2h) / len(h2h) if h2h else 0.5
+    return features
+
+
+def assert_features_equal(expected: dict, features: pd.Series) -> None:
+    assert sorted(expected) == sorted(features.drop(TARGET).index)
+    for name, value in expected.items():
+        if value is None:
+            assert math.isnan(features[name]), name
+        else:
+            assert features[name] == pytest.approx(value), name
+
+
+class TestTeamFeatureStore:
+    def test_same_as_aggregation(self):
+        matches = random_matches(300)
+        ml = LocalML(SPORT.TENNIS_MEN, data=None)
+        store = ml.group_by_team(matches)
+
+        for match in matches[100:]:
+            features = ml.setup_match_features(match, TIME_SPREAD, store)
+            assert_features_equal(reference_features(matches, match), features)
+            assert features[TARGET] == ml.setup_target(match) or (
+                match.description.winner is None and math.isnan(features[TARGET])
+            )
+
+    def test_incremental(self, tmp_path):
+        matches = random_matches(200)
+        whole = TeamFeatureStore()
+        whole.add_matches(matches)
+
+        store = TeamFeatureStore()
+        ### newer matches first, then older ones and repeated codes
+        store.add_matches(matches[100:])
+        store.save(tmp_path / "store.npz")
+        store = TeamFeatureStore.load(tmp_path / "store.npz")
+        assert store.add_matches(matches[:150]) == 100
+        assert len(store) == 200
+
+        assert store.feature_names() == whole.feature_names()
+
+        def features(store: TeamFeatureStore) -> np.ndarray:
+            ### team ids depend on order of added matches
+            return store.features(
+                store.team_ids(["team0", "team5"]),
+                store.team_ids(["team1", "team0"]),
+                np.array([1_600_000_000, 1_601_000_000]),
+                np.array([1_605_000_000, 1_610_000_000]),
+            )
+
+        np.testing.assert_allclose(features(store), features(whole))
+
+    def test_unknown_team(self):
+        store = TeamFeatureStore()
+        store.add_matches(random_matches(10))
+
+        with pytest.raises(LackOfStatisticsError):
+            store.team_ids(["team0", "unknown"])
+
+
+class TestFeaturesMatrix:
+    def test_same_as_series(self, tmp_path):
+        class LocalTrainer(StandardMLTrainer):
+            DIST_DIR = tmp_path
+
+        matches = random_matches(300)
+        trainer = LocalTrainer(SPORT.TENNIS_MEN, data=None)
+        store = trainer.group_by_team(matches)
+
+        features_df = trainer.setup_matches_features(matches, TIME_SPREAD)
+
+        min_start_date = matches[0].description.start_date + TIME_SPREAD
+        expected = pd.DataFrame(
+            [
+                trainer.setup_match_features(m, TIME_SPREAD, store)
+                for m in matches
+                if m.description.start_date >= min_start_date
+            ]
+        )
+        assert features_df.columns[-1] == TARGET
+        pd.testing.assert_frame_equal(
+            features_df,
+            expected.astype(float).reset_index(drop=True),
+        )
+
+    @pytest.mark.skipif(not FORK_AVAILABLE, reason="fork start method is required")
+    def test_workers(self, tmp_path):
+        class LocalTrainer(StandardMLTrainer):
+            DIST_DIR = tmp_path
+            FEATURES_BLOCK_SIZE = 50
+
+        trainer = LocalTrainer(SPORT.TENNIS_MEN, data=None)
+        store = trainer.group_by_team(random_matches(400))
+
+        single = trainer.setup_store_features(store, TIME_SPREAD, workers=1)
+        pooled = trainer.setup_store_features(store, TIME_SPREAD, workers=3)
+
+        pd.testing.assert_frame_equal(single, pooled)
+
+
+class TestFeatureStoreSync:
+    @pytest.mark.asyncio
+    async def test_older_match_inserted(self, tmp_path):
+        class LocalTrainer(StandardMLTrainer):
+            DIST_DIR = tmp_path
+            BATCH_SIZE = 20
+
+        matches = random_matches(200)
+        data = FakeData(matches[:100] + matches[150:])
+        trainer = LocalTrainer(SPORT.TENNIS_MEN, data=data)
+        store = await trainer.update_feature_store()
+        assert len(store) == 150
+
+        ### backfill: inserted after the store, but older than its last match
+        data.matches = matches
+        data.requested = []
+        store = await trainer.update_feature_store()
+
+        assert len(store) == 200
+        assert sorted(data.requested) == sorted(m.code for m in matches[100:150])
+        assert len(TeamFeatureStore.load(tmp_path / FEATURE_STORE_FILENAME)) == 200
+
+        rebuilt = await trainer.update_feature_store(rebuild=True)
+        pd.testing.assert_frame_equal(
+            trainer.setup_store_features(store, TIME_SPREAD),
+            trainer.setup_store_features(rebuilt, TIME_SPREAD),
+        )
+
+    @pytest.mark.asyncio
+    async def test_predictor_store(self, tmp_path):
+        class LocalPredictor(StandardPredictor):
+            DIST_DIR = tmp_path
+
+            def initialize(self) -> None:
+                self.store = self.load_feature_store()
+
+        matches = random_matches(200)
+        store = TeamFeatureStore()
+        store.add_matches(matches[50:150])
+        store.save(tmp_path / FEATURE_STORE_FILENAME)
+
+        predictor = LocalPredictor(SPORT.TENNIS_MEN, data=FakeData(matches[:150]))
+
+        ### teams matches are requested till store is synced in background
+        unsynced = await predictor.get_feature_store(matches[-1])
+        assert unsynced is not predictor.store
+
+        await predictor.start()
+        await predictor.sync_task
+        synced = await predictor.get_feature_store(matches[-1])
+        assert synced is predictor.store
+        assert len(synced) == 150
+
+        future = matches[150].model_copy(update={"status": "Future"})
+        await predictor.add_matches([future] + matches[151:])
+        assert len(synced) == 199
+        assert future.code not in synced
+
+        ### not saved yet (save period), flushed on close
+        assert len(TeamFeatureStore.load(tmp_path / FEATURE_STORE_FILENAME)) == 100
+        await predictor.close()
+        assert len(TeamFeatureStore.load(tmp_path / FEATURE_STORE_FILENAME)) == 199
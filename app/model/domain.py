@@ -45,3 +45,38 @@ class MatchStatusDTO(ModelDTO):
     code: str
     status: str
     error: bool
+
+
+class BackfillJobDTO(ModelDTO):
+    """
+    Checkpoint of backfill job.
+    total: amount of discovered match codes (frontier).
+    chunk_size: amount of frontier codes in one BackfillJobChunkDTO.
+    cursor: amount of frontier codes already processed.
+    """
+
+    job_id: str
+    stages: list[str] = []
+
+    total: int = 0
+    chunk_size: int = 0
+    cursor: int = 0
+
+    def done(self, stage: str) -> bool:
+        return stage in self.stages
+
+    def complete(self, stage: str) -> None:
+        if stage not in self.stages:
+            self.stages.append(stage)
+
+
+class BackfillJobChunkDTO(ModelDTO):
+    """
+    Part of backfill job frontier: codes and statuses from chunk * chunk_size.
+    Frontier is kept out of job document to stay below document size limit.
+    """
+
+    job_id: str
+    chunk: int
+    codes: list[str] = []
+    statuses: list[str] = []
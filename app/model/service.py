@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, ClassVar, Mapping
 from pydantic import BaseModel, GetCoreSchemaHandler
 from pydantic_core import core_schema, CoreSchema
 
@@ -83,7 +83,7 @@ class MatchCodeSDM(TournamentNameParsed):
         return hash(str(self.code))
 
     def __eq__(self, other: "MatchCodeSDM") -> bool:
-        if isinstance(other, MatchCodeSDM):
+        if isinstance(other, (MatchCodeSDM, MatchCodeRecord)):
             if self.code == other.code:
                 return True
         return False
@@ -91,11 +91,65 @@ class MatchCodeSDM(TournamentNameParsed):
     @classmethod
     def drop_dups(
         self,
-        matches: list["MatchCodeSDM"],
-    ) -> list["MatchCodeSDM"]:
+        matches: list["MatchCodeSDM | MatchCodeRecord"],
+    ) -> list["MatchCodeSDM | MatchCodeRecord"]:
         return list(set(matches))
 
 
+class MatchCodeRecord:
+    """
+    Lightweight match code of discovery feeds, MatchCodeSDM without validation.
+    tournament: TournamentNameParsed fields, one mapping shared by all its matches.
+    """
+
+    __slots__ = ("tournament", "code", "date", "status")
+
+    def __init__(self, tournament: Mapping, code: str, date: int, status: str) -> None:
+        self.tournament = tournament
+        self.code = code
+        self.date = date
+        self.status = status
+
+    @property
+    def tournament_fullname(self) -> str:
+        return self.tournament["tournament_fullname"]
+
+    @property
+    def qualification(self) -> bool:
+        return self.tournament["qualification"]
+
+    @property
+    def tournament_category(self) -> str | None:
+        return self.tournament["tournament_category"]
+
+    @property
+    def tournament_name(self) -> str | None:
+        return self.tournament["tournament_name"]
+
+    @property
+    def tournament_stage(self) -> str | None:
+        return self.tournament["tournament_stage"]
+
+    def __hash__(self) -> int:
+        return hash(self.code)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (MatchCodeRecord, MatchCodeSDM)):
+            return self.code == other.code
+        return False
+
+    def __repr__(self) -> str:
+        return f"MatchCodeRecord(code={self.code!r}, date={self.date}, status={self.status!r})"
+
+    def to_sdm(self) -> MatchCodeSDM:
+        return MatchCodeSDM(
+            **self.tournament,
+            code=self.code,
+            date=self.date,
+            status=self.status,
+        )
+
+
 class TournamentByYearUrlSDM(BaseModel):
     url: str
     start_year: int | None = None
@@ -238,3 +292,59 @@ class MatchSDM(BaseModel):
 
     statistics1: dict = {}
     statistics2: dict = {}
+
+
+class MatchDescriptionView(BaseModel):
+    """Part of MatchDescriptionSDM used by match features"""
+
+    code_t1: str
+    code_t2: str
+    winner: int | None = None
+    start_date: int
+    score_t1: int | None = None
+    score_t2: int | None = None
+
+
+class MatchFeaturesView(BaseModel):
+    """
+    Projection of MatchSDM used by match features.
+    FIELDS: document fields to request (MatchFilter.fields)
+    """
+
+    FIELDS: ClassVar[list[str]] = [
+        "code",
+        "description.code_t1",
+        "description.code_t2",
+        "description.winner",
+        "description.start_date",
+        "description.score_t1",
+        "description.score_t2",
+        "time1",
+        "time2",
+        "time3",
+        "time4",
+        "time5",
+        "statistics1.match",
+        "statistics2.match",
+    ]
+
+    code: str
+
+    time1: TimeScoreSDM | None = None
+    time2: TimeScoreSDM | None = None
+    time3: TimeScoreSDM | None = None
+    time4: TimeScoreSDM | None = None
+    time5: TimeScoreSDM | None = None
+
+    description: MatchDescriptionView
+
+    statistics1: dict = {}
+    statistics2: dict = {}
+
+
+class MatchCodeView(BaseModel):
+    """Projection of MatchSDM with code only"""
+
+    FIELDS: ClassVar[list[str]] = ["code"]
+
+    code: str
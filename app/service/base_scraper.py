@@ -1,11 +1,20 @@
 import re
 import sys
+import time
+import asyncio
 from pathlib import Path
 from datetime import datetime
-from typing import Awaitable
+from urllib.parse import urlsplit
 from abc import ABC, abstractmethod
-from aiolimiter import AsyncLimiter
-from aiohttp import ClientResponse, ClientSession, BasicAuth, ClientProxyConnectionError
+from aiohttp import (
+    ClientResponse,
+    ClientSession,
+    TCPConnector,
+    BasicAuth,
+    ClientOSError,
+    ClientProxyConnectionError,
+    ServerDisconnectedError,
+)
 
 ROOT_DIR = Path(__file__).parent.parent
 sys.path.append(str(ROOT_DIR))
@@ -13,11 +22,28 @@ sys.path.append(str(ROOT_DIR))
 
 from settings import settings
 from manager.service import ScraperInterface, SportType
+from service.replay import ResponseArchive, ReplayTransport, ServerTransport
+from service.response_cache import ResponseCache
+from service.rate_limiter import (
+    AdaptiveRateLimiter,
+    HostBucket,
+    THROTTLE_STATUSES,
+    backoff_delay,
+    parse_retry_after,
+)
 
 
 PROXY_RX = re.compile(r"(https?://)?(\d{1,3}\.){3}\d{1,3}:\d{2,5}@[\d\w]+:[\d\w]+")
 MAX_TRIES = settings.SCRAPER_MAX_TRIES
 
+CONNECTIONS_LIMIT = settings.SCRAPER_CONNECTIONS_LIMIT
+CONNECTIONS_PER_HOST = settings.SCRAPER_CONNECTIONS_PER_HOST
+KEEPALIVE_TIMEOUT = settings.SCRAPER_KEEPALIVE_TIMEOUT
+DNS_CACHE_TTL = settings.SCRAPER_DNS_CACHE_TTL
+
+### connection failures worth another try of idempotent GET
+RETRY_ERRORS = (ServerDisconnectedError, ClientOSError, asyncio.TimeoutError)
+
 
 class WrongProxyStructure(Exception):
     pass
@@ -27,10 +53,148 @@ class NotWorkingProxy(Exception):
     pass
 
 
+class ThrottledError(Exception):
+    """Host still throttles (429/5xx) after the last try"""
+
+    def __init__(self, url: str, status: int) -> None:
+        super().__init__(f"{status} at {url}")
+        self.url = url
+        self.status = status
+
+
+def check_proxy_structure(proxy: str) -> None:
+    """Should be like '154.195.18.33:63004@GFNau6gw:9J9siqgu' this"""
+
+    matched = PROXY_RX.match(proxy)
+    if not matched:
+        raise WrongProxyStructure(
+            "Should be like '154.195.18.33:63004@GFNau6gw:9J9siqgu' this"
+        )
+
+
+def parse_proxy(proxy: str) -> tuple[str, str, str]:
+    """Proxy string -> (proxy url, username, password)"""
+
+    check_proxy_structure(proxy)
+
+    proxy_url = re.findall(r"([0-9a-z:.]+)@", proxy, re.IGNORECASE)[0]
+    proxy_url = "http://" + proxy_url
+    proxy_username = re.findall(r"@([0-9a-z]+):", proxy, re.IGNORECASE)[0]
+    proxy_password = re.findall(r":([0-9a-z]+)$", proxy, re.IGNORECASE)[0]
+
+    return proxy_url, proxy_username, proxy_password
+
+
+class ScraperSession:
+    """
+    Long-lived aiohttp session with a pooled connector.
+
+    The underlying ClientSession is created lazily on first use (inside a running
+    event loop) and keeps TCP/TLS connections and resolved hosts between requests.
+    One ScraperSession can be shared by several scrapers.
+
+    limit: total number of simultaneous connections
+    limit_per_host: simultaneous connections to the same host
+    keepalive_timeout: seconds to keep an idle connection open
+    ttl_dns_cache: seconds to cache resolved hosts
+    archive: record every response into ResponseArchive
+    transport: replay responses (ReplayTransport or ReplayServer.transport())
+    cache: ResponseCache consulted before any request
+
+    Requests of all scrapers sharing the session are throttled per host
+    by one AdaptiveRateLimiter.
+    """
+
+    def __init__(
+        self,
+        limit: int = CONNECTIONS_LIMIT,
+        limit_per_host: int = CONNECTIONS_PER_HOST,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        ttl_dns_cache: int = DNS_CACHE_TTL,
+        archive: ResponseArchive | None = None,
+        transport: ReplayTransport | ServerTransport | None = None,
+        cache: ResponseCache | None = None,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+
+        self.archive = archive
+        self.transport = transport
+        self.cache = cache
+        self.limiter = AdaptiveRateLimiter()
+
+        self.proxy_url: str | None = None
+        self.proxy_auth: BasicAuth | None = None
+
+        self._session: ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        ### closing of sessions replaced on loop change
+        self._closing: set[asyncio.Task] = set()
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    def _create(self) -> ClientSession:
+        connector = TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+            use_dns_cache=True,
+        )
+        return ClientSession(connector=connector)
+
+    def get(self) -> ClientSession:
+        loop = asyncio.get_running_loop()
+        ### session is bound to the loop it was created in
+        if self.closed or self._loop is not loop:
+            if not self.closed:
+                ### connector of other loop is only closed here, not used
+                task = loop.create_task(self._session.close())
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+            self._session = self._create()
+            self._loop = loop
+
+        return self._session
+
+    def route(self) -> "ScraperSession":
+        """Session the next request is sent through (ProxyPool picks a proxy)"""
+
+        return self
+
+    def report(self, ok: bool | None, latency: float) -> None:
+        """
+        Outcome of request sent through route(), called once per route().
+        ok is None if request ended without outcome (cancelled, other error).
+        """
+
+        pass
+
+    async def close(self) -> None:
+        if not self.closed:
+            await self._session.close()
+        if self._closing:
+            await asyncio.gather(*self._closing)
+
+        self._session = None
+        self._loop = None
+
+    async def __aenter__(self) -> "ScraperSession":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+
 class BaseScraper(ABC):
     """
-    max_rate: maximum requests per rate_period
+    max_rate: requests per rate_period the host bucket starts with
     rate_period: period in seconds (default 1 second)
+    session: shared ScraperSession (scraper creates its own if not passed)
     """
 
     def __init__(
@@ -39,8 +203,13 @@ class BaseScraper(ABC):
         max_rate: int = 49,
         rate_period: float = 1,
         debug: bool = False,
+        session: ScraperSession | None = None,
     ) -> None:
-        self.rate_limit = AsyncLimiter(max_rate, rate_period)
+        self.max_rate = max_rate
+        self.rate_period = rate_period
+
+        self._own_session = session is None
+        self.session = session if session is not None else ScraperSession()
 
         self._headers = {}
         self._set_headers()
@@ -61,49 +230,40 @@ class BaseScraper(ABC):
             )
 
     def _get_proxy_data(self, proxy: str) -> tuple[str, str, str]:
-        self._check_proxy_structure(proxy)
-
-        proxy_url = re.findall(r"([0-9a-z:.]+)@", proxy, re.IGNORECASE)[0]
-        proxy_url = "http://" + proxy_url
-        proxy_username = re.findall(r"@([0-9a-z]+):", proxy, re.IGNORECASE)[0]
-        proxy_password = re.findall(r":([0-9a-z]+)$", proxy, re.IGNORECASE)[0]
-
-        return proxy_url, proxy_username, proxy_password
+        return parse_proxy(proxy)
 
     def _check_proxy_structure(self, proxy: str) -> None:
         """Should be like '154.195.18.33:63004@GFNau6gw:9J9siqgu' this"""
 
-        matched = PROXY_RX.match(proxy)
-        if not matched:
-            raise WrongProxyStructure(
-                "Should be like '154.195.18.33:63004@GFNau6gw:9J9siqgu' this"
-            )
+        check_proxy_structure(proxy)
 
     async def _check_proxy(self) -> bool:
         URL = "https://example.com/"
 
         try:
-            async with ClientSession() as session:
-                async with session.request(
-                    method="get",
-                    url=URL,
-                    proxy=self._proxy_url,
-                    proxy_auth=self._proxy_auth,
-                    headers=self._headers,
-                ) as response:
-                    return await self.extractor(response)
+            async with self.session.get().request(
+                method="get",
+                url=URL,
+                proxy=self._proxy_url,
+                proxy_auth=self._proxy_auth,
+                headers=self._headers,
+            ) as response:
+                return await self.extractor(response)
 
         except ClientProxyConnectionError as ex:
             raise NotWorkingProxy("Proxy may have expired")
 
-    def _request_limiter(coro: Awaitable):
-        async def wrapper(self, *args, **kwargs):
-            rate_limit: AsyncLimiter = self.rate_limit
-            async with rate_limit:
-                output = await coro(self, *args, **kwargs)
-                return output
+    async def close(self) -> None:
+        """Close session if it's not shared with other scrapers"""
+
+        if self._own_session:
+            await self.session.close()
+
+    async def __aenter__(self) -> "BaseScraper":
+        return self
 
-        return wrapper
+    async def __aexit__(self, *args) -> None:
+        await self.close()
 
     @property
     @abstractmethod
@@ -120,27 +280,114 @@ class BaseScraper(ABC):
     async def extractor(self, response: ClientResponse):
         return await response.text()
 
-    @_request_limiter
-    async def request(self, url: str):
+    def store_response(self, url: str, response: str | None) -> None:
+        """Put response into session cache (TTL is defined by cache rules)"""
+
+        if self.session.cache is not None and response is not None:
+            self.session.cache.put(url, response)
+
+    async def request(self, url: str, store: bool = True):
+        """
+        Cached response is returned without touching rate limit.
+        store: cache response, False if it may still change (e.g. live match)
+        """
+
+        if self.session.cache is not None:
+            response = self.session.cache.get(url)
+            if response is not None:
+                return response
+
+        return await self.fetch(url, store)
+
+    def host_bucket(
+        self,
+        url: str,
+        route: ScraperSession | None = None,
+    ) -> HostBucket:
+        host = urlsplit(url).netloc
+        route = route or self.session
+        return route.limiter.bucket(host, self.max_rate, self.rate_period)
+
+    async def fetch(self, url: str, store: bool = True):
+        """
+        GET url, throttled by host bucket of the route (session or pooled proxy).
+        429/5xx, disconnects and proxy errors slow the host down and are retried
+        with jittered exponential backoff (Retry-After is respected).
+        ThrottledError is raised if the host still throttles after the last try.
+        """
+
         if self._debug:
             print(datetime.now().strftime("%H-%M-%S"), url)
 
-        tries = MAX_TRIES
-        while tries:
+        transport = self.session.transport
+        if transport is not None:
+            if transport.rate_limited:
+                await self.host_bucket(url).acquire()
+            return await transport.fetch(self.session, url, self._headers)
+
+        for attempt in range(MAX_TRIES):
+            last_try = attempt == MAX_TRIES - 1
+
+            route = self.session.route()
+            bucket = self.host_bucket(url, route)
+
+            ### outcome for route health: None if request was cancelled or
+            ### failed by other error, the route is released anyway
+            ok = None
+            start = time.monotonic()
             try:
-                tries -= 1
-                async with ClientSession() as session:
-                    async with session.request(
-                        method="get",
-                        url=url,
-                        proxy=self._proxy_url,
-                        proxy_auth=self._proxy_auth,
-                        headers=self._headers,
-                    ) as response:
-                        return await self.extractor(response)
+                await bucket.acquire()
 
-            except ClientProxyConnectionError as ex:
-                print(ex)
+                start = time.monotonic()
+                async with route.get().request(
+                    method="get",
+                    url=url,
+                    proxy=route.proxy_url or self._proxy_url,
+                    proxy_auth=route.proxy_auth or self._proxy_auth,
+                    headers=self._headers,
+                ) as response:
+                    body = await self.extractor(response)
+                    status = response.status
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                ok = status not in THROTTLE_STATUSES
 
-        else:
-            raise NotWorkingProxy("Proxy connection error")
+            except ClientProxyConnectionError as ex:
+                ok = False
+                bucket.throttled()
+                if last_try:
+                    raise NotWorkingProxy("Proxy connection error") from ex
+                print("Retry", url, repr(ex))
+                retry_after = None
+                status = None
+
+            except RETRY_ERRORS as ex:
+                ok = False
+                bucket.throttled()
+                if last_try:
+                    raise
+                print("Retry", url, repr(ex))
+                retry_after = None
+                status = None
+
+            finally:
+                route.report(ok, time.monotonic() - start)
+
+            if status is None:
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            if status in THROTTLE_STATUSES:
+                bucket.throttled(retry_after)
+                ### error page is neither archived nor returned as a response
+                if last_try:
+                    raise ThrottledError(url, status)
+                print("Retry", url, status)
+                await asyncio.sleep(backoff_delay(attempt, retry_after))
+                continue
+
+            bucket.success()
+            if self.session.archive is not None:
+                self.session.archive.put(url, body, status)
+            if store and status == 200:
+                self.store_response(url, body)
+            return body
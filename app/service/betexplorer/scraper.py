@@ -1,15 +1,23 @@
 import re
 import sys
 import asyncio
+import hashlib
+import calendar
 from pathlib import Path
-from datetime import datetime
+from functools import lru_cache
+from collections import OrderedDict
 
 ROOT_DIR = Path(__file__).parent.parent.parent
 sys.path.append(str(ROOT_DIR))
 
 from settings import settings
-from service.base_scraper import BaseScraper
-from manager.service import SportType, SPORT, BetExplorerScraperInterface
+from service.base_scraper import BaseScraper, ScraperSession
+from manager.service import (
+    SportType,
+    SPORT,
+    StatusCode,
+    BetExplorerScraperInterface,
+)
 from model.service import (
     MatchOdds1x2SDM,
     MatchOddsHASDM,
@@ -20,111 +28,137 @@ from model.service import (
 
 BE_MAX_RATE = settings.BETEXPLORER_MAX_RATE
 BE_RATE_PERIOD = settings.BETEXPLORER_RATE_PERIOD
+### odds pages remembered for changed_only scrapes (LRU)
+BODY_HASHES_SIZE = 10000
 
 ODDS_CHECK = "Unfortunately there wasn't any bookmaker offering odds for this match"
 ODDS_BUG = "A match with the given ID doesn't exist"
 
 
-class BetExplorerParser:
-    def parse_ha(self, response: str, match: MatchOddsHASDM) -> MatchOddsHASDM:
-        bookmakers = response.split("<tr data-bid=")[1:]
+### rows of odds table in JSON-escaped html
+ROW_HA = "<tr data-bid="
+ROW_1X2 = "<tr  class"
+ROW_END = r"<\/span><\/td>\n<\/tr>"
 
-        for book in bookmakers:
-            name = re.search(r"'event-name'\: '(.*?)',", book).group(1)
+BOOK_RX = re.compile(
+    f"(?P<row>{re.escape(ROW_HA)}|{re.escape(ROW_1X2)}|{re.escape(ROW_END)})"
+    r"|'event-name'\: '(?P<name>.*?)',"
+    r'|data-odd=\\"(?P<odd>.*?)\\"'
+    r'|data-created=\\"(?P<created>.*?)\\"'
+    r'|data-opening-odd=\\"(?P<open_odd>.*?)\\"'
+    r'|data-opening-date=\\"(?P<open_date>.*?)\\"'
+)
 
-            odds = re.findall(r'data-odd=\\"(.*?)\\"', book)
-            odds = odds[:2] if odds else odds
-            if len(odds) < 2:
-                continue
+### BetExplorer dates are UTC+1
+BE_UTC_OFFSET = 3600
 
-            odds_t1 = odds[-2]
-            odds_t2 = odds[-1]
-
-            odds_date = re.search(r'data-created=\\"(.*?)\\"', book).group(1)
-            odds_date = datetime.strptime(odds_date, "%d,%m,%Y,%H,%M")
-            odds_date = int(odds_date.timestamp()) - 3600  # transform to gmt-0
-
-            open_odds = re.findall(r'data-opening-odd=\\"(.*?)\\"', book)
-            if open_odds and len(open_odds) == 2:
-                oped_odds_date = re.search(
-                    r'data-opening-date=\\"(.*?)\\"', book
-                ).group(1)
-                oped_odds_date = datetime.strptime(oped_odds_date, "%d,%m,%Y,%H,%M")
-                oped_odds_date = (
-                    int(oped_odds_date.timestamp()) - 3600
-                )  # transform to gmt-0
-            else:
-                open_odds = [None, None]
-                oped_odds_date = None
-
-            book_odds = BookOddsHASDM(
-                name=name,
-                odds_t1=odds_t1,
-                odds_t2=odds_t2,
-                odds_date=odds_date,
-                open_odds_t1=open_odds[0],
-                open_odds_t2=open_odds[1],
-                open_odds_date=oped_odds_date,
-            )
-            match.odds.append(book_odds)
 
-        return match
+@lru_cache(maxsize=1024)
+def parse_odds_date(value: str) -> int:
+    """'16,07,2023,14,05' (dd,mm,YYYY,HH,MM at UTC+1) to UTC timestamp"""
+
+    day, month, year, hour, minute = map(int, value.split(","))
+    return calendar.timegm((year, month, day, hour, minute, 0)) - BE_UTC_OFFSET
 
-    def parse_1x2(self, response: str, match: MatchOdds1x2SDM) -> MatchOdds1x2SDM:
-        book_raw = response.split("<tr  class")[1:-1]
-        book_raw = [b.split(r"<\/span><\/td>\n<\/tr>") for b in book_raw]
 
-        bookmakers = []
-        for book in book_raw:
-            if len(book) == 2:
-                bookmakers.append(book[0])
+class BetExplorerParser:
+    def scan_books(
+        self,
+        response: str,
+        row_start: str,
+        row_end: bool,
+    ) -> list[list[dict]]:
+        """
+        Single pass over bookmaker rows, returns rows grouped by row_start marker.
+        row_end: row end marker also splits rows (1x2 table).
+        """
+
+        chunks: list[list[dict]] = []
+        book: dict | None = None
+
+        for field in BOOK_RX.finditer(response):
+            kind = field.lastgroup
+            value = field.group(kind)
+
+            if kind == "row":
+                if value == ROW_END:
+                    if not row_end or book is None:
+                        continue
+                    chunks[-1].append(book)
+                elif value == row_start:
+                    if book is not None:
+                        chunks[-1].append(book)
+                    chunks.append([])
+                else:
+                    continue
+
+                book = {"odd": [], "open_odd": []}
+            elif book is None:
+                continue
+            elif kind in ("odd", "open_odd"):
+                book[kind].append(value)
             else:
-                bookmakers.append(book[0])
-                bookmakers.append(book[1])
-                bookmakers.append(book[2])
+                book.setdefault(kind, value)
 
-        bookmakers = [b for b in bookmakers if len(b) > 20]
+        if book is not None:
+            chunks[-1].append(book)
 
-        for book in bookmakers:
-            name = re.search(r"'event-name'\: '(.*?)',", book).group(1)
+        return [[b for b in chunk if "name" in b] for chunk in chunks]
 
-            odds = re.findall(r'data-odd=\\"(.*?)\\"', book)
-            if len(odds) < 3:
-                continue
+    def parse_ha(self, response: str, match: MatchOddsHASDM) -> MatchOddsHASDM:
+        for chunk in self.scan_books(response, ROW_HA, row_end=False):
+            for book in chunk:
+                odds = book["odd"]
+                if len(odds) < 2 or "created" not in book:
+                    continue
+
+                open_odds = book["open_odd"]
+                if len(open_odds) == 2 and "open_date" in book:
+                    open_odds_date = parse_odds_date(book["open_date"])
+                else:
+                    open_odds = [None, None]
+                    open_odds_date = None
+
+                book_odds = BookOddsHASDM(
+                    name=book["name"],
+                    odds_t1=odds[0],
+                    odds_t2=odds[1],
+                    odds_date=parse_odds_date(book["created"]),
+                    open_odds_t1=open_odds[0],
+                    open_odds_t2=open_odds[1],
+                    open_odds_date=open_odds_date,
+                )
+                match.odds.append(book_odds)
 
-            odds_t1 = odds[-3]
-            odds_x = odds[-2]
-            odds_t2 = odds[-1]
-
-            odds_date = re.search(r'data-created=\\"(.*?)\\"', book).group(1)
-            odds_date = datetime.strptime(odds_date, "%d,%m,%Y,%H,%M")
-            odds_date = int(odds_date.timestamp()) - 3600  # transform to gmt-0
-
-            open_odds = re.findall(r'data-opening-odd=\\"(.*?)\\"', book)
-            if open_odds and len(open_odds) == 3:
-                oped_odds_date = re.search(
-                    r'data-opening-date=\\"(.*?)\\"', book
-                ).group(1)
-                oped_odds_date = datetime.strptime(oped_odds_date, "%d,%m,%Y,%H,%M")
-                oped_odds_date = (
-                    int(oped_odds_date.timestamp()) - 3600
-                )  # transform to gmt-0
-            else:
-                open_odds = [None, None, None]
-                oped_odds_date = None
-
-            book_odds = BookOdds1x2SDM(
-                name=name,
-                odds_t1=odds_t1,
-                odds_x=odds_x,
-                odds_t2=odds_t2,
-                odds_date=odds_date,
-                open_odds_t1=open_odds[0],
-                open_odds_x=open_odds[1],
-                open_odds_t2=open_odds[2],
-                open_odds_date=oped_odds_date,
-            )
-            match.odds.append(book_odds)
+        return match
+
+    def parse_1x2(self, response: str, match: MatchOdds1x2SDM) -> MatchOdds1x2SDM:
+        ### last row group is table footer
+        for chunk in self.scan_books(response, ROW_1X2, row_end=True)[:-1]:
+            for book in chunk:
+                odds = book["odd"]
+                if len(odds) < 3 or "created" not in book:
+                    continue
+
+                open_odds = book["open_odd"]
+                if len(open_odds) == 3 and "open_date" in book:
+                    open_odds_date = parse_odds_date(book["open_date"])
+                else:
+                    open_odds = [None, None, None]
+                    open_odds_date = None
+
+                book_odds = BookOdds1x2SDM(
+                    name=book["name"],
+                    odds_t1=odds[-3],
+                    odds_x=odds[-2],
+                    odds_t2=odds[-1],
+                    odds_date=parse_odds_date(book["created"]),
+                    open_odds_t1=open_odds[0],
+                    open_odds_x=open_odds[1],
+                    open_odds_t2=open_odds[2],
+                    open_odds_date=open_odds_date,
+                )
+                match.odds.append(book_odds)
 
         return match
 
@@ -139,12 +173,18 @@ class BetExplorerScraper(BetExplorerScraperInterface, BaseScraper):
         max_rate: int = BE_MAX_RATE,
         rate_period: float = BE_RATE_PERIOD,
         debug: bool = False,
+        session: ScraperSession | None = None,
     ) -> None:
         BetExplorerScraperInterface.__init__(self, sport)
-        BaseScraper.__init__(self, proxy, max_rate, rate_period, debug)
+        BaseScraper.__init__(self, proxy, max_rate, rate_period, debug, session)
 
         self.parser = BetExplorerParser()
 
+        self.in_flight: dict[tuple[str, bool, bool], asyncio.Task] = {}
+        self.coalesced = 0
+        self.body_hashes: OrderedDict[str, bytes] = OrderedDict()
+        self.body_hashes_size = BODY_HASHES_SIZE
+
     @property
     def custom_headers(self) -> dict:
         return {
@@ -187,9 +227,33 @@ class BetExplorerScraper(BetExplorerScraperInterface, BaseScraper):
 
         return match
 
-    async def scrape_ha(self, code: str) -> MatchOddsHASDM:
+    def changed(self, code: str, response: str | None) -> bool:
+        """
+        Remember hash of response body, False if it's the same as last one.
+        Called by changed_only scrapes only: other scrapes don't consume changes.
+        """
+
+        digest = hashlib.blake2b(str(response).encode(), digest_size=16).digest()
+        if self.body_hashes.get(code) == digest:
+            self.body_hashes.move_to_end(code)
+            return False
+
+        self.body_hashes[code] = digest
+        self.body_hashes.move_to_end(code)
+        if len(self.body_hashes) > self.body_hashes_size:
+            self.body_hashes.popitem(last=False)
+        return True
+
+    async def scrape_ha(
+        self,
+        code: str,
+        store: bool = False,
+        changed_only: bool = False,
+    ) -> MatchOddsHASDM | None:
         url = f"https://www.betexplorer.com/match-odds-old/{code}/1/ha/1/"
-        response = await self.request(url)
+        response = await self.request(url, store)
+        if changed_only and not self.changed(code, response):
+            return None
 
         match = MatchOddsHASDM(code=code, odds_type=OddsType.ODDS_HA)
         match = self.checkout(match, response)
@@ -198,9 +262,16 @@ class BetExplorerScraper(BetExplorerScraperInterface, BaseScraper):
 
         return match
 
-    async def scrape_1x2(self, code: str) -> MatchOdds1x2SDM:
+    async def scrape_1x2(
+        self,
+        code: str,
+        store: bool = False,
+        changed_only: bool = False,
+    ) -> MatchOdds1x2SDM | None:
         url = f"https://www.betexplorer.com/match-odds/{code}/1/1x2/bestOdds/"
-        response = await self.request(url)
+        response = await self.request(url, store)
+        if changed_only and not self.changed(code, response):
+            return None
 
         match = MatchOdds1x2SDM(code=code, odds_type=OddsType.ODDS_1x2)
         match = self.checkout(match, response)
@@ -209,16 +280,53 @@ class BetExplorerScraper(BetExplorerScraperInterface, BaseScraper):
 
         return match
 
-    async def scrape(self, code: str) -> MatchOddsHASDM | MatchOdds1x2SDM:
+    async def scrape_code(
+        self,
+        code: str,
+        status: str | None,
+        changed_only: bool,
+    ) -> MatchOddsHASDM | MatchOdds1x2SDM | None:
+        store = StatusCode.finished(status)
         if self.sport.odds_type == OddsType.ODDS_1x2:
-            return await self.scrape_1x2(code)
+            odds = await self.scrape_1x2(code, store, changed_only)
         elif self.sport.odds_type == OddsType.ODDS_HA:
-            return await self.scrape_ha(code)
+            odds = await self.scrape_ha(code, store, changed_only)
         else:
             raise NotImplementedError(
                 f"Scraping of '{self.sport.odds_type}' odds type is not implemented"
             )
 
+        ### odds of finished match don't change anymore
+        if store:
+            self.body_hashes.pop(code, None)
+        return odds
+
+    async def scrape(
+        self,
+        code: str,
+        status: str | None = None,
+        changed_only: bool = False,
+    ) -> MatchOddsHASDM | MatchOdds1x2SDM | None:
+        """
+        status: known match status, odds of finished match are cached.
+        changed_only: return None if response is the same as at last scrape of code.
+        Concurrent calls for the same code share one request (single-flight).
+        """
+
+        ### finished status changes what is done with response: it's stored
+        key = (code, changed_only, StatusCode.finished(status))
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self.scrape_code(code, status, changed_only))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+            return await asyncio.shield(task)
+
+        ### every waiter gets its own model
+        self.coalesced += 1
+        odds = await asyncio.shield(task)
+        return odds.model_copy(deep=True) if odds is not None else None
+
 
 async def test_ha():
     scraper = BetExplorerScraper(SPORT.TENNIS_MEN)
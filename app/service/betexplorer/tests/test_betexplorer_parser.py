@@ -0,0 +1,212 @@
+import sys
+import time
+import asyncio
+from pathlib import Path
+import pytest
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+PROJ_DIR = ROOT_DIR.parent
+sys.path.append(str(str(PROJ_DIR)))
+
+from model.service import MatchOddsHASDM, MatchOdds1x2SDM, OddsType
+from manager.service import SPORT, StatusCode
+from service.base_scraper import ScraperSession
+from service.replay import ResponseArchive, ReplayTransport
+from service.betexplorer.scraper import (
+    BetExplorerParser,
+    BetExplorerScraper,
+    parse_odds_date,
+)
+
+
+### Offline odds pages shaped like BetExplorer JSON-escaped html
+def book_cell(odd: str, created: str, open_odd: str | None, open_date: str) -> str:
+    cell = rf"<td data-odd=\"{odd}\" data-created=\"{created}\""
+    if open_odd is not None:
+        cell += rf" data-opening-odd=\"{open_odd}\" data-opening-date=\"{open_date}\""
+    return cell + r"><span>" + odd + r"<\/span><\/td>"
+
+
+def book_row(start: str, name: str, odds: list[str], opening: bool = True) -> str:
+    row = start + rf"\"1\"><td><a onclick=\"ga({{'event-name': '{name}', 'x': 1}})\">"
+    row += name + r"<\/a><\/td>"
+    for i, odd in enumerate(odds):
+        open_odd = f"{float(odd) + 0.1:.2f}" if opening else None
+        row += book_cell(odd, "16,07,2023,14,05", open_odd, "14,07,2023,09,30")
+    return row
+
+
+def ha_page() -> str:
+    rows = [
+        book_row("<tr data-bid=", "bet365", ["1.50", "2.60"]),
+        book_row("<tr data-bid=", "Pinnacle", ["1.52", "2.55"], opening=False),
+        book_row("<tr data-bid=", "Broken", ["1.40"]),
+    ]
+    return r'{"odds":"<table>' + "".join(rows) + r'<\/table>"}'
+
+
+def row_1x2(name: str, odds: list[str], opening: bool = True) -> str:
+    row = book_row("<tr  class=", name, odds, opening)
+    return row + r"<td><span><\/span><\/td>\n<\/tr>"
+
+
+def page_1x2() -> str:
+    rows = [
+        row_1x2("bet365", ["1.50", "3.40", "5.00"]),
+        ### two bookmaker rows without own row start
+        row_1x2("Pinnacle", ["1.55", "3.50", "5.10"], opening=False)
+        + row_1x2("1xBet", ["1.60", "3.30", "4.90"]).replace("<tr  class=", "<tr  "),
+        ### footer
+        row_1x2("Average", ["1.55", "3.40", "5.00"]),
+    ]
+    return r'{"odds":"<table>' + "".join(rows) + r'<\/table>"}'
+
+
+class TestOddsDate:
+    def test_utc(self):
+        ### 14:05 at UTC+1
+        assert parse_odds_date("16,07,2023,14,05") == 1689512700
+
+    def test_host_timezone(self, monkeypatch):
+        parse_odds_date.cache_clear()
+        monkeypatch.setenv("TZ", "America/New_York")
+        time.tzset()
+        try:
+            assert parse_odds_date("16,07,2023,14,05") == 1689512700
+        finally:
+            monkeypatch.delenv("TZ")
+            time.tzset()
+
+
+class TestBetExplorerParser:
+    def test_ha(self):
+        match = MatchOddsHASDM(code="K831uSar", odds_type=OddsType.ODDS_HA)
+        match = BetExplorerParser().parse_ha(ha_page(), match)
+
+        assert [b.name for b in match.odds] == ["bet365", "Pinnacle"]
+
+        bet365 = match.odds[0]
+        assert (bet365.odds_t1, bet365.odds_t2) == (1.5, 2.6)
+        assert (bet365.open_odds_t1, bet365.open_odds_t2) == (1.6, 2.7)
+        assert bet365.odds_date == 1689512700
+        assert bet365.open_odds_date == 1689323400
+
+        pinnacle = match.odds[1]
+        assert pinnacle.open_odds_t1 is None
+        assert pinnacle.open_odds_date is None
+
+    def test_1x2(self):
+        match = MatchOdds1x2SDM(code="hMwfbhsh", odds_type=OddsType.ODDS_1x2)
+        match = BetExplorerParser().parse_1x2(page_1x2(), match)
+
+        assert [b.name for b in match.odds] == ["bet365", "Pinnacle", "1xBet"]
+        assert [b.odds_x for b in match.odds] == [3.4, 3.5, 3.3]
+        assert match.odds[0].open_odds_t2 == 5.1
+        assert match.odds[1].open_odds_x is None
+
+    def test_empty(self):
+        match = MatchOddsHASDM(code="K831uSar", odds_type=OddsType.ODDS_HA)
+        assert BetExplorerParser().parse_ha('{"odds":""}', match).odds == []
+
+
+def ha_url(code: str) -> str:
+    return f"https://www.betexplorer.com/match-odds-old/{code}/1/ha/1/"
+
+
+def get_scraper(codes: list[str]) -> tuple[BetExplorerScraper, ReplayTransport]:
+    archive = ResponseArchive()
+    for code in codes:
+        archive.put(ha_url(code), ha_page())
+
+    transport = ReplayTransport(archive, latency=0.05)
+    scraper = BetExplorerScraper(
+        SPORT.TENNIS_MEN,
+        session=ScraperSession(transport=transport),
+    )
+    return scraper, transport
+
+
+class TestScrapeMany:
+    @pytest.mark.asyncio
+    async def test_single_flight(self):
+        scraper, transport = get_scraper(["K831uSar"])
+
+        results = await asyncio.gather(*[scraper.scrape("K831uSar") for _ in range(5)])
+
+        assert transport.hits == 1
+        assert scraper.coalesced == 4
+        assert all(r == results[0] for r in results)
+        ### waiters don't share mutable models
+        assert len({id(r) for r in results}) == 5
+        assert len({id(r.odds[0]) for r in results}) == 5
+        assert scraper.in_flight == {}
+
+    @pytest.mark.asyncio
+    async def test_finished_not_coalesced(self):
+        scraper, transport = get_scraper(["K831uSar"])
+
+        await asyncio.gather(
+            scraper.scrape("K831uSar"),
+            scraper.scrape("K831uSar", StatusCode.get("3")),
+        )
+
+        assert transport.hits == 2
+        assert scraper.coalesced == 0
+
+    @pytest.mark.asyncio
+    async def test_stream(self):
+        codes = ["code0", "code1", "code2"]
+        scraper, transport = get_scraper(codes)
+
+        streamed = [odds async for odds in scraper.scrape_many(codes + codes)]
+
+        assert sorted(o.code for o in streamed) == codes
+        assert transport.hits == 3
+        assert all(len(o.odds) == 2 for o in streamed)
+
+    @pytest.mark.asyncio
+    async def test_changed_only(self):
+        codes = ["code0", "code1"]
+        scraper, transport = get_scraper(codes)
+
+        first = [o async for o in scraper.scrape_many(codes, changed_only=True)]
+        assert len(first) == 2
+
+        transport.archive.put(ha_url("code1"), ha_page().replace("1.50", "1.45"))
+        second = [o async for o in scraper.scrape_many(codes, changed_only=True)]
+
+        assert [o.code for o in second] == ["code1"]
+        assert second[0].odds[0].odds_t1 == 1.45
+
+    @pytest.mark.asyncio
+    async def test_plain_scrape_keeps_change(self):
+        scraper, transport = get_scraper(["code0"])
+
+        await scraper.scrape("code0", changed_only=True)
+        transport.archive.put(ha_url("code0"), ha_page().replace("1.50", "1.45"))
+
+        ### collect scrape doesn't consume the change of recollect
+        assert (await scraper.scrape("code0")).odds[0].odds_t1 == 1.45
+        changed = await scraper.scrape("code0", changed_only=True)
+        assert changed is not None and changed.odds[0].odds_t1 == 1.45
+
+    @pytest.mark.asyncio
+    async def test_hashes_bounded(self):
+        codes = ["code0", "code1", "code2"]
+        scraper, _ = get_scraper(codes)
+        scraper.body_hashes_size = 2
+
+        for code in codes:
+            await scraper.scrape(code, changed_only=True)
+
+        assert list(scraper.body_hashes) == ["code1", "code2"]
+
+    @pytest.mark.asyncio
+    async def test_finished_forgotten(self):
+        scraper, _ = get_scraper(["K831uSar"])
+
+        await scraper.scrape("K831uSar", changed_only=True)
+        assert "K831uSar" in scraper.body_hashes
+
+        await scraper.scrape("K831uSar", StatusCode.get("3"))
+        assert scraper.body_hashes == {}
@@ -1,7 +1,11 @@
 import re
 import sys
 from pathlib import Path
+from typing import Iterator
+from types import MappingProxyType
+from collections import OrderedDict
 from abc import ABC, abstractmethod
+from pydantic import ConfigDict
 from aiohttp.client_exceptions import ClientOSError, ServerDisconnectedError
 
 
@@ -9,21 +13,116 @@ ROOT_DIR = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(ROOT_DIR))
 
 from settings import settings
-from service.base_scraper import BaseScraper
+from service.base_scraper import BaseScraper, ScraperSession, ThrottledError
 from manager.service import SportType, SPORT, StatusCode
-from model.service import TournamentNameParsed
+from model.service import TournamentNameParsed, MatchCodeRecord
 
 
 FS_MAX_RATE = settings.FLASHSCORE_MAX_RATE
 FS_RATE_PERIOD = settings.FLASHSCORE_RATE_PERIOD
 
+### distinct tournament names kept parsed (a few hundred per sport in practice)
+TOURNAMENT_CACHE_SIZE = 4096
+
+### FlashScore feed: '¬~' starts record, '¬' splits fields, '÷' splits key/value
+FEED_FIELD_RX = re.compile(r"(?:^|¬)(~?)([^¬~÷]+)÷([^¬]*)")
+
+
+def iter_feed(response: str) -> Iterator[tuple[bool, str, str]]:
+    """
+    Tokenize FlashScore feed in one pass.
+    Yields (record_start, key, value): record_start is True for first field of record.
+    """
+
+    for field in FEED_FIELD_RX.finditer(response):
+        record_start = field.start() == 0 or field.group(1) == "~"
+        yield record_start, field.group(2), field.group(3)
+
+
+def iter_feed_records(response: str) -> Iterator[dict[str, str]]:
+    """Yield feed records as key -> value (first value if key repeats)"""
+
+    record: dict[str, str] | None = None
+    for record_start, key, value in iter_feed(response):
+        if record_start or record is None:
+            if record:
+                yield record
+            record = {}
+
+        record.setdefault(key, value)
+
+    if record:
+        yield record
+
+
+class TournamentNameParsedShared(TournamentNameParsed):
+    """Parsed tournament name shared through TournamentNameParser cache"""
+
+    model_config = ConfigDict(frozen=True)
+
 
 class TournamentNameParser:
+    """
+    Tournament names are parsed once: results are kept in bounded LRU table
+    keyed by full name and shared by all callers (read-only).
+    """
+
+    maxsize = TOURNAMENT_CACHE_SIZE
+    table: OrderedDict[str, tuple[TournamentNameParsedShared, MappingProxyType]] = (
+        OrderedDict()
+    )
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def parse(cls, tournament_fullname: str) -> TournamentNameParsedShared:
+        return cls.lookup(tournament_fullname)[0]
+
+    @classmethod
+    def fields(cls, tournament_fullname: str) -> MappingProxyType:
+        """Read-only TournamentNameParsed fields"""
+        return cls.lookup(tournament_fullname)[1]
+
     @classmethod
-    def parse(
+    def lookup(
         cls,
         tournament_fullname: str,
-    ) -> TournamentNameParsed:
+    ) -> tuple[TournamentNameParsedShared, MappingProxyType]:
+        entry = cls.table.get(tournament_fullname)
+        if entry is not None:
+            cls.hits += 1
+            cls.table.move_to_end(tournament_fullname)
+            return entry
+
+        cls.misses += 1
+        parsed = cls.parse_name(tournament_fullname)
+        entry = (parsed, MappingProxyType(parsed.model_dump()))
+
+        cls.table[tournament_fullname] = entry
+        if len(cls.table) > cls.maxsize:
+            cls.table.popitem(last=False)
+        return entry
+
+    @classmethod
+    def cache_info(cls) -> dict[str, int]:
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "size": len(cls.table),
+            "maxsize": cls.maxsize,
+        }
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        cls.table.clear()
+        cls.hits = 0
+        cls.misses = 0
+
+    @classmethod
+    def parse_name(
+        cls,
+        tournament_fullname: str,
+    ) -> TournamentNameParsedShared:
         qualification = False
         if "qualifi" in tournament_fullname.lower():
             qualification = True
@@ -47,7 +146,7 @@ class TournamentNameParser:
                     tournament_stage = partspl[-1].strip()
                 tournament_name = "-".join(partspl[:-1]).strip()
 
-        return TournamentNameParsed(
+        return TournamentNameParsedShared(
             tournament_fullname=tournament_fullname,
             qualification=qualification,
             tournament_category=tournament_category,
@@ -56,13 +155,40 @@ class TournamentNameParser:
         )
 
 
+def iter_match_records(response: str) -> Iterator[MatchCodeRecord]:
+    """
+    Parse match codes of feed grouped by tournaments.
+    ZA record: tournament header, AA record: match of last tournament.
+    All matches of tournament share read-only fields of its parsed name.
+    """
+
+    tournament: MappingProxyType | None = None
+    for record in iter_feed_records(response):
+        if "ZA" in record:
+            tournament = TournamentNameParser.fields(record["ZA"])
+
+        elif "AA" in record and tournament is not None:
+            status = StatusCode.get(record.get("AC", StatusCode.UNDEFINED))
+            yield MatchCodeRecord(tournament, record["AA"], int(record["AD"]), status)
+
+
+def parse_match_codes(response: str) -> list[MatchCodeRecord]:
+    return list(iter_match_records(response))
+
+
 class FlashScoreScraper(BaseScraper, ABC):
-    def __init__(self, proxy: str = None, debug: bool = False):
+    def __init__(
+        self,
+        proxy: str = None,
+        debug: bool = False,
+        session: ScraperSession | None = None,
+    ):
         super().__init__(
             proxy=proxy,
             max_rate=FS_MAX_RATE,
             rate_period=FS_RATE_PERIOD,
             debug=debug,
+            session=session,
         )
 
     @property
@@ -81,9 +207,9 @@ class FlashScoreScraper(BaseScraper, ABC):
             "sec-ch-ua-platform": '"Linux"',
         }
 
-    async def request(self, url: str) -> str | None:
+    async def request(self, url: str, store: bool = True) -> str | None:
         try:
-            return await super().request(url)
+            return await super().request(url, store)
 
         except ServerDisconnectedError as ex:
             print("Exception at url", url, ex)
@@ -91,6 +217,9 @@ class FlashScoreScraper(BaseScraper, ABC):
         except ClientOSError as ex:
             print("Exception at url", url, ex)
 
+        except ThrottledError as ex:
+            print("Throttled at url", url, ex.status)
+
         return None
 
     @abstractmethod
@@ -1,5 +1,6 @@
 import re
 import sys
+import html
 import asyncio
 from pprint import pprint
 from pathlib import Path
@@ -14,10 +15,12 @@ from model.service import MatchSDM, MatchDescriptionSDM, TimeScoreSDM
 from manager.service import FlashScoreMatchScraperInterface
 from service.flashscore.common import (
     FlashScoreScraper,
+    ScraperSession,
     SportType,
     SPORT,
     StatusCode,
     TournamentNameParser,
+    iter_feed,
 )
 
 
@@ -26,10 +29,31 @@ STATUS_RX = re.compile(r'\{"DB":(\d+)\}')
 PC_RX = re.compile(r"(\d+)\%")
 PCD_PX = re.compile(r"(\d+)\s*\/\s*(\d+)")
 
+### All fields of match-summary page in one scan, first occurrence wins
+DESCRIPTION_RX = re.compile(
+    r'<meta name="og:description" content="(?P<meta>[^"]*)"'
+    r"|<title>(?P<title>(?s:.*?))</title>"
+    r'|"short_name":"(?P<short_name>.+?)"'
+    r'|"home":\[\{"id":"(?P<home>.*?)",'
+    r'|"away":\[\{"id":"(?P<away>.*?)",'
+    r'|"AZ":"?(?P<AZ>\d+)'
+    r'|"DM":"(?P<DM>.+?)(?<=")'
+    r'|"DC":"?(?P<DC>\d+)"?'
+    r'|"DD":"?(?P<DD>\d+)"?'
+    r'|"DE":"?(?P<DE>\d+)'
+    r'|"DF":"?(?P<DF>\d+)'
+    r'|"DG":"?(?P<DG>\d+)'
+    r'|"DH":"?(?P<DH>\d+)'
+)
+DESCRIPTION_REQUIRED = ("meta", "title", "home", "away", "DM", "DC", "DD")
+
 
 class MatchParser:
-    def __init__(self, sport: SportType) -> None:
+    """use_soup: parse match-summary page with BeautifulSoup instead of regex scan"""
+
+    def __init__(self, sport: SportType, use_soup: bool = False) -> None:
         self.sport = sport
+        self.use_soup = use_soup
 
     def code3(self, status: str) -> bool:
         return status == StatusCode.get("3")
@@ -40,66 +64,115 @@ class MatchParser:
     def code11(self, status: str) -> bool:
         return status == StatusCode.get("11")
 
+    def extract_description(self, response: str) -> dict | None:
+        """Fast path: single regex scan without DOM, None if page layout differs"""
+
+        fields: dict[str, str] = {}
+        short_names: list[str] = []
+
+        for found in DESCRIPTION_RX.finditer(response):
+            key = found.lastgroup
+            if key == "short_name":
+                short_names.append(found.group(key))
+            elif key not in fields:
+                fields[key] = found.group(key)
+                if key == "DM":
+                    fields["infobox_start"] = found.start(key)
+
+        if len(short_names) < 2:
+            return None
+        if any(key not in fields for key in DESCRIPTION_REQUIRED):
+            return None
+
+        infobox_start = fields.pop("infobox_start")
+        infobox_end = response.find('"},{', infobox_start)
+        if infobox_end == -1:
+            infobox_end = len(response)
+
+        fields["meta"] = html.unescape(fields["meta"])
+        fields["title"] = html.unescape(fields["title"])
+        fields["short_name1"] = short_names[0]
+        fields["short_name2"] = short_names[1]
+        fields["infobox"] = response[infobox_start:infobox_end]
+
+        return fields
+
+    def extract_description_soup(self, response: str) -> dict:
+        """Fallback: build DOM with BeautifulSoup and search fields one by one"""
+
+        s = soup(response, "lxml")
+        short_names = re.findall(r'"short_name":"(.+?)"', response)
+
+        infobox = response.split('"DM":"')[1]
+        infobox = infobox.split('"},{')[0]
+
+        fields = {
+            "meta": s.find("meta", {"name": "og:description"}).get("content"),
+            "title": s.find("title").text,
+            "short_name1": short_names[0],
+            "short_name2": short_names[1],
+            "home": re.search(r'"home":\[\{"id":"(.*?)",', response).group(1),
+            "away": re.search(r'"away":\[\{"id":"(.*?)",', response).group(1),
+            "DM": re.findall(r'"DM":"(.+?)(?<=")', response)[0],
+            "DC": re.findall(r'"DC":"{0,1}(\d+)"{0,1}', response)[0],
+            "DD": re.findall(r'"DD":"{0,1}(\d+)"{0,1}', response)[0],
+            "infobox": infobox,
+        }
+
+        for key in ("AZ", "DE", "DF", "DG", "DH"):
+            found = re.search(rf'"{key}":"{{0,1}}(\d+)', response)
+            if found:
+                fields[key] = found.group(1)
+
+        return fields
+
     def get_description(
         self,
         match: MatchSDM,
         response: str,
     ) -> MatchSDM:
         if response:
-            s = soup(response, "lxml")
-            tournament_fullname = s.find("meta", {"name": "og:description"}).get(
-                "content"
-            )
+            fields = None
+            if not self.use_soup:
+                fields = self.extract_description(response)
+            if fields is None:
+                fields = self.extract_description_soup(response)
 
-            tournament_name_parsed = TournamentNameParser.parse(tournament_fullname)
+            tournament_fullname = fields["meta"]
+            tournament_name_parsed = TournamentNameParser.fields(tournament_fullname)
 
-            full_names = s.find("title").text.split(" | ")[1].split(" - ")
+            full_names = fields["title"].split(" | ")[1].split(" - ")
             full_name1 = full_names[0].strip()
             full_name2 = full_names[1].strip()
 
-            short_names = re.findall(r'"short_name":"(.+?)"', response)
-            short_name1 = short_names[0]
-            short_name2 = short_names[1]
-
-            code_t1 = re.search(r'"home":\[\{"id":"(.*?)",', response).group(1)
-            code_t2 = re.search(r'"away":\[\{"id":"(.*?)",', response).group(1)
-
-            winner = re.findall(r'"AZ":"{,1}(\d+)', response)
-            winner = int(winner[0].strip()) if winner else None
-
-            reason = re.findall(r'"DM":"(.+?)(?<=")', response)[0].strip()
-
-            start_date = re.findall(r'"DC":"{0,1}(\d+)"{0,1}', response)[0].strip()
-            end_date = re.findall(r'"DD":"{0,1}(\d+)"{0,1}', response)[0].strip()
-
-            infobox = response.split('"DM":"')[1]
-            infobox = infobox.split('"},{')[0]
+            winner = fields.get("AZ")
+            winner = int(winner.strip()) if winner else None
 
             if self.code3(match.status):
-                match_score1 = int(re.findall(r'"DE":"{0,1}(\d+)', response)[0])
-                match_score2 = int(re.findall(r'"DF":"{0,1}(\d+)', response)[0])
+                match_score1 = int(fields["DE"])
+                match_score2 = int(fields["DF"])
             elif self.code10(match.status) or self.code11(match.status):
-                match_score1 = int(re.findall(r'"DG":"{0,1}(\d+)', response)[0])
-                match_score2 = int(re.findall(r'"DH":"{0,1}(\d+)', response)[0])
+                match_score1 = int(fields["DG"])
+                match_score2 = int(fields["DH"])
             else:
                 match_score1 = None
                 match_score2 = None
 
             description = MatchDescriptionSDM(
-                **tournament_name_parsed.model_dump(),
-                code_t1=code_t1,
-                code_t2=code_t2,
+                **tournament_name_parsed,
+                code_t1=fields["home"],
+                code_t2=fields["away"],
                 full_name_t1=full_name1,
                 full_name_t2=full_name2,
-                short_name_t1=short_name1,
-                short_name_t2=short_name2,
+                short_name_t1=fields["short_name1"],
+                short_name_t2=fields["short_name2"],
                 winner=winner,
-                reason=reason,
-                start_date=int(start_date),
-                end_date=int(end_date),
+                reason=fields["DM"].strip(),
+                start_date=int(fields["DC"].strip()),
+                end_date=int(fields["DD"].strip()),
                 score_t1=match_score1,
                 score_t2=match_score2,
-                infobox=infobox,
+                infobox=fields["infobox"],
             )
             match.description = description
 
@@ -188,35 +261,25 @@ class MatchParser:
         match: MatchSDM,
         response: str,
     ) -> MatchSDM:
-        stat_splitter = self.sport.stat_splitter
-
         statistics1 = {}
         statistics2 = {}
 
-        stat_parts_by_iter = response.split("SE÷")[1:]
-        for iter in range(len(stat_parts_by_iter)):
-            stat_part = stat_parts_by_iter[iter]
-            stats = stat_part.split(stat_splitter)
-
-            stat_names, stats1, stats2 = [], [], []
-            for stat in stats[1:]:
-                stat_names.append(stat.split("¬SH÷")[0])
-                stats1.append(stat.split("¬SH÷")[1].split("¬SI÷")[0])
-                stats2.append(stat.split("¬SI÷")[1].split("¬~")[0])
-
-            stats1_time = {}
-            stats2_time = {}
-            for i in range(len(stat_names)):
-                if iter == 0:
-                    time_name = "match"
-                else:
-                    time_name = f"time{iter}"
-
-                stats1_time[stat_names[i]] = self.preprocess_stat(stats1[i])
-                stats2_time[stat_names[i]] = self.preprocess_stat(stats2[i])
-
-            statistics1[time_name] = stats1_time
-            statistics2[time_name] = stats2_time
+        ### SE opens a period, SG names a stat, SH and SI hold team values
+        period = -1
+        stat_name, stat1 = None, None
+        for _, key, value in iter_feed(response):
+            if key == "SE":
+                period += 1
+                time_name = "match" if period == 0 else f"time{period}"
+            elif key == "SG":
+                stat_name, stat1 = value, None
+            elif key == "SH":
+                stat1 = value
+            elif key == "SI" and period >= 0 and stat_name is not None:
+                statistics1.setdefault(time_name, {})
+                statistics2.setdefault(time_name, {})
+                statistics1[time_name][stat_name] = self.preprocess_stat(stat1)
+                statistics2[time_name][stat_name] = self.preprocess_stat(value)
 
         match.statistics1 = statistics1
         match.statistics2 = statistics2
@@ -237,24 +300,38 @@ class MatchParser:
 
 
 class MatchScraper(FlashScoreMatchScraperInterface, FlashScoreScraper):
+    """
+    speculative: request description, score and statistics feeds together
+    even if match status is unknown (feeds are dropped if match isn't finished)
+    use_soup: parse match-summary page with BeautifulSoup (slow fallback)
+    """
+
     def __init__(
         self,
         sport: SportType,
         proxy: str = None,
         debug: bool = False,
+        session: ScraperSession | None = None,
+        speculative: bool = False,
+        use_soup: bool = False,
     ) -> None:
         FlashScoreMatchScraperInterface.__init__(self, sport)
-        FlashScoreScraper.__init__(self, proxy, debug)
+        FlashScoreScraper.__init__(self, proxy, debug, session)
 
-        self.parser = MatchParser(sport)
+        self.parser = MatchParser(sport, use_soup)
+        self.speculative = speculative
 
-    async def scrape_description(
-        self,
-        match: MatchSDM,
-        code: str,
-    ) -> MatchSDM:
-        url = f"https://www.flashscore.co.uk/match/{code}/#/match-summary"
-        response = await self.request(url)
+    def description_url(self, code: str) -> str:
+        return f"https://www.flashscore.co.uk/match/{code}/#/match-summary"
+
+    def score_url(self, code: str) -> str:
+        return f"https://d.flashscore.co.uk/x/feed/df_sur_1_{code}"
+
+    def statistics_url(self, code: str) -> str:
+        st = self.sport.stat_prefix
+        return f"https://d.flashscore.co.uk/x/feed/df_{st}_1_{code}"
+
+    def set_description(self, match: MatchSDM, response: str | None) -> MatchSDM:
         if response is None:
             match.error = True
             return match
@@ -264,20 +341,43 @@ class MatchScraper(FlashScoreMatchScraperInterface, FlashScoreScraper):
 
         return match
 
-    async def scrape_score(
+    def set_score(self, match: MatchSDM, response: str | None) -> MatchSDM:
+        if response is None:
+            match.error = True
+            return match
+
+        return self.parser.get_times_score(match, response)
+
+    def set_statistics(self, match: MatchSDM, response: str | None) -> MatchSDM:
+        if response is None:
+            match.error = True
+            return match
+
+        return self.parser.get_statistics(match, response)
+
+    async def scrape_description(
         self,
         match: MatchSDM,
         code: str,
     ) -> MatchSDM:
+        url = self.description_url(code)
+        response = await self.request(url, store=False)
+        match = self.set_description(match, response)
+
+        ### summary of finished match never changes
         if StatusCode.finished(match.status):
-            url = f"https://d.flashscore.co.uk/x/feed/df_sur_1_{code}"
-            response = await self.request(url)
+            self.store_response(url, response)
 
-            if response is None:
-                match.error = True
-                return match
+        return match
 
-            match = self.parser.get_times_score(match, response)
+    async def scrape_score(
+        self,
+        match: MatchSDM,
+        code: str,
+    ) -> MatchSDM:
+        if StatusCode.finished(match.status):
+            response = await self.request(self.score_url(code))
+            match = self.set_score(match, response)
 
         return match
 
@@ -287,19 +387,46 @@ class MatchScraper(FlashScoreMatchScraperInterface, FlashScoreScraper):
         code: str,
     ) -> MatchSDM:
         if StatusCode.finished(match.status):
-            st = self.sport.stat_prefix
-            url = f"https://d.flashscore.co.uk/x/feed/df_{st}_1_{code}"
-            response = await self.request(url)
+            response = await self.request(self.statistics_url(code))
+            match = self.set_statistics(match, response)
+
+        return match
+
+    async def scrape_concurrently(self, code: str) -> MatchSDM:
+        """Request all match feeds at once (score and statistics need finished match)"""
 
-            if response is None:
-                match.error = True
-                return match
+        match = MatchSDM(code=code)
+        urls = [
+            self.description_url(code),
+            self.score_url(code),
+            self.statistics_url(code),
+        ]
+
+        ### feeds are cached only after match turns out to be finished
+        responses = await asyncio.gather(
+            *[self.request(url, store=False) for url in urls]
+        )
+        description, score, statistics = responses
+
+        match = self.set_description(match, description)
+        if StatusCode.finished(match.status):
+            match = self.set_score(match, score)
+            match = self.set_statistics(match, statistics)
 
-            match = self.parser.get_statistics(match, response)
+            for url, response in zip(urls, responses):
+                self.store_response(url, response)
 
         return match
 
-    async def scrape(self, code: str) -> MatchSDM:
+    async def scrape(self, code: str, status: str | None = None) -> MatchSDM:
+        """
+        status: known match status (from week, tournament or player feeds).
+        Feeds of finished match are requested concurrently.
+        """
+
+        if self.speculative or StatusCode.finished(status):
+            return await self.scrape_concurrently(code)
+
         match = MatchSDM(code=code)
 
         match = await self.scrape_description(match, code)
@@ -8,21 +8,23 @@ ROOT_DIR = Path(__file__).parent.parent.parent.parent
 sys.path.append(str(ROOT_DIR))
 
 
-from model.service import PlayerSDM, MatchCodeSDM
+from model.service import PlayerSDM, MatchCodeSDM, MatchCodeRecord
 from service.flashscore.common import (
     FlashScoreScraper,
+    ScraperSession,
     SportType,
     SPORT,
-    TournamentNameParser,
     StatusCode,
+    iter_feed,
+    parse_match_codes,
+    iter_match_records,
 )
+from manager.frontier import CodeFrontier
 from manager.service import (
     FlashScorePlayerScraperInterface,
     FlashScorePlayerMatchesScraperInterface,
 )
 
-STATUS_CODE_RX = re.compile("¬AC÷(\d+)¬")
-
 
 class PlayerScraper(FlashScorePlayerScraperInterface, FlashScoreScraper):
     """Scrape players from rank"""
@@ -32,31 +34,35 @@ class PlayerScraper(FlashScorePlayerScraperInterface, FlashScoreScraper):
         sport: SportType,
         proxy: str = None,
         debug: bool = False,
+        session: ScraperSession | None = None,
     ) -> None:
         FlashScorePlayerScraperInterface.__init__(self, sport)
-        FlashScoreScraper.__init__(self, proxy, debug)
+        FlashScoreScraper.__init__(self, proxy, debug, session)
 
     def parse(self, response: str) -> list[PlayerSDM]:
-        content = response.split("¬PT÷PN¬PV÷")[1:]
+        """Ranking feed: fields are PT÷<field>¬PV÷<value> pairs, PN starts player"""
+
+        content: list[dict[str, str]] = []
+
+        field = None
+        for _, key, value in iter_feed(response):
+            if key == "PT":
+                field = value
+                if field == "PN":
+                    content.append({})
+            elif key == "PV" and field is not None and content:
+                content[-1].setdefault(field, value)
+                field = None
 
         players: list[PlayerSDM] = []
         for element in content:
-            name = element.split("¬PT÷PI¬PV÷")[0]
-            player_id = element.split("¬PT÷CI¬PV÷")[0].split("¬PT÷PI¬PV÷")[1]
-            country = element.split("¬PT÷RA¬PV÷")[0].split("¬PT÷CN¬PV÷")[1]
-            rank = element.split("¬PT÷RA¬PV÷")[1].split("¬PT÷RAP¬PV÷")[0]
-            if "¬PT÷" in rank:
-                rank = rank.split("¬PT÷")[0]
-            player_link = element.split("¬PT÷PU¬PV÷")[1].split("¬PT÷TP¬PV÷")[0]
-            country_id = element.split("¬PT÷CI¬PV÷")[1].split("¬PT÷CN¬PV÷")[0]
-
             player = PlayerSDM(
-                id=player_id,
-                name=name,
-                country=country,
-                country_id=country_id,
-                rank=rank,
-                link=player_link,
+                id=element["PI"],
+                name=element["PN"],
+                country=element["CN"],
+                country_id=element["CI"],
+                rank=element["RA"],
+                link=element["PU"],
             )
             players.append(player)
 
@@ -75,31 +81,8 @@ class PlayerMatchesParser:
     def __init__(self, sport: SportType):
         self.sport = sport
 
-    def parse_page(self, response: str) -> list[MatchCodeSDM]:
-        matches: list[MatchCodeSDM] = []
-
-        tournaments = response.split("~ZA÷")[1:]
-        for tour in tournaments:
-            splitted = tour.split("¬~AA÷")
-            tournament_fullname = splitted[0].split("¬ZEE÷")[0]
-            tournament_name_parsed = TournamentNameParser.parse(tournament_fullname)
-
-            matches_data = splitted[1:]
-            for match in matches_data:
-                date = match.split("¬AD÷")[1].split("¬ADE÷")[0]
-                code = match.split("¬AD÷")[0]
-                status = StatusCode.extract(STATUS_CODE_RX, match)
-
-                matches.append(
-                    MatchCodeSDM(
-                        **tournament_name_parsed.model_dump(),
-                        date=int(date),
-                        code=code,
-                        status=status,
-                    )
-                )
-
-        return matches
+    def parse_page(self, response: str) -> list[MatchCodeRecord]:
+        return parse_match_codes(response)
 
 
 class PlayerMatchesScaper(FlashScorePlayerMatchesScraperInterface, FlashScoreScraper):
@@ -110,9 +93,10 @@ class PlayerMatchesScaper(FlashScorePlayerMatchesScraperInterface, FlashScoreScr
         sport: SportType,
         proxy: str = None,
         debug: bool = False,
+        session: ScraperSession | None = None,
     ) -> None:
         FlashScorePlayerMatchesScraperInterface.__init__(self, sport)
-        FlashScoreScraper.__init__(self, proxy, debug)
+        FlashScoreScraper.__init__(self, proxy, debug, session)
 
         self.parser = PlayerMatchesParser(sport)
 
@@ -127,7 +111,7 @@ class PlayerMatchesScaper(FlashScorePlayerMatchesScraperInterface, FlashScoreScr
 
         return urls
 
-    async def scrape_page(self, url: str) -> list[MatchCodeSDM]:
+    async def scrape_page(self, url: str) -> list[MatchCodeRecord]:
         response = await self.request(url)
         if response is None:
             return []
@@ -144,10 +128,33 @@ class PlayerMatchesScaper(FlashScorePlayerMatchesScraperInterface, FlashScoreScr
 
         tasks = [asyncio.create_task(self.scrape_page(url)) for url in urls]
         matches = await asyncio.gather(*tasks)
-        matches = [match for sublist in matches for match in sublist]
+        matches = [match.to_sdm() for sublist in matches for match in sublist]
 
         return matches
 
+    async def scrape_page_into(self, frontier: CodeFrontier, url: str) -> int:
+        response = await self.request(url)
+        if response is None:
+            return 0
+
+        return frontier.add_records(iter_match_records(response))
+
+    async def scrape_into(
+        self,
+        frontier: CodeFrontier,
+        player: PlayerSDM,
+        page_limit: int = 20,
+    ) -> int:
+        """Codes go to frontier as records: no models built for duplicates"""
+
+        urls = self.create_urls(player, page_limit)
+
+        tasks = [
+            asyncio.create_task(self.scrape_page_into(frontier, url)) for url in urls
+        ]
+        added = await asyncio.gather(*tasks)
+        return sum(added)
+
 
 async def test_player_match_scraper():
     rank_url = "https://d.flashscore.co.uk/x/feed/ran_dSJr14Y8_2"
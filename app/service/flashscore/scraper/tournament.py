@@ -16,21 +16,21 @@ from model.service import (
     TournamentSDM,
     TournamentByYearSDM,
     MatchCodeSDM,
+    MatchCodeRecord,
     TournamentByYearUrlSDM,
 )
 from service.flashscore.common import (
     FlashScoreScraper,
+    ScraperSession,
     SportType,
     SPORT,
-    StatusCode,
-    TournamentNameParser,
+    parse_match_codes,
 )
 from manager.service import (
     FlashScoreTournamentScraperInterface,
     FlashScoreTournamentMatchesScraperIntefrace,
 )
-
-STATUS_CODE_RX = re.compile("¬AC÷(\d+)¬")
+from manager.frontier import CodeFrontier
 
 
 class TournamentScraper(
@@ -44,9 +44,10 @@ class TournamentScraper(
         sport: SportType,
         proxy: str = None,
         debug: bool = False,
+        session: ScraperSession | None = None,
     ) -> None:
         FlashScoreTournamentMatchesScraperIntefrace.__init__(self, sport)
-        FlashScoreScraper.__init__(self, proxy, debug)
+        FlashScoreScraper.__init__(self, proxy, debug, session)
 
     def parse_archive(self, response: str, tournament: TournamentSDM) -> TournamentSDM:
         tournament_links: list[str] = []
@@ -150,31 +151,11 @@ class TournamentMatchesParser:
 
     def parse_first(
         self, response: str
-    ) -> tuple[list[MatchCodeSDM], TournamentByYearSDM]:
-        matches: list[MatchCodeSDM] = []
-
+    ) -> tuple[list[MatchCodeRecord], TournamentByYearSDM]:
         # 1. Сбор матчей
         match_block = response.split("allEventsCount")[0]
         match_block = match_block.split("initialFeeds['results']")[1]
-        raw_matches = match_block.split("¬~AA÷")[1:]
-
-        tournament_fullname = match_block.split("¬~ZA÷")[1]
-        tournament_fullname = tournament_fullname.split("¬ZEE÷")[0]
-        tournament_name_parsed = TournamentNameParser.parse(tournament_fullname)
-
-        for raw_match in raw_matches:
-            code = raw_match.split("¬AD÷")[0]
-            date = raw_match.split("¬AD÷")[1].split("¬ADE÷")[0]
-            status = StatusCode.extract(STATUS_CODE_RX, raw_match)
-
-            matches.append(
-                MatchCodeSDM(
-                    **tournament_name_parsed.model_dump(),
-                    date=date,
-                    code=code,
-                    status=status,
-                )
-            )
+        matches = parse_match_codes(match_block)
 
         # 2. Проверка количества матчей
         events_count = response.split("allEventsCount: ")[1]
@@ -197,29 +178,8 @@ class TournamentMatchesParser:
 
         return matches, tournament
 
-    def parse_other(self, response: str) -> list[MatchCodeSDM]:
-        codes: list[MatchCodeSDM] = []
-
-        tournament_fullname = response.split("¬~ZA÷")[1]
-        tournament_fullname = tournament_fullname.split("¬ZEE÷")[0]
-        tournament_name_parsed = TournamentNameParser.parse(tournament_fullname)
-
-        raw_matches = response.split("¬~AA÷")[1:]
-        for raw_match in raw_matches:
-            code = raw_match.split("¬AD÷")[0]
-            date = raw_match.split("¬AD÷")[1].split("¬ADE÷")[0]
-            status = StatusCode.extract(STATUS_CODE_RX, raw_match)
-
-            codes.append(
-                MatchCodeSDM(
-                    **tournament_name_parsed.model_dump(),
-                    date=date,
-                    code=code,
-                    status=status,
-                )
-            )
-
-        return codes
+    def parse_other(self, response: str) -> list[MatchCodeRecord]:
+        return parse_match_codes(response)
 
 
 class TournamentMatchesScraper(
@@ -231,17 +191,18 @@ class TournamentMatchesScraper(
         sport: SportType,
         proxy: str = None,
         debug: bool = False,
+        session: ScraperSession | None = None,
     ) -> None:
         FlashScoreTournamentMatchesScraperIntefrace.__init__(self, sport)
-        FlashScoreScraper.__init__(self, proxy, debug)
+        FlashScoreScraper.__init__(self, proxy, debug, session)
 
         self.parser = TournamentMatchesParser(sport)
 
     async def scrape_other(
         self,
-        matches: list[MatchCodeSDM],
+        matches: list[MatchCodeRecord],
         tournament: TournamentByYearSDM,
-    ) -> MatchCodeSDM:
+    ) -> list[MatchCodeRecord]:
         while not tournament.parsed():
             url = tournament.get_url()
             if url is not None:
@@ -259,16 +220,22 @@ class TournamentMatchesScraper(
 
     async def scrape_first(
         self, url: str
-    ) -> tuple[list[MatchCodeSDM], TournamentByYearSDM]:
+    ) -> tuple[list[MatchCodeRecord], TournamentByYearSDM]:
         response = await self.request(url)
         matches, tournament = self.parser.parse_first(response)
         return matches, tournament
 
-    async def scrape(self, url: str) -> list[MatchCodeSDM]:
+    async def scrape_records(self, url: str) -> list[MatchCodeRecord]:
         matches, tournament = await self.scrape_first(url)
-        matches = await self.scrape_other(matches, tournament)
-        matches = MatchCodeSDM.drop_dups(matches)
-        return matches
+        return await self.scrape_other(matches, tournament)
+
+    async def scrape(self, url: str) -> list[MatchCodeSDM]:
+        matches = MatchCodeSDM.drop_dups(await self.scrape_records(url))
+        return [m.to_sdm() for m in matches]
+
+    async def scrape_into(self, frontier: CodeFrontier, url: str) -> int:
+        """Codes go to frontier as records: no models built for duplicates"""
+        return frontier.add_codes(await self.scrape_records(url))
 
 
 async def test():
@@ -12,18 +12,18 @@ ROOT_DIR = Path(__file__).parent.parent.parent.parent
 sys.path.append(str(ROOT_DIR))
 
 
-from model.service import MatchCodeSDM
+from model.service import MatchCodeSDM, MatchCodeRecord
 from manager.service import FlashScoreWeeklyMatchesScraper, FUTURE_DAYS
 from service.flashscore.common import (
     FlashScoreScraper,
+    ScraperSession,
     SportType,
     SPORT,
     StatusCode,
-    TournamentNameParser,
+    parse_match_codes,
+    iter_match_records,
 )
-
-
-STATUS_CODE_RX = re.compile(r"¬AC÷(\d+)¬")
+from manager.frontier import CodeFrontier
 
 
 class WeeklyMatchesScraper(
@@ -35,43 +35,20 @@ class WeeklyMatchesScraper(
         sport: SportType,
         proxy: str = None,
         debug: bool = False,
+        session: ScraperSession | None = None,
     ) -> None:
         FlashScoreWeeklyMatchesScraper.__init__(self, sport)
-        FlashScoreScraper.__init__(self, proxy, debug)
-
-    def parse_day(self, response: str) -> list[MatchCodeSDM]:
-        matches: list[MatchCodeSDM] = []
-
-        raw_tournament_data = []
-        raw_tournaments = response.split("~ZA÷")[1:]
-        for raw_tournament in raw_tournaments:
-            raw_tournament_data.append(raw_tournament)
-
-        for tournament in raw_tournament_data:
-            tournament_name = tournament.split("¬ZEE÷")[0]
-            tournament_name_parsed = TournamentNameParser.parse(tournament_name)
-
-            raw_matches = tournament.split("¬~AA÷")[1:]
-            for raw_match in raw_matches:
-                code = raw_match.split("¬AD÷")[0]
-                date = raw_match.split("¬AD÷")[1].split("¬ADE÷")[0]
-                status = StatusCode.extract(STATUS_CODE_RX, raw_match)
+        FlashScoreScraper.__init__(self, proxy, debug, session)
 
-                match = MatchCodeSDM(
-                    **tournament_name_parsed.model_dump(),
-                    code=code,
-                    date=int(date),
-                    status=status,
-                )
-                matches.append(match)
+    def parse_day(self, response: str) -> list[MatchCodeRecord]:
+        return parse_match_codes(response)
 
-        return matches
-
-    async def scrape_day(self, day: int) -> list[MatchCodeSDM]:
+    def day_url(self, day: int) -> str:
         page = "0" if day == 0 else f"{day}"
-        url = f"https://d.flashscore.co.uk/x/feed/{self.sport.week_prefix}_{page}_5_en-uk_1"
+        return f"https://d.flashscore.co.uk/x/feed/{self.sport.week_prefix}_{page}_5_en-uk_1"
 
-        response = await self.request(url)
+    async def scrape_day(self, day: int) -> list[MatchCodeRecord]:
+        response = await self.request(self.day_url(day))
         if response is None:
             return []
 
@@ -81,9 +58,21 @@ class WeeklyMatchesScraper(
         tasks = [asyncio.create_task(self.scrape_day(d)) for d in days]
 
         week_matches = await asyncio.gather(*tasks)
-        week_matches = [wt for sub in week_matches for wt in sub]
+        week_matches = [wt.to_sdm() for sub in week_matches for wt in sub]
         return week_matches
 
+    async def scrape_day_into(self, frontier: CodeFrontier, day: int) -> int:
+        response = await self.request(self.day_url(day))
+        if response is None:
+            return 0
+
+        return frontier.add_records(iter_match_records(response))
+
+    async def scrape_into(self, frontier: CodeFrontier, days: list[int]) -> int:
+        tasks = [asyncio.create_task(self.scrape_day_into(frontier, d)) for d in days]
+        added = await asyncio.gather(*tasks)
+        return sum(added)
+
 
 async def test():
     scraper = WeeklyMatchesScraper(sport=SPORT.TENNIS_MEN)
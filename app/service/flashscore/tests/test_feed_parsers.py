@@ -0,0 +1,199 @@
+import sys
+from pathlib import Path
+import pytest
+from pydantic import ValidationError
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from flashscore.common import (
+    SPORT,
+    StatusCode,
+    TournamentNameParser,
+    iter_feed_records,
+    iter_match_records,
+    parse_match_codes,
+)
+from model.service import MatchCodeSDM
+from manager.frontier import CodeFrontier
+from flashscore.scraper.week import WeeklyMatchesScraper
+from flashscore.scraper.player import PlayerScraper, PlayerMatchesParser
+from flashscore.scraper.tournament import TournamentMatchesParser
+
+
+### Offline feeds shaped like FlashScore responses
+DAY_FEED = (
+    "SA÷2¬~ZA÷ATP - SINGLES: Wimbledon (United Kingdom), grass - Final"
+    "¬ZEE÷nZi4fKds¬ZB÷198¬~AA÷K831uSar¬AD÷1689512400¬ADE÷1689512400"
+    "¬AB÷3¬CR÷3¬AC÷3¬CX÷Alcaraz C."
+    "¬~ZA÷WTA - SINGLES: Wimbledon (United Kingdom), grass - Semi-finals"
+    "¬ZEE÷jT3UuCZo¬ZB÷198¬~AA÷6Zx2NWNb¬AD÷1689253200¬ADE÷1689253200"
+    "¬AB÷1¬CR÷1¬AC÷1¬CX÷Vondrousova M."
+    "¬~AA÷rJEpcQvE¬AD÷1689260400¬ADE÷1689260400"
+    "¬AB÷3¬CR÷3¬AC÷8¬CX÷Svitolina E.¬~A1÷4f¬~"
+)
+
+RANKING_FEED = (
+    "SA÷2¬~PT÷RK¬PV÷1¬PT÷PN¬PV÷Djokovic Novak¬PT÷PI¬PV÷AZg49Et9¬PT÷CI¬PV÷167"
+    "¬PT÷CN¬PV÷Serbia¬PT÷RA¬PV÷1¬PT÷RAP¬PV÷11245"
+    "¬PT÷PU¬PV÷/player/djokovic-novak/AZg49Et9/"
+    "¬PT÷TP¬PV÷20¬~PT÷RK¬PV÷2¬PT÷PN¬PV÷Alcaraz Carlos¬PT÷PI¬PV÷UkhgIFEq¬PT÷CI¬PV÷176"
+    "¬PT÷CN¬PV÷Spain¬PT÷RA¬PV÷2¬PT÷RAP¬PV÷8855"
+    "¬PT÷PU¬PV÷/player/alcaraz-carlos/UkhgIFEq/¬PT÷TP¬PV÷19¬~"
+)
+
+TOURNAMENT_PAGE = (
+    "<script>cjs.initialFeeds['results'] = { data: `"
+    + DAY_FEED.split("¬~ZA÷WTA")[0]
+    + "¬~`, allEventsCount: 120, };\n"
+    'getToggleIcon("tournament_2_nZi4fKds", true); seasonId: 2023,</script>'
+)
+
+
+class TestIterFeedRecords:
+    def test_records(self):
+        records = list(iter_feed_records("SA÷2¬~AA÷K831uSar¬AD÷1¬AD÷2¬~A1÷4f¬~"))
+
+        assert records == [
+            {"SA": "2"},
+            {"AA": "K831uSar", "AD": "1"},
+            {"A1": "4f"},
+        ]
+
+    def test_empty(self):
+        assert list(iter_feed_records("")) == []
+
+
+class TestParseMatchCodes:
+    def test_tournaments(self):
+        matches = parse_match_codes(DAY_FEED)
+
+        assert [m.code for m in matches] == ["K831uSar", "6Zx2NWNb", "rJEpcQvE"]
+        assert [m.status for m in matches] == [
+            StatusCode.get("3"),
+            StatusCode.get("1"),
+            StatusCode.get("8"),
+        ]
+        assert matches[0].date == 1689512400
+        assert matches[0].tournament_name == "Wimbledon (United Kingdom), grass"
+        assert matches[0].tournament_stage == "Final"
+        assert matches[2].tournament_category == "WTA - SINGLES"
+        assert matches[2].tournament_stage == "Semi-finals"
+
+    def test_same_result_for_all_feeds(self):
+        week = WeeklyMatchesScraper(SPORT.TENNIS_MEN).parse_day(DAY_FEED)
+        player = PlayerMatchesParser(SPORT.TENNIS_MEN).parse_page(DAY_FEED)
+
+        assert week == player == parse_match_codes(DAY_FEED)
+
+
+class TestRankingParser:
+    def test_players(self):
+        players = PlayerScraper(SPORT.TENNIS_MEN).parse(RANKING_FEED)
+
+        assert [p.id for p in players] == ["AZg49Et9", "UkhgIFEq"]
+        assert players[1].name == "Alcaraz Carlos"
+        assert players[1].country == "Spain"
+        assert players[1].country_id == 176
+        assert players[1].rank == 2
+        assert players[1].link == "/player/alcaraz-carlos/UkhgIFEq/"
+
+
+class TestTournamentMatchesParser:
+    def test_first_page(self):
+        parser = TournamentMatchesParser(SPORT.TENNIS_MEN)
+        matches, tournament = parser.parse_first(TOURNAMENT_PAGE)
+
+        assert [m.code for m in matches] == ["K831uSar"]
+        assert tournament.events_count == 120
+        assert tournament.season_id == "2023"
+        assert tournament.league == "tournament_2_nZi4fKds"
+
+
+class TestMatchRecords:
+    def test_shared_tournament(self):
+        matches = parse_match_codes(DAY_FEED + DAY_FEED)
+
+        assert matches[1].tournament is matches[2].tournament
+        assert matches[1].tournament is matches[4].tournament
+        assert matches[0].tournament is not matches[1].tournament
+
+    def test_to_sdm(self):
+        for record in parse_match_codes(DAY_FEED):
+            sdm = record.to_sdm()
+            assert sdm == record
+            assert sdm.tournament_category == record.tournament_category
+            assert (sdm.code, sdm.date, sdm.status) == (
+                record.code,
+                record.date,
+                record.status,
+            )
+
+    def test_frontier_records(self):
+        frontier = CodeFrontier()
+        frontier.add_records(iter_match_records(DAY_FEED))
+        frontier.add_records(iter_match_records(DAY_FEED))
+
+        assert frontier.duplicates == 3
+        assert frontier.select() == parse_match_codes(DAY_FEED)
+        assert [m.model_dump() for m in frontier.select()] == [
+            m.to_sdm().model_dump() for m in parse_match_codes(DAY_FEED)
+        ]
+
+
+class LocalWeeklyMatchesScraper(WeeklyMatchesScraper):
+    async def request(self, url: str, store: bool = True) -> str:
+        return DAY_FEED
+
+
+class TestScrapeBoundary:
+    @pytest.mark.asyncio
+    async def test_scrape_returns_sdm(self):
+        matches = await LocalWeeklyMatchesScraper(SPORT.TENNIS_MEN).scrape([0])
+
+        assert all(type(m) is MatchCodeSDM for m in matches)
+        assert matches == [r.to_sdm() for r in parse_match_codes(DAY_FEED)]
+
+    @pytest.mark.asyncio
+    async def test_scrape_into_records(self):
+        frontier = CodeFrontier()
+        added = await LocalWeeklyMatchesScraper(SPORT.TENNIS_MEN).scrape_into(
+            frontier, [0, 1]
+        )
+
+        assert added == 3
+        assert frontier.duplicates == 3
+
+
+class TestTournamentNameParser:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        TournamentNameParser.cache_clear()
+        yield
+        TournamentNameParser.cache_clear()
+
+    def test_shared(self):
+        name = "ATP - SINGLES: Wimbledon (United Kingdom), grass - Final"
+
+        parsed = TournamentNameParser.parse(name)
+        assert TournamentNameParser.parse(name) is parsed
+        assert TournamentNameParser.fields(name)["tournament_stage"] == "Final"
+        assert TournamentNameParser.cache_info() == {
+            "hits": 2,
+            "misses": 1,
+            "size": 1,
+            "maxsize": TournamentNameParser.maxsize,
+        }
+
+        with pytest.raises(ValidationError):
+            parsed.tournament_stage = "Semi-finals"
+        with pytest.raises(TypeError):
+            TournamentNameParser.fields(name)["tournament_stage"] = "Semi-finals"
+
+    def test_bounded(self, monkeypatch):
+        monkeypatch.setattr(TournamentNameParser, "maxsize", 2)
+
+        for name in ("A: X - 1", "B: Y - 2", "A: X - 1", "C: Z - 3"):
+            TournamentNameParser.parse(name)
+
+        assert list(TournamentNameParser.table) == ["A: X - 1", "C: Z - 3"]
+        assert TournamentNameParser.misses == 3
@@ -0,0 +1,173 @@
+import sys
+import asyncio
+from pathlib import Path
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from flashscore.common import SPORT, StatusCode, ScraperSession
+from flashscore.scraper.match import MatchScraper, MatchParser, MatchSDM
+from service.response_cache import ResponseCache
+
+
+### Offline pages shaped like FlashScore responses
+SUMMARY_PAGE = """<!DOCTYPE html><html lang="en"><head>
+<meta charset="utf-8">
+<meta name="og:description" content="ATP - SINGLES: Wimbledon (United Kingdom), grass - Final">
+<title>3-2 | Alcaraz Carlos - Djokovic Novak | Wimbledon</title>
+</head><body><script>
+window.environment = {"event_id_c":"K831uSar","participantsData":{"home":[{"id":"UkhgIFEq","name":"Alcaraz C.","short_name":"Alcaraz C."}],"away":[{"id":"AZg49Et9","name":"Djokovic N.","short_name":"Djokovic N."}]},"common_feed":{"DB":3},"header":[{"AZ":"1"},{"DM":"Playing under a closed roof."},{"DC":1689512400,"DD":1689528000},{"DE":"3","DF":"2"}]};
+</script></body></html>"""
+
+FUTURE_SUMMARY_PAGE = (
+    SUMMARY_PAGE.replace('{"DB":3}', '{"DB":1}')
+    .replace('{"AZ":"1"},', "")
+    .replace('{"DE":"3","DF":"2"}', '{"X":"0"}')
+)
+
+SCORE_FEED = (
+    "SA÷2¬~BA÷6¬BB÷4¬RA÷0:45¬~BA÷6¬BB÷7¬DA÷5¬DB÷7¬RB÷1:05¬~"
+    "BA÷6¬BB÷3¬RC÷0:40¬~BA÷3¬BB÷6¬RD÷0:38¬~BA÷6¬BB÷4¬RE÷0:52¬~"
+)
+
+STATISTICS_FEED = (
+    "SE÷Match¬~SF÷Service¬~SG÷Aces¬SH÷5¬SI÷3¬~"
+    "SG÷1st serve percentage¬SH÷65% (40/61)¬SI÷60% (30/50)¬~"
+    "SG÷Break points saved¬SH÷75%¬SI÷50%¬~"
+    "SE÷Set 1¬~SF÷Service¬~SG÷Aces¬SH÷2¬SI÷1¬~A1÷4ad29ec2¬~"
+)
+
+
+class LocalMatchScraper(MatchScraper):
+    """Answer with offline pages and track concurrent requests"""
+
+    def __init__(self, summary: str = SUMMARY_PAGE, **kwargs) -> None:
+        super().__init__(sport=SPORT.TENNIS_MEN, **kwargs)
+        self.summary = summary
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.urls: list[str] = []
+
+    async def fetch(self, url: str, store: bool = True) -> str | None:
+        self.urls.append(url)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        response = None
+        if "match-summary" in url:
+            response = self.summary
+        elif "df_sur" in url:
+            response = SCORE_FEED
+        elif "df_st" in url:
+            response = STATISTICS_FEED
+
+        if store:
+            self.store_response(url, response)
+        return response
+
+
+class TestMatchScraperFetchModes:
+    @pytest.mark.asyncio
+    async def test_sequential(self):
+        scraper = LocalMatchScraper()
+        match = await scraper.scrape("K831uSar")
+
+        assert scraper.max_in_flight == 1
+        assert len(scraper.urls) == 3
+        assert match.status == StatusCode.get("3")
+        assert match.time5.score_t1 == 6
+
+    @pytest.mark.asyncio
+    async def test_finished_hint(self):
+        sequential = await LocalMatchScraper().scrape("K831uSar")
+
+        scraper = LocalMatchScraper()
+        match = await scraper.scrape("K831uSar", StatusCode.get("3"))
+
+        assert scraper.max_in_flight == 3
+        assert match == sequential
+
+    @pytest.mark.asyncio
+    async def test_not_finished_hint(self):
+        scraper = LocalMatchScraper()
+        await scraper.scrape("K831uSar", StatusCode.get("1"))
+
+        assert scraper.max_in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_speculative_not_finished(self):
+        sequential = await LocalMatchScraper(FUTURE_SUMMARY_PAGE).scrape("K831uSar")
+
+        scraper = LocalMatchScraper(FUTURE_SUMMARY_PAGE, speculative=True)
+        match = await scraper.scrape("K831uSar")
+
+        assert scraper.max_in_flight == 3
+        assert match.status == StatusCode.get("1")
+        assert match.time1 is None
+        assert match.statistics1 == {}
+        assert match == sequential
+
+
+class TestMatchDescription:
+    def get_description(self, page: str, use_soup: bool):
+        parser = MatchParser(SPORT.TENNIS_MEN, use_soup)
+        match = MatchSDM(code="K831uSar", status=StatusCode.get("3"))
+        return parser.get_description(match, page).description
+
+    def test_fast_same_as_soup(self):
+        fast = self.get_description(SUMMARY_PAGE, use_soup=False)
+        slow = self.get_description(SUMMARY_PAGE, use_soup=True)
+
+        assert fast == slow
+        assert fast.full_name_t1 == "Alcaraz Carlos"
+        assert fast.code_t2 == "AZg49Et9"
+        assert fast.winner == 1
+        assert fast.score_t1 == 3
+        assert fast.infobox == "Playing under a closed roof."
+
+    def test_html_entities(self):
+        page = SUMMARY_PAGE.replace("Alcaraz Carlos", "Alcaraz &amp; Carlos")
+        fast = self.get_description(page, use_soup=False)
+
+        assert fast == self.get_description(page, use_soup=True)
+        assert fast.full_name_t1 == "Alcaraz & Carlos"
+
+    def test_soup_fallback(self):
+        page = SUMMARY_PAGE.replace(
+            '<meta name="og:description" content=',
+            '<meta property="og" name="og:description" content=',
+        )
+        parser = MatchParser(SPORT.TENNIS_MEN)
+
+        assert parser.extract_description(page) is None
+        assert self.get_description(page, use_soup=False) == self.get_description(
+            SUMMARY_PAGE, use_soup=False
+        )
+
+
+class TestMatchScraperCache:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [None, StatusCode.get("3")])
+    async def test_finished_match_cached(self, status: str | None):
+        session = ScraperSession(cache=ResponseCache())
+
+        first = await LocalMatchScraper(session=session).scrape("K831uSar", status)
+        scraper = LocalMatchScraper(session=session)
+        second = await scraper.scrape("K831uSar", status)
+
+        assert scraper.urls == []
+        assert session.cache.hits == 3
+        assert first == second
+
+    @pytest.mark.asyncio
+    async def test_future_match_not_cached(self):
+        session = ScraperSession(cache=ResponseCache())
+
+        scraper = LocalMatchScraper(FUTURE_SUMMARY_PAGE, session=session)
+        await scraper.scrape("K831uSar")
+        await scraper.scrape("K831uSar")
+
+        assert len(scraper.urls) == 2
+        assert session.cache.stored == 0
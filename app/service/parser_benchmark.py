@@ -0,0 +1,335 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+from pydantic import BaseModel
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+
+from model.service import MatchSDM, MatchOddsHASDM, MatchOdds1x2SDM, OddsType
+from service.base_scraper import BaseScraper
+from service.flashscore.common import SPORT, SportType, TournamentNameParser
+from service.flashscore.scraper.match import MatchParser, MatchScraper
+from service.flashscore.scraper.week import WeeklyMatchesScraper
+from service.flashscore.scraper.player import PlayerScraper, PlayerMatchesParser
+from service.flashscore.scraper.tournament import TournamentMatchesParser
+from service.betexplorer.scraper import BetExplorerParser, BetExplorerScraper
+from service.tennisexplorer.scraper import TennisExplorerRankScraper
+
+
+RESPONSES_DIR = Path(__file__).parent / "benchmark" / "responses"
+BASELINE_PATH = Path(__file__).parent / "benchmark" / "baseline.json"
+
+
+class ParserBenchmarkResult(BaseModel):
+    """Throughput, latency percentiles and peak memory of one parser"""
+
+    kind: str
+    pages: int
+    rounds: int
+    pages_per_s: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    peak_kb: float
+
+
+class ParserRegression(BaseModel):
+    kind: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+
+
+class ParserBenchmark:
+    """
+    Run FlashScore, BetExplorer and TennisExplorer parsers over recorded raw
+    responses: <responses_dir>/<kind>/*.txt, one response per file.
+
+    Responses and baseline are local (not committed): record real pages with
+    --record KIND URL and save a baseline on the same machine before comparing.
+    """
+
+    def __init__(
+        self,
+        sport: SportType = SPORT.TENNIS_MEN,
+        responses_dir: Path = RESPONSES_DIR,
+    ) -> None:
+        self.sport = sport
+        self.responses_dir = Path(responses_dir)
+
+        match_parser = MatchParser(sport)
+        week_scraper = WeeklyMatchesScraper(sport)
+        player_scraper = PlayerScraper(sport)
+        player_parser = PlayerMatchesParser(sport)
+        tournament_parser = TournamentMatchesParser(sport)
+        odds_parser = BetExplorerParser()
+        rank_scraper = TennisExplorerRankScraper(SPORT.TENNIS_MEN)
+
+        def parse_summary(response: str) -> MatchSDM:
+            match = match_parser.get_status(MatchSDM(code="bench"), response)
+            return match_parser.get_description(match, response)
+
+        def parse_ha(response: str) -> MatchOddsHASDM:
+            match = MatchOddsHASDM(code="bench", odds_type=OddsType.ODDS_HA)
+            return odds_parser.parse_ha(response, match)
+
+        def parse_1x2(response: str) -> MatchOdds1x2SDM:
+            match = MatchOdds1x2SDM(code="bench", odds_type=OddsType.ODDS_1x2)
+            return odds_parser.parse_1x2(response, match)
+
+        self.parsers: dict[str, Callable[[str], Any]] = {
+            "match_summary": parse_summary,
+            "df_sur": lambda r: match_parser.get_times_score(MatchSDM(code="b"), r),
+            "df_st": lambda r: match_parser.get_statistics(MatchSDM(code="b"), r),
+            "week": week_scraper.parse_day,
+            "tournament": tournament_parser.parse_first,
+            "tournament_page": tournament_parser.parse_other,
+            "player_matches": player_parser.parse_page,
+            "player_rank": player_scraper.parse,
+            "betexplorer_ha": parse_ha,
+            "betexplorer_1x2": parse_1x2,
+            "tennisexplorer_rank": rank_scraper.parse_page,
+        }
+
+    def scraper_for(self, kind: str) -> BaseScraper:
+        """Scraper with headers of the site the response kind comes from"""
+
+        if kind.startswith("betexplorer"):
+            return BetExplorerScraper(self.sport)
+        if kind.startswith("tennisexplorer"):
+            return TennisExplorerRankScraper(SPORT.TENNIS_MEN)
+        return MatchScraper(self.sport)
+
+    async def record(self, kind: str, url: str, name: str | None = None) -> Path:
+        """Download raw response once and store it for offline runs"""
+
+        if kind not in self.parsers:
+            raise ValueError(f"Unknown response kind '{kind}'")
+
+        async with self.scraper_for(kind) as scraper:
+            response = await scraper.request(url)
+        if response is None:
+            raise ValueError(f"Can't record '{url}'")
+
+        name = name or url.rstrip("/").split("/")[-1]
+        path = self.responses_dir / kind / f"{name}.txt"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(response, encoding="utf-8")
+
+        return path
+
+    def load(self, kind: str) -> list[str]:
+        kind_dir = self.responses_dir / kind
+        if not kind_dir.is_dir():
+            return []
+
+        return [p.read_text(encoding="utf-8") for p in sorted(kind_dir.glob("*.txt"))]
+
+    @staticmethod
+    def percentile(values: list[float], q: float) -> float:
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+    def peak_memory(self, parse: Callable[[str], Any], pages: list[str]) -> float:
+        """Largest transient allocation of one parse call, KiB"""
+
+        peak = 0
+        tracemalloc.start()
+        try:
+            for page in pages:
+                tracemalloc.reset_peak()
+                start, _ = tracemalloc.get_traced_memory()
+                parse(page)
+                _, page_peak = tracemalloc.get_traced_memory()
+                peak = max(peak, page_peak - start)
+        finally:
+            tracemalloc.stop()
+
+        return peak / 1024
+
+    def run_kind(
+        self,
+        kind: str,
+        pages: list[str],
+        rounds: int = 5,
+    ) -> ParserBenchmarkResult:
+        parse = self.parsers[kind]
+
+        ### warmup: regex caches, lazy imports
+        for page in pages:
+            parse(page)
+
+        latencies: list[float] = []
+        for _ in range(rounds):
+            for page in pages:
+                start = time.perf_counter_ns()
+                parse(page)
+                latencies.append((time.perf_counter_ns() - start) / 1e6)
+
+        total_s = sum(latencies) / 1000
+        return ParserBenchmarkResult(
+            kind=kind,
+            pages=len(pages),
+            rounds=rounds,
+            pages_per_s=len(latencies) / total_s if total_s else 0,
+            p50_ms=self.percentile(latencies, 0.5),
+            p90_ms=self.percentile(latencies, 0.9),
+            p99_ms=self.percentile(latencies, 0.99),
+            max_ms=max(latencies),
+            peak_kb=self.peak_memory(parse, pages),
+        )
+
+    def run(
+        self,
+        kinds: list[str] | None = None,
+        rounds: int = 5,
+    ) -> list[ParserBenchmarkResult]:
+        """Benchmark every kind which has recorded responses"""
+
+        results: list[ParserBenchmarkResult] = []
+        for kind in kinds or list(self.parsers):
+            pages = self.load(kind)
+            if not pages:
+                print(f"{kind}: no recorded responses, skipped")
+                continue
+
+            results.append(self.run_kind(kind, pages, rounds))
+
+        return results
+
+    @staticmethod
+    def save_baseline(
+        results: list[ParserBenchmarkResult],
+        path: Path = BASELINE_PATH,
+    ) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump({r.kind: r.model_dump() for r in results}, file, indent=2)
+
+    @staticmethod
+    def load_baseline(path: Path = BASELINE_PATH) -> dict[str, ParserBenchmarkResult]:
+        if not Path(path).exists():
+            return {}
+
+        with open(path, "r") as file:
+            data = json.load(file)
+        return {k: ParserBenchmarkResult(**v) for k, v in data.items()}
+
+    @staticmethod
+    def compare(
+        results: list[ParserBenchmarkResult],
+        baseline: dict[str, ParserBenchmarkResult],
+        tolerance: float = 0.1,
+    ) -> list[ParserRegression]:
+        """
+        Regression: throughput dropped or latency / memory grew
+        by more than tolerance (fraction of baseline value).
+        """
+
+        regressions: list[ParserRegression] = []
+        for result in results:
+            base = baseline.get(result.kind)
+            if base is None:
+                continue
+
+            for metric, higher_better in (
+                ("pages_per_s", True),
+                ("p50_ms", False),
+                ("p99_ms", False),
+                ("peak_kb", False),
+            ):
+                old = getattr(base, metric)
+                new = getattr(result, metric)
+                if not old:
+                    continue
+
+                change = (new - old) / old
+                if (higher_better and change < -tolerance) or (
+                    not higher_better and change > tolerance
+                ):
+                    regressions.append(
+                        ParserRegression(
+                            kind=result.kind,
+                            metric=metric,
+                            baseline=old,
+                            current=new,
+                            change=change,
+                        )
+                    )
+
+        return regressions
+
+    @staticmethod
+    def report(
+        results: list[ParserBenchmarkResult],
+        baseline: dict[str, ParserBenchmarkResult] | None = None,
+    ) -> None:
+        baseline = baseline or {}
+
+        print(
+            f"{'kind':<20}{'pages':>7}{'pages/s':>11}{'p50 ms':>9}"
+            f"{'p90 ms':>9}{'p99 ms':>9}{'peak KiB':>10}{'vs base':>9}"
+        )
+        for r in results:
+            base = baseline.get(r.kind)
+            change = ""
+            if base is not None and base.pages_per_s:
+                change = f"{(r.pages_per_s / base.pages_per_s - 1) * 100:+.1f}%"
+
+            print(
+                f"{r.kind:<20}{r.pages:>7}{r.pages_per_s:>11.1f}{r.p50_ms:>9.3f}"
+                f"{r.p90_ms:>9.3f}{r.p99_ms:>9.3f}{r.peak_kb:>10.1f}{change:>9}"
+            )
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description="Offline parser benchmark")
+    args.add_argument("--responses", type=Path, default=RESPONSES_DIR)
+    args.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args.add_argument("--kind", action="append", help="benchmark only this kind")
+    args.add_argument("--rounds", type=int, default=5)
+    args.add_argument("--tolerance", type=float, default=0.1)
+    args.add_argument("--save-baseline", action="store_true")
+    args.add_argument(
+        "--record",
+        nargs=2,
+        metavar=("KIND", "URL"),
+        help="store raw response of url for kind and exit",
+    )
+    args = args.parse_args()
+
+    benchmark = ParserBenchmark(responses_dir=args.responses)
+    if args.record:
+        path = asyncio.run(benchmark.record(*args.record))
+        print(f"Recorded {path}")
+        return
+
+    results = benchmark.run(args.kind, args.rounds)
+    baseline = benchmark.load_baseline(args.baseline)
+    benchmark.report(results, baseline)
+    print("Tournament name cache:", TournamentNameParser.cache_info())
+
+    if args.save_baseline:
+        benchmark.save_baseline(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    regressions = benchmark.compare(results, baseline, args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r.kind} {r.metric}: {r.baseline:.3f} -> {r.current:.3f}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import sys
+import time
+import random
+import asyncio
+from pathlib import Path
+from aiohttp import BasicAuth
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+
+from settings import settings
+from service.base_scraper import ScraperSession, parse_proxy
+from service.response_cache import get_response_cache
+
+
+MAX_FAILURES = settings.SCRAPER_PROXY_MAX_FAILURES
+COOLDOWN = settings.SCRAPER_PROXY_COOLDOWN
+
+### weight of the newest observation in latency / error moving averages
+EWMA_ALPHA = 0.2
+
+
+class PooledProxy(ScraperSession):
+    """
+    One proxy of ProxyPool: own connections, own per-host rate budget
+    and health statistics.
+    """
+
+    def __init__(
+        self,
+        proxy: str,
+        max_failures: int = MAX_FAILURES,
+        cooldown: float = COOLDOWN,
+        **session_kwargs,
+    ) -> None:
+        super().__init__(**session_kwargs)
+
+        proxy_url, proxy_username, proxy_password = parse_proxy(proxy)
+        self.proxy_url = proxy_url
+        self.proxy_auth = BasicAuth(login=proxy_username, password=proxy_password)
+
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.failures = 0
+        self.evicted_until = 0.0
+
+    def healthy(self, now: float | None = None) -> bool:
+        return self.evicted_until <= (now or time.monotonic())
+
+    def score(self) -> float:
+        """Lower is better: slow, failing and busy proxies get less requests"""
+
+        ### untried proxy goes first to get its own statistics
+        if not self.requests:
+            return self.in_flight
+
+        latency = self.latency or 0.1
+        return latency * (1 + self.in_flight) / max(0.05, 1 - self.error_rate)
+
+    def report(self, ok: bool | None, latency: float) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        if ok is not None:
+            self.observe(ok, latency)
+
+    def observe(self, ok: bool, latency: float) -> None:
+        self.requests += 1
+        self.error_rate += EWMA_ALPHA * ((0 if ok else 1) - self.error_rate)
+
+        if ok:
+            self.failures = 0
+            self.latency += EWMA_ALPHA * (latency - self.latency)
+            return
+
+        self.errors += 1
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            self.evict()
+
+    def evict(self) -> None:
+        print(f"Proxy {self.proxy_url} evicted for {self.cooldown}s")
+        self.evicted_until = time.monotonic() + self.cooldown
+        self.failures = 0
+
+
+class ProxyPool(ScraperSession):
+    """
+    ScraperSession spreading requests across healthy proxies.
+    Each request goes through the better of two random healthy proxies
+    (by score). A proxy failing max_failures requests in a row is evicted
+    for cooldown seconds, then gets requests again.
+    """
+
+    def __init__(
+        self,
+        proxies: list[str],
+        max_failures: int = MAX_FAILURES,
+        cooldown: float = COOLDOWN,
+        **session_kwargs,
+    ) -> None:
+        super().__init__(**session_kwargs)
+
+        if not proxies:
+            raise ValueError("ProxyPool needs at least one proxy")
+
+        self.proxies = [
+            PooledProxy(
+                proxy,
+                max_failures,
+                cooldown,
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.ttl_dns_cache,
+            )
+            for proxy in proxies
+        ]
+
+    def healthy(self) -> list[PooledProxy]:
+        now = time.monotonic()
+        return [p for p in self.proxies if p.healthy(now)]
+
+    def route(self) -> PooledProxy:
+        candidates = self.healthy()
+        if not candidates:
+            ### all evicted: the one which recovers first is on probation
+            candidates = [min(self.proxies, key=lambda p: p.evicted_until)]
+
+        if len(candidates) > 1:
+            candidates = random.sample(candidates, 2)
+
+        proxy = min(candidates, key=lambda p: p.score())
+        proxy.in_flight += 1
+        return proxy
+
+    async def check(self, url: str = "https://example.com/") -> list[PooledProxy]:
+        """Request url through every proxy, return healthy ones"""
+
+        async def ping(proxy: PooledProxy) -> None:
+            start = time.monotonic()
+            try:
+                async with proxy.get().get(
+                    url,
+                    proxy=proxy.proxy_url,
+                    proxy_auth=proxy.proxy_auth,
+                ) as response:
+                    await response.read()
+                    ok = response.status < 400
+            except Exception:
+                ok = False
+
+            if ok:
+                proxy.observe(True, time.monotonic() - start)
+            else:
+                proxy.evict()
+
+        await asyncio.gather(*[ping(p) for p in self.proxies])
+        return self.healthy()
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "proxy": p.proxy_url,
+                "requests": p.requests,
+                "errors": p.errors,
+                "latency": round(p.latency, 3),
+                "healthy": p.healthy(),
+            }
+            for p in self.proxies
+        ]
+
+    async def close(self) -> None:
+        await asyncio.gather(*[p.close() for p in self.proxies])
+        await super().close()
+
+
+def get_scraper_session() -> ScraperSession:
+    """
+    Session configured by settings: ProxyPool if SCRAPER_PROXIES is set
+    (comma separated), response cache if SCRAPER_CACHE_PATH is set.
+    """
+
+    cache = get_response_cache()
+    proxies = [p.strip() for p in settings.SCRAPER_PROXIES.split(",") if p.strip()]
+    if proxies:
+        return ProxyPool(proxies, cache=cache)
+    return ScraperSession(cache=cache)
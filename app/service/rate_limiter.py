@@ -0,0 +1,122 @@
+import sys
+import time
+import random
+import asyncio
+from pathlib import Path
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+
+from settings import settings
+
+
+RATE_CEILING = settings.SCRAPER_RATE_CEILING
+RATE_FLOOR = settings.SCRAPER_RATE_FLOOR
+RATE_STEP = settings.SCRAPER_RATE_STEP
+RETRY_BASE_DELAY = settings.SCRAPER_RETRY_BASE_DELAY
+RETRY_MAX_DELAY = settings.SCRAPER_RETRY_MAX_DELAY
+
+THROTTLE_STATUSES = {429, 502, 503, 504}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After header: delay in seconds or HTTP date"""
+
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: float | None = None,
+    base: float = RETRY_BASE_DELAY,
+    max_delay: float = RETRY_MAX_DELAY,
+) -> float:
+    """Full-jitter exponential backoff, never shorter than Retry-After"""
+
+    delay = random.uniform(0, min(max_delay, base * 2**attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class HostBucket:
+    """
+    Token bucket of one host with additive increase / multiplicative decrease.
+    rate: current requests per second, starts at configured rate
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.base_rate = rate
+        self.rate = rate
+        self.max_rate = rate * RATE_CEILING
+        self.min_rate = max(rate * RATE_FLOOR, 0.1)
+        self.capacity = capacity
+
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            if self.blocked_until > now:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+
+            self.refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.base_rate * RATE_STEP)
+
+    def throttled(self, retry_after: float | None = None) -> None:
+        now = time.monotonic()
+        self.refill(now)
+
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = min(self.tokens, 0)
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-host token buckets shared by all scrapers of a ScraperSession.
+    Rate ramps up to SCRAPER_RATE_CEILING x configured rate while responses are
+    healthy and halves on 429/5xx/disconnects (down to SCRAPER_RATE_FLOOR x).
+    """
+
+    def __init__(self) -> None:
+        self.buckets: dict[str, HostBucket] = {}
+
+    def bucket(self, host: str, max_rate: int, rate_period: float) -> HostBucket:
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = HostBucket(max_rate / rate_period, max_rate)
+            self.buckets[host] = bucket
+        return bucket
+
+    def rates(self) -> dict[str, float]:
+        return {host: bucket.rate for host, bucket in self.buckets.items()}
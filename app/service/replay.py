@@ -0,0 +1,274 @@
+import sys
+import zlib
+import time
+import random
+import asyncio
+import sqlite3
+from pathlib import Path
+from urllib.parse import quote
+from pydantic import BaseModel
+from aiohttp import ClientOSError, web
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+
+class ReplayMiss(Exception):
+    pass
+
+
+class ArchivedResponse(BaseModel):
+    url: str
+    status: int
+    body: str
+    recorded_at: int
+
+
+class ResponseArchive:
+    """
+    Raw responses keyed by url in one sqlite file, bodies are zlib-compressed.
+    Attach to ScraperSession(archive=...) to record every response.
+
+    put() runs inside of event loop, so writes are committed by batches:
+    after commit_every responses or commit_interval seconds, and on close().
+    """
+
+    COMMIT_EVERY = 100
+    COMMIT_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        path: str | Path = ":memory:",
+        commit_every: int = COMMIT_EVERY,
+        commit_interval: float = COMMIT_INTERVAL,
+    ) -> None:
+        self.path = path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._pending = 0
+        self._committed_at = time.monotonic()
+        self._closed = False
+
+        self._db = sqlite3.connect(str(path))
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                body BLOB NOT NULL,
+                recorded_at INTEGER NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+
+    def put(self, url: str, body: str, status: int = 200) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+            (url, status, zlib.compress(body.encode("utf-8")), int(time.time())),
+        )
+        self._pending += 1
+        if (
+            self._pending >= self.commit_every
+            or time.monotonic() - self._committed_at >= self.commit_interval
+        ):
+            self.commit()
+
+    def commit(self) -> None:
+        if self._pending:
+            self._db.commit()
+            self._pending = 0
+        self._committed_at = time.monotonic()
+
+    def get(self, url: str) -> ArchivedResponse | None:
+        row = self._db.execute(
+            "SELECT status, body, recorded_at FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        status, body, recorded_at = row
+        return ArchivedResponse(
+            url=url,
+            status=status,
+            body=zlib.decompress(body).decode("utf-8"),
+            recorded_at=recorded_at,
+        )
+
+    def urls(self) -> list[str]:
+        return [r[0] for r in self._db.execute("SELECT url FROM responses")]
+
+    def __contains__(self, url: str) -> bool:
+        query = "SELECT 1 FROM responses WHERE url = ?"
+        return self._db.execute(query, (url,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.commit()
+        self._db.close()
+        self._closed = True
+
+    def __enter__(self) -> "ResponseArchive":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class FaultInjector:
+    """
+    latency: seconds added to every response
+    jitter: random extra latency in [0, jitter] seconds
+    error_rate: share of requests failing with connection error
+    """
+
+    def __init__(
+        self,
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    async def delay(self) -> None:
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def failed(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+
+class ReplayTransport(FaultInjector):
+    """
+    In-process replay: BaseScraper.request answers from archive, no sockets.
+    strict: raise ReplayMiss for urls missing in archive (None by default)
+    rate_limited: keep scraper rate limits (off to measure raw throughput)
+    """
+
+    def __init__(
+        self,
+        archive: ResponseArchive,
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        strict: bool = False,
+        rate_limited: bool = False,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__(latency, jitter, error_rate, seed)
+        self.archive = archive
+        self.strict = strict
+        self.rate_limited = rate_limited
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def fetch(self, session, url: str, headers: dict) -> str | None:
+        await self.delay()
+        if self.failed():
+            self.errors += 1
+            raise ClientOSError(f"Injected replay error for {url}")
+
+        response = self.archive.get(url)
+        if response is None:
+            self.misses += 1
+            if self.strict:
+                raise ReplayMiss(url)
+            return None
+
+        self.hits += 1
+        return response.body
+
+
+class ServerTransport:
+    """Replay over HTTP: requests go to ReplayServer through scraper session"""
+
+    def __init__(self, server_url: str, rate_limited: bool = False) -> None:
+        self.server_url = server_url
+        self.rate_limited = rate_limited
+
+    def url_for(self, url: str) -> str:
+        return f"{self.server_url}/replay?url={quote(url, safe='')}"
+
+    async def fetch(self, session, url: str, headers: dict) -> str | None:
+        async with session.get().get(self.url_for(url), headers=headers) as response:
+            if response.status >= 500:
+                raise ClientOSError(f"Replay server error {response.status}")
+            if response.status == 404:
+                return None
+            return await response.text()
+
+
+class ReplayServer(FaultInjector):
+    """Local aiohttp stand-in for the scraped sites, serves archived responses"""
+
+    def __init__(
+        self,
+        archive: ResponseArchive,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__(latency, jitter, error_rate, seed)
+        self.archive = archive
+        self.host = host
+        self.port = port
+
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def handle(self, request: web.Request) -> web.Response:
+        await self.delay()
+        if self.failed():
+            return web.Response(status=503, text="Injected replay error")
+
+        response = self.archive.get(request.query.get("url", ""))
+        if response is None:
+            return web.Response(status=404)
+
+        return web.Response(status=response.status, text=response.body)
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/replay", self.handle)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        self.port = self._runner.addresses[0][1]
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def transport(self, rate_limited: bool = False) -> ServerTransport:
+        return ServerTransport(self.url, rate_limited)
+
+    async def __aenter__(self) -> "ReplayServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
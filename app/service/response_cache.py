@@ -0,0 +1,111 @@
+import re
+import sys
+import time
+from pathlib import Path
+from pydantic import BaseModel
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+
+from settings import settings
+from service.replay import ResponseArchive
+
+
+class CacheRule(BaseModel):
+    """
+    pattern: regex searched in url, first matching rule wins
+    ttl: seconds, None - never expires, 0 - not cached
+    """
+
+    pattern: str
+    ttl: float | None
+
+
+### match feeds are stored by scrapers only when match is known to be finished
+DEFAULT_CACHE_RULES = [
+    CacheRule(pattern=r"flashscore\.co\.uk/match/", ttl=None),
+    CacheRule(pattern=r"/x/feed/df_", ttl=None),
+    CacheRule(pattern=r"betexplorer\.com/match-odds", ttl=None),
+    CacheRule(pattern=r"/x/feed/f_\d+_0_", ttl=0),
+    CacheRule(pattern=r"/x/feed/f_\d+_-?\d+_", ttl=300),
+    CacheRule(pattern=r"/x/feed/(tr|pr|ran)_", ttl=3600),
+    CacheRule(pattern=r"flashscore\.co\.uk/.*/results/$", ttl=3600),
+    CacheRule(pattern=r"flashscore\.co\.uk/.*/archive/$", ttl=86400),
+    CacheRule(pattern=r"flashscore\.co\.uk/x/req/", ttl=86400),
+    CacheRule(pattern=r"tennisexplorer\.com/", ttl=86400),
+]
+
+
+class ResponseCache:
+    """
+    Response bodies stored in ResponseArchive (sqlite, zlib) with TTL per url class.
+    Urls not matching any rule are not cached.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = ":memory:",
+        rules: list[CacheRule] = DEFAULT_CACHE_RULES,
+    ) -> None:
+        self.archive = ResponseArchive(path)
+        self.rules = [(re.compile(r.pattern), r.ttl) for r in rules]
+
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+
+    def ttl_for(self, url: str) -> float | None:
+        for pattern, ttl in self.rules:
+            if pattern.search(url):
+                return ttl
+        return 0
+
+    def get(self, url: str) -> str | None:
+        ttl = self.ttl_for(url)
+        if ttl == 0:
+            return None
+
+        response = self.archive.get(url)
+        if response is None or (
+            ttl is not None and response.recorded_at + ttl < time.time()
+        ):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return response.body
+
+    def put(self, url: str, body: str) -> None:
+        ttl = self.ttl_for(url)
+        if ttl == 0:
+            return
+        ### immutable response is never rewritten
+        if ttl is None and url in self.archive:
+            return
+
+        self.archive.put(url, body)
+        self.stored += 1
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def close(self) -> None:
+        self.archive.close()
+
+
+### one cache per file: sessions of all routers share its sqlite connection
+RESPONSE_CACHES: dict[str, ResponseCache] = {}
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Cache configured by SCRAPER_CACHE_PATH, None if it's not set"""
+
+    path = settings.SCRAPER_CACHE_PATH
+    if not path:
+        return None
+    if path not in RESPONSE_CACHES:
+        RESPONSE_CACHES[path] = ResponseCache(path)
+    return RESPONSE_CACHES[path]
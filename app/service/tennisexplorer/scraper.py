@@ -10,7 +10,7 @@ ROOT_DIR = Path(__file__).parent.parent.parent
 sys.path.append(str(ROOT_DIR))
 
 from settings import settings
-from service.base_scraper import BaseScraper
+from service.base_scraper import BaseScraper, ScraperSession
 from model.service import RankSDM, TennisPlayerDataSDM
 from manager.service import (
     SportType,
@@ -33,8 +33,9 @@ class TennisExplorerSraper(BaseScraper, ABC):
         max_rate: int = TE_MAX_RATE,
         rate_period: float = TE_RATE_PERIOD,
         debug: bool = False,
+        session: ScraperSession | None = None,
     ) -> None:
-        super().__init__(proxy, max_rate, rate_period, debug)
+        super().__init__(proxy, max_rate, rate_period, debug, session)
 
     @property
     def custom_headers(self) -> dict:
@@ -68,9 +69,12 @@ class TennisExplorerRankDatesScraper(
         max_rate: int = TE_MAX_RATE,
         rate_period: float = TE_RATE_PERIOD,
         debug: bool = False,
+        session: ScraperSession | None = None,
     ) -> None:
         TennisExplorerRankDatesScraperInterface.__init__(self, sport)
-        TennisExplorerSraper.__init__(self, proxy, max_rate, rate_period, debug)
+        TennisExplorerSraper.__init__(
+            self, proxy, max_rate, rate_period, debug, session
+        )
 
     def parse(self, response: str) -> list[str]:
         s = soup(response, "lxml")
@@ -110,9 +114,12 @@ class TennisExplorerRankScraper(
         max_rate: int = TE_MAX_RATE,
         rate_period: float = TE_RATE_PERIOD,
         debug: bool = False,
+        session: ScraperSession | None = None,
     ) -> None:
         TennisExplorerRankScraperInterface.__init__(self, sport)
-        TennisExplorerSraper.__init__(self, proxy, max_rate, rate_period, debug)
+        TennisExplorerSraper.__init__(
+            self, proxy, max_rate, rate_period, debug, session
+        )
 
     def get_urls(self, dates: list[str]):
         urls: list[str] = []
@@ -183,9 +190,12 @@ class TennisExplorerPlayerScraper(
         max_rate: int = TE_MAX_RATE,
         rate_period: float = TE_RATE_PERIOD,
         debug: bool = False,
+        session: ScraperSession | None = None,
     ) -> None:
         TennisExplorerPlayerScraperInterface.__init__(self, sport)
-        TennisExplorerSraper.__init__(self, proxy, max_rate, rate_period, debug)
+        TennisExplorerSraper.__init__(
+            self, proxy, max_rate, rate_period, debug, session
+        )
 
     def parse(self, response: str, te_id: str) -> TennisPlayerDataSDM:
         s = soup(response, "lxml")
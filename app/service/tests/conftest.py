@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+from typing import Awaitable, Callable
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import service.base_scraper as base_scraper
+from service.base_scraper import BaseScraper, ScraperSession
+
+
+class LocalScraper(BaseScraper):
+    """Scraper of local test servers (no site headers)"""
+
+    @property
+    def custom_headers(self) -> dict:
+        return {}
+
+
+@pytest.fixture
+def local_scraper() -> Callable[..., LocalScraper]:
+    """LocalScraper factory: max_rate requests per second through session or proxy"""
+
+    def create(
+        max_rate: int = 49,
+        session: ScraperSession | None = None,
+        proxy: str | None = None,
+    ) -> LocalScraper:
+        return LocalScraper(
+            proxy=proxy, max_rate=max_rate, rate_period=1, session=session
+        )
+
+    return create
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(base_scraper, "backoff_delay", lambda *args: 0)
+
+
+@pytest_asyncio.fixture
+async def start_server() -> Callable[[dict], Awaitable[str]]:
+    """Local aiohttp servers factory: routes (path -> handler) -> base url"""
+
+    runners: list[web.AppRunner] = []
+
+    async def start(routes: dict) -> str:
+        app = web.Application()
+        for path, handler in routes.items():
+            app.router.add_get(path, handler)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+
+        runners.append(runner)
+        port = runner.addresses[0][1]
+        return f"http://127.0.0.1:{port}"
+
+    yield start
+
+    for runner in runners:
+        await runner.cleanup()
+
+
+async def peer_handler(request: web.Request) -> web.Response:
+    ### client port identifies the TCP connection used by request
+    _, port = request.transport.get_extra_info("peername")
+    return web.Response(text=str(port))
+
+
+async def page_handler(request: web.Request) -> web.Response:
+    return web.Response(text=f"page {request.match_info['name']}")
+
+
+@pytest_asyncio.fixture
+async def server_url(start_server) -> str:
+    return await start_server({"/peer": peer_handler, "/page/{name}": page_handler})
@@ -0,0 +1,64 @@
+import sys
+import asyncio
+from pathlib import Path
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from service.base_scraper import ScraperSession
+
+
+class TestScraperSession:
+    @pytest.mark.asyncio
+    async def test_connection_reused(self, server_url: str, local_scraper):
+        async with local_scraper() as scraper:
+            port1 = await scraper.request(server_url + "/peer")
+            port2 = await scraper.request(server_url + "/peer")
+
+        assert port1 == port2
+
+    @pytest.mark.asyncio
+    async def test_shared_session(self, server_url: str, local_scraper):
+        async with ScraperSession() as session:
+            scraper1 = local_scraper(session=session)
+            scraper2 = local_scraper(session=session)
+
+            port1 = await scraper1.request(server_url + "/peer")
+            port2 = await scraper2.request(server_url + "/peer")
+            assert port1 == port2
+
+            ### shared session is closed by its owner only
+            await scraper1.close()
+            assert not session.closed
+
+        assert session.closed
+
+    @pytest.mark.asyncio
+    async def test_lazy_session(self):
+        session = ScraperSession()
+        assert session.closed
+
+        client = session.get()
+        assert client is session.get()
+        assert not session.closed
+
+        await session.close()
+        assert session.closed
+
+    def test_loop_change(self):
+        session = ScraperSession()
+
+        async def get():
+            return session.get()
+
+        old = asyncio.run(get())
+
+        async def replace():
+            client = session.get()
+            await session.close()
+            return client
+
+        new = asyncio.run(replace())
+
+        assert new is not old
+        assert old.closed and new.closed
@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from service.parser_benchmark import ParserBenchmark, ParserBenchmarkResult
+
+
+WEEK_FEED = (
+    "SA÷2¬~ZA÷ATP - SINGLES: Wimbledon (United Kingdom), grass - Final"
+    "¬ZEE÷nZi4fKds¬~AA÷K831uSar¬AD÷1689512400¬ADE÷1689512400¬AC÷3¬~"
+)
+
+STATISTICS_FEED = (
+    "SE÷Match¬~SF÷Service¬~SG÷Aces¬SH÷5¬SI÷3¬~"
+    "SG÷1st serve percentage¬SH÷65% (40/61)¬SI÷60% (30/50)¬~"
+)
+
+
+@pytest.fixture
+def benchmark(tmp_path: Path) -> ParserBenchmark:
+    """Benchmark over one page of week and df_st kinds"""
+
+    for kind, page in (("week", WEEK_FEED), ("df_st", STATISTICS_FEED)):
+        (tmp_path / kind).mkdir()
+        (tmp_path / kind / "page.txt").write_text(page, encoding="utf-8")
+
+    return ParserBenchmark(responses_dir=tmp_path)
+
+
+class TestParserBenchmark:
+    def test_run(self, benchmark: ParserBenchmark):
+        results = benchmark.run(rounds=3)
+
+        assert [r.kind for r in results] == ["df_st", "week"]
+        for r in results:
+            assert r.pages == 1
+            assert r.pages_per_s > 0
+            assert r.p50_ms <= r.p99_ms <= r.max_ms
+            assert r.peak_kb > 0
+
+    def test_baseline(self, benchmark: ParserBenchmark, tmp_path: Path):
+        results = benchmark.run(["week"], rounds=2)
+
+        path = tmp_path / "baseline.json"
+        benchmark.save_baseline(results, path)
+        baseline = benchmark.load_baseline(path)
+
+        assert baseline == {"week": results[0]}
+        assert benchmark.compare(results, baseline) == []
+
+    def test_regression(self):
+        base = ParserBenchmarkResult(
+            kind="week",
+            pages=1,
+            rounds=1,
+            pages_per_s=1000,
+            p50_ms=1,
+            p90_ms=1,
+            p99_ms=1,
+            max_ms=1,
+            peak_kb=10,
+        )
+        slow = base.model_copy(update={"pages_per_s": 500, "p50_ms": 2})
+
+        regressions = ParserBenchmark.compare([slow], {"week": base})
+
+        assert {r.metric for r in regressions} == {"pages_per_s", "p50_ms"}
@@ -0,0 +1,121 @@
+import sys
+import asyncio
+from pathlib import Path
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from service.proxy_pool import ProxyPool
+
+
+class LocalProxy:
+    """Stand-in proxy: answers proxied GET itself with its name"""
+
+    def __init__(self, name: str, status: int = 200, delay: float = 0) -> None:
+        self.name = name
+        self.status = status
+        self.delay = delay
+        self.calls = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return web.Response(status=self.status, text=self.name)
+
+
+URL = "http://site.local/page"
+POOL_RATE = 100
+SLOW_DELAY = 0.3
+
+
+@pytest_asyncio.fixture
+async def local_proxies(request, start_server):
+    statuses: list[int] = request.param
+    proxies: list[LocalProxy] = []
+    addresses: list[str] = []
+
+    for i, status in enumerate(statuses):
+        ### status 0: slow proxy answering 200 after SLOW_DELAY
+        proxy = LocalProxy(
+            f"proxy{i}", status or 200, delay=0 if status else SLOW_DELAY
+        )
+        url = await start_server({"/{tail:.*}": proxy.handle})
+
+        proxies.append(proxy)
+        addresses.append(f"{url.removeprefix('http://')}@user{i}:password{i}")
+
+    return proxies, addresses
+
+
+pytestmark = pytest.mark.usefixtures("no_backoff")
+
+
+class TestProxyPool:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("local_proxies", [[200, 200, 200]], indirect=True)
+    async def test_spread(self, local_proxies, local_scraper):
+        proxies, addresses = local_proxies
+
+        async with ProxyPool(addresses) as pool:
+            scraper = local_scraper(POOL_RATE, pool)
+            responses = await asyncio.gather(*[scraper.request(URL) for _ in range(60)])
+
+            assert set(responses) == {"proxy0", "proxy1", "proxy2"}
+            assert all(p.calls > 0 for p in proxies)
+
+            ### every proxy has its own rate budget for the host
+            buckets = [p.limiter.buckets["site.local"] for p in pool.proxies]
+            assert len({id(b) for b in buckets}) == 3
+            assert pool.limiter.buckets == {}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("local_proxies", [[200, 503]], indirect=True)
+    async def test_failing_evicted(self, local_proxies, local_scraper):
+        proxies, addresses = local_proxies
+
+        async with ProxyPool(addresses, max_failures=1, cooldown=60) as pool:
+            scraper = local_scraper(POOL_RATE, pool)
+            responses = [await scraper.request(URL) for _ in range(20)]
+
+            assert responses == ["proxy0"] * 20
+            assert proxies[1].calls == 1
+            assert [p.proxy_url for p in pool.healthy()] == [pool.proxies[0].proxy_url]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("local_proxies", [[200, 200]], indirect=True)
+    async def test_all_evicted(self, local_proxies, local_scraper):
+        _, addresses = local_proxies
+
+        async with ProxyPool(addresses) as pool:
+            for proxy in pool.proxies:
+                proxy.evict()
+
+            ### pool keeps working through proxy on probation
+            assert await local_scraper(POOL_RATE, pool).request(URL) in {
+                "proxy0",
+                "proxy1",
+            }
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("local_proxies", [[0, 0]], indirect=True)
+    async def test_cancelled_released(self, local_proxies, local_scraper):
+        _, addresses = local_proxies
+
+        async with ProxyPool(addresses) as pool:
+            scraper = local_scraper(POOL_RATE, pool)
+            tasks = [asyncio.create_task(scraper.request(URL)) for _ in range(6)]
+            await asyncio.sleep(SLOW_DELAY / 2)
+            assert sum(p.in_flight for p in pool.proxies) == 6
+
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            ### cancelled requests don't count against proxy health
+            assert [p.in_flight for p in pool.proxies] == [0, 0]
+            assert [p.requests for p in pool.proxies] == [0, 0]
+
+            ### let proxies finish their handlers before shutdown
+            await asyncio.sleep(SLOW_DELAY)
@@ -0,0 +1,148 @@
+import sys
+import time
+import socket
+from pathlib import Path
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import service.base_scraper as base_scraper
+from service.base_scraper import NotWorkingProxy, ScraperSession, ThrottledError
+from service.replay import ResponseArchive
+from service.rate_limiter import HostBucket, backoff_delay, parse_retry_after
+
+
+class FlakyServer:
+    """First `failures` requests fail with `status` (0 - dropped connection)"""
+
+    def __init__(self, failures: int, status: int) -> None:
+        self.failures = failures
+        self.status = status
+        self.calls = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        if self.calls > self.failures:
+            return web.Response(text="ok")
+
+        if self.status == 0:
+            request.transport.close()
+            return web.Response(text="")
+        return web.Response(status=self.status, headers={"Retry-After": "0"})
+
+
+@pytest_asyncio.fixture
+async def flaky(request, start_server):
+    failures, status = request.param
+    server = FlakyServer(failures, status)
+
+    url = await start_server({"/page": server.handle})
+    return server, url + "/page"
+
+
+pytestmark = pytest.mark.usefixtures("no_backoff")
+
+
+class TestRetryAfter:
+    def test_seconds(self):
+        assert parse_retry_after("7") == 7
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+    def test_date(self):
+        date = datetime.now(timezone.utc) + timedelta(seconds=30)
+        assert 25 < parse_retry_after(format_datetime(date, usegmt=True)) <= 30
+
+    def test_backoff_respects_retry_after(self):
+        assert backoff_delay(0, retry_after=5, base=0.1) == 5
+        assert 0 <= backoff_delay(10, base=0.1, max_delay=1) <= 1
+
+
+class TestHostBucket:
+    def test_aimd(self):
+        bucket = HostBucket(rate=10, capacity=10)
+        for _ in range(1000):
+            bucket.success()
+        assert bucket.rate == bucket.max_rate
+
+        bucket.throttled()
+        assert bucket.rate == bucket.max_rate / 2
+        for _ in range(100):
+            bucket.throttled()
+        assert bucket.rate == bucket.min_rate
+
+    @pytest.mark.asyncio
+    async def test_rate(self):
+        bucket = HostBucket(rate=100, capacity=1)
+
+        start = time.monotonic()
+        for _ in range(11):
+            await bucket.acquire()
+
+        assert time.monotonic() - start >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_retry_after_blocks(self):
+        bucket = HostBucket(rate=100, capacity=100)
+        bucket.throttled(retry_after=0.1)
+
+        start = time.monotonic()
+        await bucket.acquire()
+
+        assert time.monotonic() - start >= 0.09
+
+
+class TestScraperRetries:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("flaky", [(2, 429), (2, 503), (2, 0)], indirect=True)
+    async def test_recovered(self, flaky, local_scraper):
+        server, url = flaky
+        async with local_scraper(max_rate=10) as scraper:
+            assert await scraper.request(url) == "ok"
+
+            bucket = scraper.host_bucket(url)
+            assert bucket.rate < bucket.base_rate
+
+        assert server.calls == 3
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("flaky", [(10, 503)], indirect=True)
+    async def test_gives_up(self, flaky, local_scraper):
+        server, url = flaky
+        archive = ResponseArchive()
+        async with ScraperSession(archive=archive) as session:
+            scraper = local_scraper(max_rate=10, session=session)
+            with pytest.raises(ThrottledError):
+                await scraper.request(url)
+
+        assert server.calls == base_scraper.MAX_TRIES
+        ### error page of the last try is not recorded as a response
+        assert archive.get(url) is None
+
+    @pytest.mark.asyncio
+    async def test_dead_proxy(self, monkeypatch, local_scraper):
+        attempts = []
+
+        def backoff_delay(attempt: int, *args) -> float:
+            attempts.append(attempt)
+            return 0
+
+        monkeypatch.setattr(base_scraper, "backoff_delay", backoff_delay)
+
+        ### port is free again when the socket is closed: nothing listens on it
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        scraper = local_scraper(max_rate=10, proxy=f"127.0.0.1:{port}@user:password")
+        async with scraper:
+            with pytest.raises(NotWorkingProxy):
+                await scraper.request("http://site.local/page")
+
+            bucket = scraper.host_bucket("http://site.local/page")
+            assert bucket.rate < bucket.base_rate
+
+        assert attempts == list(range(base_scraper.MAX_TRIES - 1))
@@ -0,0 +1,128 @@
+import sys
+import asyncio
+import sqlite3
+from pathlib import Path
+import pytest
+from aiohttp import ClientOSError
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from service.base_scraper import ScraperSession
+from service.replay import ResponseArchive, ReplayTransport, ReplayServer, ReplayMiss
+
+
+### 1 request per second: replay must bypass the limiter
+REPLAY_RATE = 1
+
+
+def get_archive(count: int = 20) -> ResponseArchive:
+    archive = ResponseArchive()
+    for i in range(count):
+        archive.put(f"https://www.flashscore.co.uk/match/code{i}/", f"page {i}")
+    return archive
+
+
+class TestResponseArchive:
+    def test_roundtrip(self, tmp_path: Path):
+        path = tmp_path / "responses.sqlite"
+        with ResponseArchive(path) as archive:
+            archive.put("https://x/1", "¬~AA÷K831uSar" * 100, status=200)
+
+        with ResponseArchive(path) as archive:
+            response = archive.get("https://x/1")
+
+            assert response.body == "¬~AA÷K831uSar" * 100
+            assert response.status == 200
+            assert "https://x/1" in archive
+            assert archive.get("https://x/2") is None
+            assert len(archive) == 1
+
+        ### bodies are stored compressed
+        stored = sqlite3.connect(path).execute("SELECT length(body) FROM responses")
+        assert stored.fetchone()[0] < len("¬~AA÷K831uSar" * 100)
+
+    def test_batched_commits(self, tmp_path: Path):
+        path = tmp_path / "responses.sqlite"
+        archive = ResponseArchive(path, commit_every=3, commit_interval=3600)
+        reader = sqlite3.connect(path)
+
+        def committed() -> int:
+            return reader.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+        for i in range(4):
+            archive.put(f"https://x/{i}", "page")
+
+        ### uncommitted responses are read by archive itself
+        assert len(archive) == 4
+        assert committed() == 3
+
+        archive.close()
+        archive.close()
+        assert committed() == 4
+
+
+class TestRecordReplay:
+    @pytest.mark.asyncio
+    async def test_record(self, server_url: str, local_scraper):
+        archive = ResponseArchive()
+        async with ScraperSession(archive=archive) as session:
+            await local_scraper(REPLAY_RATE, session).request(server_url + "/page/a")
+
+        assert archive.get(server_url + "/page/a").body == "page a"
+
+    @pytest.mark.asyncio
+    async def test_replay_transport(self, local_scraper):
+        transport = ReplayTransport(get_archive())
+        scraper = local_scraper(REPLAY_RATE, ScraperSession(transport=transport))
+
+        urls = [f"https://www.flashscore.co.uk/match/code{i}/" for i in range(20)]
+        responses = await asyncio.wait_for(
+            asyncio.gather(*[scraper.request(url) for url in urls]),
+            timeout=1,
+        )
+
+        assert responses == [f"page {i}" for i in range(20)]
+        assert await scraper.request("https://www.flashscore.co.uk/other/") is None
+        assert (transport.hits, transport.misses) == (20, 1)
+
+    @pytest.mark.asyncio
+    async def test_strict_miss(self, local_scraper):
+        transport = ReplayTransport(get_archive(), strict=True)
+        scraper = local_scraper(REPLAY_RATE, ScraperSession(transport=transport))
+
+        with pytest.raises(ReplayMiss):
+            await scraper.request("https://www.flashscore.co.uk/other/")
+
+    @pytest.mark.asyncio
+    async def test_injected_errors(self, local_scraper):
+        transport = ReplayTransport(get_archive(), error_rate=0.5, seed=1)
+        scraper = local_scraper(REPLAY_RATE, ScraperSession(transport=transport))
+
+        url = "https://www.flashscore.co.uk/match/code0/"
+        results = await asyncio.gather(
+            *[scraper.request(url) for _ in range(100)],
+            return_exceptions=True,
+        )
+
+        errors = [r for r in results if isinstance(r, ClientOSError)]
+        assert len(errors) == transport.errors
+        assert 20 < len(errors) < 80
+
+    @pytest.mark.asyncio
+    async def test_replay_server(self, local_scraper):
+        async with ReplayServer(get_archive(), latency=0.01) as server:
+            async with ScraperSession(transport=server.transport()) as session:
+                scraper = local_scraper(REPLAY_RATE, session)
+
+                url = "https://www.flashscore.co.uk/match/code3/"
+                assert await scraper.request(url) == "page 3"
+                assert await scraper.request(url + "#/match-summary") is None
+
+    @pytest.mark.asyncio
+    async def test_replay_server_errors(self, local_scraper):
+        async with ReplayServer(get_archive(), error_rate=1) as server:
+            async with ScraperSession(transport=server.transport()) as session:
+                scraper = local_scraper(REPLAY_RATE, session)
+
+                with pytest.raises(ClientOSError):
+                    await scraper.request("https://www.flashscore.co.uk/match/code3/")
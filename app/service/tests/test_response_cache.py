@@ -0,0 +1,56 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from settings import settings
+from service import response_cache
+from service.response_cache import ResponseCache, get_response_cache
+
+
+SUMMARY_URL = "https://www.flashscore.co.uk/match/K831uSar/#/match-summary"
+WEEK_URL = "https://d.flashscore.co.uk/x/feed/f_2_-1_5_en-uk_1"
+TODAY_URL = "https://d.flashscore.co.uk/x/feed/f_2_0_5_en-uk_1"
+
+
+class TestResponseCache:
+    def test_ttl_rules(self):
+        cache = ResponseCache()
+
+        assert cache.ttl_for(SUMMARY_URL) is None
+        assert cache.ttl_for(WEEK_URL) == 300
+        assert cache.ttl_for(TODAY_URL) == 0
+        assert cache.ttl_for("https://example.com/") == 0
+
+    def test_hit_miss(self):
+        cache = ResponseCache()
+
+        assert cache.get(WEEK_URL) is None
+        cache.put(WEEK_URL, "week")
+        assert cache.get(WEEK_URL) == "week"
+
+        cache.put(TODAY_URL, "today")
+        assert cache.get(TODAY_URL) is None
+
+        assert (cache.hits, cache.misses, cache.stored) == (1, 1, 1)
+
+    def test_expired(self):
+        cache = ResponseCache()
+        cache.put(WEEK_URL, "week")
+        cache.archive._db.execute(
+            "UPDATE responses SET recorded_at = ?", (int(time.time()) - 301,)
+        )
+
+        assert cache.get(WEEK_URL) is None
+
+    def test_shared_by_path(self, tmp_path: Path, monkeypatch):
+        monkeypatch.setattr(
+            settings, "SCRAPER_CACHE_PATH", str(tmp_path / "cache.sqlite")
+        )
+        monkeypatch.setattr(response_cache, "RESPONSE_CACHES", {})
+
+        cache = get_response_cache()
+        assert cache is not None
+        assert get_response_cache() is cache
+        cache.close()
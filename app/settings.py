@@ -18,8 +18,28 @@ class Settings(BaseSettings):
     MONGO_BASKETBALL_DB: str
     MONGO_HOCKEY_DB: str
 
+    MONGO_BATCH_SIZE: int = 1000
+    MONGO_TRUSTED_LOAD: bool = True
+    MONGO_VALIDATE_RATE: float = 0
+
     SCRAPER_MAX_TRIES: int
 
+    SCRAPER_CONNECTIONS_LIMIT: int = 100
+    SCRAPER_CONNECTIONS_PER_HOST: int = 30
+    SCRAPER_KEEPALIVE_TIMEOUT: float = 30
+    SCRAPER_DNS_CACHE_TTL: int = 300
+    SCRAPER_CACHE_PATH: str = ""
+
+    SCRAPER_RATE_CEILING: float = 2
+    SCRAPER_RATE_FLOOR: float = 0.1
+    SCRAPER_RATE_STEP: float = 0.01
+    SCRAPER_RETRY_BASE_DELAY: float = 0.5
+    SCRAPER_RETRY_MAX_DELAY: float = 30
+
+    SCRAPER_PROXIES: str = ""
+    SCRAPER_PROXY_MAX_FAILURES: int = 3
+    SCRAPER_PROXY_COOLDOWN: float = 60
+
     FLASHSCORE_MAX_RATE: int = 40
     FLASHSCORE_RATE_PERIOD: int = 1
 
@@ -29,6 +49,10 @@ class Settings(BaseSettings):
     TENNISEXPLORER_MAX_RATE: int = 20
     TENNISEXPLORER_RATE_PERIOD: int = 1
 
+    ML_FEATURES_WORKERS: int = 1
+    ML_ARTIFACT_FORMAT: str = "npy"
+    ML_EXPORT_XLSX: bool = False
+
     @property
     def MONGO_URL(self) -> str:
         return f"mongodb://{self.MONGO_USER}:{self.MONGO_PASSWORD}@{self.MONGO_HOST}:{self.MONGO_PORT}"
@@ -12,6 +12,7 @@ from ml.tennis_men.random import RandomTennisMenPredictor
 from ml.tennis_men.standard import StandardTennisMenMLPredictor
 from db.api.tennis_men import TennisMenRepository
 
+from service.proxy_pool import get_scraper_session
 from service.flashscore.scraper.match import MatchScraper
 from service.flashscore.scraper.player import PlayerScraper, PlayerMatchesScaper
 from service.flashscore.scraper.week import WeeklyMatchesScraper
@@ -28,19 +29,21 @@ class TennisMenRouter(BaseRouter):
 
 db = TennisMenRepository()
 data = TennisMenData(db)
+scraper_session = get_scraper_session()
 sport = SPORT.TENNIS_MEN
 
 manager = TennisMenManager(
     sport=sport,
     data=data,
-    match=MatchScraper(sport),
-    week=WeeklyMatchesScraper(sport),
-    odds=BetExplorerScraper(sport),
-    tournament=TournamentScraper(sport),
-    tournament_matches=TournamentMatchesScraper(sport),
-    player=PlayerScraper(sport),
-    player_matches=PlayerMatchesScaper(sport),
+    match=MatchScraper(sport, session=scraper_session),
+    week=WeeklyMatchesScraper(sport, session=scraper_session),
+    odds=BetExplorerScraper(sport, session=scraper_session),
+    tournament=TournamentScraper(sport, session=scraper_session),
+    tournament_matches=TournamentMatchesScraper(sport, session=scraper_session),
+    player=PlayerScraper(sport, session=scraper_session),
+    player_matches=PlayerMatchesScaper(sport, session=scraper_session),
     predictor=StandardTennisMenMLPredictor(data),
+    concurrent_scrape=True,
 )
 
 
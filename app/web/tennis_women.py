@@ -12,6 +12,7 @@ from ml.tennis_women.random import RandomTennisWomenPredictor
 from ml.tennis_women.standard import StandardTennisWomenMLPredictor
 from db.api.tennis_women import TennisWomenRepository
 
+from service.proxy_pool import get_scraper_session
 from service.flashscore.scraper.match import MatchScraper
 from service.flashscore.scraper.player import PlayerScraper, PlayerMatchesScaper
 from service.flashscore.scraper.week import WeeklyMatchesScraper
@@ -28,19 +29,21 @@ class TennisWomenRouter(BaseRouter):
 
 db = TennisWomenRepository()
 data = TennisWomenData(db)
+scraper_session = get_scraper_session()
 sport = SPORT.TENNIS_WOMEN
 
 manager = TennisWomenManager(
     sport=sport,
     data=data,
-    match=MatchScraper(sport),
-    week=WeeklyMatchesScraper(sport),
-    odds=BetExplorerScraper(sport),
-    tournament=TournamentScraper(sport),
-    tournament_matches=TournamentMatchesScraper(sport),
-    player=PlayerScraper(sport),
-    player_matches=PlayerMatchesScaper(sport),
+    match=MatchScraper(sport, session=scraper_session),
+    week=WeeklyMatchesScraper(sport, session=scraper_session),
+    odds=BetExplorerScraper(sport, session=scraper_session),
+    tournament=TournamentScraper(sport, session=scraper_session),
+    tournament_matches=TournamentMatchesScraper(sport, session=scraper_session),
+    player=PlayerScraper(sport, session=scraper_session),
+    player_matches=PlayerMatchesScaper(sport, session=scraper_session),
     predictor=StandardTennisWomenMLPredictor(data),
+    concurrent_scrape=True,
 )
 
 